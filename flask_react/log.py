@@ -28,6 +28,17 @@ def update_task_progress(task_id, progress, status='processing', message=None, r
         logger.info(f"任务 {task_id} 进度更新: {progress}% - {status} - {message or ''}")
 
 
+def record_task_stats(task_id, key, value):
+    """
+    记录任务处理过程中的统计信息（如跳过的页面、选定的批大小），任务成功完成时并入结果的 'pipeline_stats'
+    :param task_id: 任务ID
+    :param key: 统计项名称
+    :param value: 统计值（需可序列化为 JSON）
+    """
+    if task_id in TASK_PROCESS:
+        TASK_PROCESS[task_id].setdefault('stats', {})[key] = value
+
+
 def complete_task(task_id, result=None, error=None):
     """
     完成任务并清理进度信息
@@ -48,6 +59,9 @@ def complete_task(task_id, result=None, error=None):
         })
         logger.error(f"任务 {task_id} 失败: {error}")
     else:
+        stats = TASK_PROCESS[task_id].get('stats')
+        if stats and isinstance(result, dict):
+            result['pipeline_stats'] = stats
         TASK_PROCESS[task_id].update({
             'progress': 100,
             'status': 'completed',
@@ -11,9 +11,11 @@ from werkzeug.utils import secure_filename
 import uuid
 import nest_asyncio
 import asyncio
-from srcProject.main_process_sequence import main, model_manager
+from srcProject.main_process_sequence import main
+from srcProject.models.model_manager import get_default_model_manager
 
-serve_model_manager = model_manager
+# 服务启动时即开始在后台加载模型。PDF 渲染工作进程（forkserver / spawn）会以 __mp_main__ 导入主模块，此时不加载
+serve_model_manager = get_default_model_manager() if __name__ != '__mp_main__' else None
 nest_asyncio.apply()
 app = Flask(__name__)
 
@@ -616,7 +618,8 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'project_root': project_root,
-        'active_tasks': len(TASK_PROCESS)
+        'active_tasks': len(TASK_PROCESS),
+        'models': serve_model_manager.status()
     })
 
 
@@ -0,0 +1,165 @@
+"""
+HTML 表格转 Markdown 的基准测试：pandas.read_html + to_markdown 的原实现对比 html.parser 单遍实现。
+
+合成一批 VLM 输出风格的表格：只有 <td> 的表格、<thead>/<th> 表头、rowspan/colspan 合并单元格、
+多行表头、单元格中的行内公式（含 < 和 |）、HTML 实体和 <br>。先检查新实现每个表格的输出各行列数一致，
+再报告两种实现的耗时。原实现在没有内容的表格上会抛出异常（lxml 找不到表格后退回 html5lib），
+这些表格记为原实现失败，两种实现都只在原实现能转换的表格上计时。没有安装 pandas（及 lxml、tabulate）时只报告新实现的耗时。
+
+用法：
+    python scripts/benchmark_html_tables.py --tables 500 --repeat 3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from io import StringIO
+from typing import Callable, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from srcProject.utlis.html_table import html_table_to_markdown
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+CELL_TEXTS = ['12.5', '0.873', '—', 'N/A', '模型', '准确率', 'Baseline', '3,200', 'A &amp; B', '1&lt;2',
+              'line one<br/>line two', '$x_{i}^{2}$', '$a<b$', '$\\|v\\|_2$', '\\(\\alpha+\\beta\\)', '']
+
+
+def cell(rng: np.random.Generator) -> str:
+    return str(CELL_TEXTS[rng.integers(len(CELL_TEXTS))])
+
+
+def synthetic_table(rng: np.random.Generator) -> str:
+    """生成一个随机表格，风格与结构随机选择。"""
+    rows, columns = int(rng.integers(3, 25)), int(rng.integers(2, 9))
+    style = rng.integers(4)
+    parts = ['<table>']
+    if style == 1:
+        # <thead> + <th> 表头
+        parts.append('<thead><tr>' + ''.join(f'<th>列{c}</th>' for c in range(columns)) + '</tr></thead><tbody>')
+    elif style == 2:
+        # 两行表头：第一行的分组单元格跨两列，首列跨两行
+        groups = ['<th rowspan="2">名称</th>']
+        sub = []
+        c = 1
+        while c < columns:
+            span = min(2, columns - c)
+            groups.append(f'<th colspan="{span}">组{c}</th>')
+            sub.extend(f'<th>子{c + k}</th>' for k in range(span))
+            c += span
+        parts.append('<tr>' + ''.join(groups) + '</tr><tr>' + ''.join(sub) + '</tr>')
+    pending = [0] * columns # 每列被上方 rowspan 占用的剩余行数
+    for _ in range(rows):
+        parts.append('<tr>')
+        c = 0
+        while c < columns:
+            if pending[c]:
+                pending[c] -= 1
+                c += 1
+                continue
+            if style == 3 and rng.random() < 0.15:
+                # 合并单元格：只在其覆盖的列当前都空闲时跨列
+                colspan = 1
+                while c + colspan < columns and colspan < 3 and not pending[c + colspan] and rng.random() < 0.5:
+                    colspan += 1
+                rowspan = int(rng.integers(1, 4))
+                for k in range(colspan):
+                    pending[c + k] = rowspan - 1
+                parts.append(f'<td rowspan="{rowspan}" colspan="{colspan}">{cell(rng)}</td>')
+                c += colspan
+            else:
+                parts.append(f'<td>{cell(rng)}</td>')
+                c += 1
+        parts.append('</tr>')
+    parts.append('</tbody></table>' if style == 1 else '</table>')
+    return ''.join(parts)
+
+
+def pandas_table_to_markdown(table_html: str) -> str:
+    """原实现：pandas.read_html 解析后以第一行作为表头输出 Markdown。"""
+    df = pd.read_html(StringIO(table_html))[0]
+    if not df.empty:
+        df.columns = df.iloc[0]
+        df = df[1:]
+    return df.to_markdown(index=False)
+
+
+def pandas_supported(table_html: str) -> bool:
+    try:
+        pandas_table_to_markdown(table_html)
+        return True
+    except (ValueError, ImportError):
+        return False
+
+
+def check_columns(table_html: str, markdown: str):
+    lines = markdown.split('\n')
+    counts = {line.replace('\\|', '').count('|') for line in lines}
+    if len(counts) != 1:
+        raise AssertionError(f"Markdown 表格各行列数不一致：\n{table_html}\n{markdown}")
+
+
+def time_call(function: Callable[[str], str], tables: List[str], repeat: int) -> float:
+    """返回 repeat 次转换全部表格中最快一次的耗时（秒）。"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for table in tables:
+            function(table)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML 表格转 Markdown 基准测试')
+    parser.add_argument('--tables', type=int, default=500, help='合成表格数')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='把报告另存为 JSON')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    tables = [synthetic_table(rng) for _ in range(args.tables)]
+    for table in tables:
+        check_columns(table, html_table_to_markdown(table))
+
+    report = {'tables': len(tables)}
+    if pd is None:
+        print("未安装 pandas，跳过原实现的对比")
+    else:
+        try:
+            # read_html 需要 lxml，to_markdown 需要 tabulate
+            pd.read_html(StringIO('<table><tr><td>1</td></tr></table>'))[0].to_markdown()
+        except ImportError as e:
+            print(f"pandas 实现不可用（{e}），跳过原实现的对比")
+        else:
+            supported = [table for table in tables if pandas_supported(table)]
+            report['pandas_failed'] = len(tables) - len(supported)
+            tables = supported
+            pandas_seconds = time_call(pandas_table_to_markdown, tables, args.repeat)
+            report['pandas_ms'] = round(pandas_seconds / len(tables) * 1000, 3)
+    parser_seconds = time_call(html_table_to_markdown, tables, args.repeat)
+    report['html_parser_ms'] = round(parser_seconds / len(tables) * 1000, 3)
+    line = f"{report['tables']} 个表格：html.parser 实现 {report['html_parser_ms']} ms/表"
+    if 'pandas_ms' in report:
+        report['speedup'] = round(pandas_seconds / parser_seconds, 1)
+        line += (f"，pandas 实现 {report['pandas_ms']} ms/表（{report['pandas_failed']} 个表格转换失败），"
+                 f"加速 {report['speedup']}x")
+    print(line + "（各行列数一致）")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"报告已保存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+INT8 量化模式的精度、耗时和内存报告：fp32 对比 INT8。
+
+- 布局检测：fp32 ONNX 模型对比 scripts/calibrate_int8.py 得到的静态量化模型，
+  报告吞吐量、模型加载和推理的峰值内存增长、模型文件大小，以及以 fp32 为基准的检测框一致性
+- 阅读顺序：LayoutLMv3 fp32 对比线性层动态量化，两者使用同一组框（fp32 检测结果经 IoU 过滤后），
+  报告每页耗时、内存，以及阅读顺序完全一致的页面比例和成对顺序一致率（Kendall 一致率）
+每种精度在独立的子进程中运行，以便分别统计峰值常驻内存。
+
+用法：
+    python scripts/benchmark_int8.py --inputs tests/test_data/demo1.pdf tests/test_data/gae.pdf --pages 16
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from benchmark_layout_onnx import compare_detections, create_detector, load_pages, run_backend
+
+DEFAULT_ONNX = os.path.join(PROJECT_ROOT, 'data', 'models', 'structure',
+                            'doclayout_yolo_docstructbench_imgsz1280_2501.onnx')
+
+
+def _peak_rss_mb() -> float:
+    # Linux 下 ru_maxrss 以 KB 为单位
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_variant(variant: str, args) -> Dict:
+    """在当前进程中运行一种精度，返回检测结果、阅读顺序以及耗时和内存统计。"""
+    from srcProject.config.settings import READ_WEIGHTS_PATH, QUANTIZED_LAYOUT_PATH
+    from srcProject.models.layout_reader import LayoutReader
+    from srcProject.utlis.aftertreatment import batch_preprocess_detections
+
+    pages = load_pages(args.inputs, args.pages)
+    layout_path = args.onnx if variant == 'fp32' else (args.int8 or QUANTIZED_LAYOUT_PATH)
+    rss_before = _peak_rss_mb()
+    detector = create_detector('doclayout_yolo_onnx', layout_path, 'cpu')
+    rss_loaded = _peak_rss_mb()
+    layout = run_backend(detector, pages, args.batch_size, args.repeat)
+    result = {
+        'variant': variant,
+        'layout': {
+            'pages_per_second': round(layout['pages_per_second'], 2),
+            'model_mb': round(os.path.getsize(layout_path) / 2 ** 20, 1),
+            'load_rss_mb': round(rss_loaded - rss_before, 1),
+            'inference_rss_mb': round(_peak_rss_mb() - rss_loaded, 1),
+        },
+        'detections': layout['detections'],
+    }
+    del detector
+
+    if variant == 'fp32':
+        # 阅读顺序的输入与流水线相同：带页面尺寸的检测结果经 IoU 过滤
+        for page, page_detections in zip(pages, layout['detections']):
+            for detection in page_detections:
+                detection['page_size'] = (page.shape[1], page.shape[0])
+        boxes = [page for page in batch_preprocess_detections(layout['detections'], iou_threshold=0.05) if page]
+        with open(args.boxes_file, 'w', encoding='utf-8') as f:
+            json.dump(boxes, f)
+    else:
+        with open(args.boxes_file, 'r', encoding='utf-8') as f:
+            boxes = json.load(f)
+
+    rss_before = _peak_rss_mb()
+    reader = LayoutReader(READ_WEIGHTS_PATH, 'cpu', quantize=variant == 'int8')
+    rss_loaded = _peak_rss_mb()
+    reader.batch_predict(boxes[:1])
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        orders = reader.batch_predict(boxes)
+    elapsed = time.perf_counter() - start
+    result['reading_order'] = {
+        'ms_per_page': round(elapsed / max(1, len(boxes) * args.repeat) * 1000, 2),
+        'load_rss_mb': round(rss_loaded - rss_before, 1),
+        'inference_rss_mb': round(_peak_rss_mb() - rss_loaded, 1),
+    }
+    result['orders'] = orders
+    return result
+
+
+def compare_orders(reference: List[List[int]], candidate: List[List[int]]) -> Dict:
+    """阅读顺序完全一致的页面比例，以及所有页面上成对先后关系一致的比例。"""
+    exact = concordant = pairs = 0
+    for order_a, order_b in zip(reference, candidate):
+        exact += order_a == order_b
+        order_a, order_b = np.asarray(order_a), np.asarray(order_b)
+        upper = np.triu_indices(len(order_a), k=1)
+        agree = np.sign(order_a[:, None] - order_a[None, :]) == np.sign(order_b[:, None] - order_b[None, :])
+        concordant += int(agree[upper].sum())
+        pairs += len(upper[0])
+    return {
+        'exact_pages': f"{exact}/{len(reference)}",
+        'pairwise_agreement': round(concordant / pairs, 4) if pairs else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='INT8 量化模式的精度、耗时和内存报告')
+    parser.add_argument('--inputs', nargs='+', default=[os.path.join(PROJECT_ROOT, 'tests', 'test_data', 'demo1.pdf')])
+    parser.add_argument('--pages', type=int, default=8)
+    parser.add_argument('--onnx', default=DEFAULT_ONNX, help='fp32 ONNX 模型')
+    parser.add_argument('--int8', default=None, help='INT8 ONNX 模型，默认为 configs.yaml 中 quantization.layout_path')
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--match-iou', type=float, default=0.9, help='视为同一个框的 IoU 下限')
+    parser.add_argument('--output', default=None, help='把报告另存为 JSON')
+    parser.add_argument('--variant', choices=['fp32', 'int8'], help="只运行一种精度（供子进程使用）")
+    parser.add_argument('--boxes-file', default=None, help="阅读顺序输入框的交换文件（供子进程使用）")
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args)))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        boxes_file = os.path.join(work_dir, 'boxes.json')
+        for variant in ('fp32', 'int8'):
+            command = [sys.executable, os.path.abspath(__file__), '--variant', variant, '--boxes-file', boxes_file,
+                       '--inputs', *args.inputs, '--pages', str(args.pages), '--onnx', args.onnx,
+                       '--batch-size', str(args.batch_size), '--repeat', str(args.repeat)]
+            if args.int8:
+                command += ['--int8', args.int8]
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+            results[variant] = json.loads(output.strip().splitlines()[-1])
+
+    fp32, int8 = results['fp32'], results['int8']
+    report = {
+        'layout': {
+            'fp32': fp32['layout'],
+            'int8': int8['layout'],
+            'speedup': round(int8['layout']['pages_per_second'] / fp32['layout']['pages_per_second'], 2),
+            'agreement': compare_detections(fp32['detections'], int8['detections'], args.match_iou),
+        },
+        'reading_order': {
+            'fp32': fp32['reading_order'],
+            'int8': int8['reading_order'],
+            'speedup': round(fp32['reading_order']['ms_per_page'] / max(int8['reading_order']['ms_per_page'], 1e-6), 2),
+            'agreement': compare_orders(fp32['orders'], int8['orders']),
+        },
+    }
+    for stage, title in (('layout', '布局检测'), ('reading_order', '阅读顺序')):
+        print(f"== {title} ==")
+        for key in ('fp32', 'int8'):
+            print(f"  {key}: {report[stage][key]}")
+        print(f"  加速 {report[stage]['speedup']}x，与 fp32 的一致性: {report[stage]['agreement']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"报告已保存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
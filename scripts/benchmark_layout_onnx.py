@@ -0,0 +1,137 @@
+"""
+布局检测后端的基准测试：torch (doclayout_yolo) 对比 ONNX Runtime (doclayout_yolo_onnx)。
+
+在同一组页面上分别运行两个后端，报告吞吐量（页/秒），并以 torch 结果为基准检查 ONNX 输出是否一致：
+同类别且 IoU >= --match-iou 的框视为匹配，统计匹配率、分数和坐标的最大偏差。
+
+用法：
+    python scripts/export_layout_onnx.py
+    python scripts/benchmark_layout_onnx.py --inputs tests/test_data/demo1.pdf --pages 8 --batch-size 4
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+DEFAULT_WEIGHTS = os.path.join(PROJECT_ROOT, 'data', 'models', 'structure',
+                               'doclayout_yolo_docstructbench_imgsz1280_2501.pt')
+
+
+def load_pages(inputs: List[str], max_pages: int) -> List[np.ndarray]:
+    """按流水线的方式取出前 max_pages 页的 RGB 数组（PDF 以 PDF_RENDER_DPI 渲染）。"""
+    from srcProject.data_loaders.multi_file_dataset import MultiFileDataset
+
+    dataset = MultiFileDataset(inputs)
+    pages = [np.asarray(dataset[index]['image']) for index in range(min(max_pages, len(dataset)))]
+    dataset.close()
+    return pages
+
+
+def create_detector(backend: str, path: str, device: str):
+    from srcProject.models.model_manager import ModelFactory
+
+    return ModelFactory.create(model_name=backend, model_Path=path, device=device)
+
+
+def run_backend(detector, pages: List[np.ndarray], batch_size: int, repeat: int) -> Dict:
+    """预热一次后重复运行 repeat 轮，返回吞吐量和最后一轮的检测结果。"""
+    detector.batch_predict(pages[:batch_size], batch_size=batch_size)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        detections = detector.batch_predict(list(pages), batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return {
+        'pages_per_second': len(pages) * repeat / elapsed,
+        'ms_per_page': elapsed / (len(pages) * repeat) * 1000,
+        'detections': detections,
+    }
+
+
+def _iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def compare_detections(reference: List[List[Dict]], candidate: List[List[Dict]], match_iou: float) -> Dict:
+    """
+    以 reference 为基准逐页贪心匹配 candidate 的检测框（同类别，按 IoU 从高到低）。
+    返回匹配率（召回 / 精确）、匹配框的最大分数偏差和最大坐标偏差（像素）。
+    """
+    matched = reference_total = candidate_total = 0
+    max_score_diff = max_coord_diff = 0.0
+    for reference_page, candidate_page in zip(reference, candidate):
+        reference_total += len(reference_page)
+        candidate_total += len(candidate_page)
+        if not reference_page or not candidate_page:
+            continue
+        boxes_a = np.array([det['poly'][:2] + det['poly'][4:6] for det in reference_page], dtype=np.float64)
+        boxes_b = np.array([det['poly'][:2] + det['poly'][4:6] for det in candidate_page], dtype=np.float64)
+        classes_a = np.array([det['category_id'] for det in reference_page])
+        classes_b = np.array([det['category_id'] for det in candidate_page])
+        iou = _iou_matrix(boxes_a, boxes_b)
+        iou[classes_a[:, None] != classes_b[None, :]] = 0
+        used_a, used_b = set(), set()
+        for flat in np.argsort(-iou, axis=None):
+            i, j = np.unravel_index(flat, iou.shape)
+            if iou[i, j] < match_iou:
+                break
+            if i in used_a or j in used_b:
+                continue
+            used_a.add(i)
+            used_b.add(j)
+            matched += 1
+            max_score_diff = max(max_score_diff, abs(reference_page[i]['score'] - candidate_page[j]['score']))
+            max_coord_diff = max(max_coord_diff, float(np.abs(boxes_a[i] - boxes_b[j]).max()))
+    return {
+        'recall': matched / reference_total if reference_total else 1.0,
+        'precision': matched / candidate_total if candidate_total else 1.0,
+        'reference_boxes': reference_total,
+        'candidate_boxes': candidate_total,
+        'max_score_diff': round(max_score_diff, 3),
+        'max_coord_diff': round(max_coord_diff, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='布局检测 torch / ONNX Runtime 基准测试')
+    parser.add_argument('--inputs', nargs='+', default=[os.path.join(PROJECT_ROOT, 'tests', 'test_data', 'demo1.pdf')])
+    parser.add_argument('--pages', type=int, default=8, help='参与测试的页数')
+    parser.add_argument('--weights', default=DEFAULT_WEIGHTS, help='.pt 权重路径')
+    parser.add_argument('--onnx', default=None, help='.onnx 模型路径，默认与权重同名')
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--match-iou', type=float, default=0.9, help='视为同一个框的 IoU 下限')
+    args = parser.parse_args()
+
+    pages = load_pages(args.inputs, args.pages)
+    print(f"共 {len(pages)} 页，批大小 {args.batch_size}，重复 {args.repeat} 轮")
+    backends = [('doclayout_yolo', args.weights),
+                ('doclayout_yolo_onnx', args.onnx or os.path.splitext(args.weights)[0] + '.onnx')]
+    results = {}
+    for backend, path in backends:
+        detector = create_detector(backend, path, args.device)
+        results[backend] = run_backend(detector, pages, args.batch_size, args.repeat)
+        print(f"{backend:>20}: {results[backend]['pages_per_second']:7.2f} 页/秒 "
+              f"({results[backend]['ms_per_page']:.1f} ms/页)")
+        del detector
+
+    baseline, candidate = results['doclayout_yolo'], results['doclayout_yolo_onnx']
+    print(f"ONNX Runtime 相对 torch 加速 {candidate['pages_per_second'] / baseline['pages_per_second']:.2f}x")
+    print(f"输出一致性（以 torch 为基准）: "
+          f"{compare_detections(baseline['detections'], candidate['detections'], args.match_iou)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+页面像素传递方式的基准测试：渲染 → 检测输入 → 区域裁剪。
+
+对比两种方式：
+- pil：get_page_image 构造 PIL Image（拷贝 Pixmap 像素），检测前转换为 BGR 连续数组（再拷贝一次，
+       与 YOLO 处理 PIL 输入的方式相同），用 PIL crop 裁剪区域；
+- array：get_page_array 把像素拷贝进复用的页面缓冲池，检测输入为反转通道的视图，裁剪只拷贝区域像素。
+每种方式在独立的子进程中运行，以便分别统计峰值常驻内存。
+
+用法：
+    python scripts/benchmark_page_buffers.py --pdf tests/test_data/AlphaGo_Zero.pdf --dpi 300 --repeat 3
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+# 每页模拟的检测区域：把页面切成 4 x 3 的网格
+GRID_COLUMNS, GRID_ROWS = 3, 4
+
+
+def _grid_boxes(width: int, height: int):
+    cell_w, cell_h = width // GRID_COLUMNS, height // GRID_ROWS
+    return [[c * cell_w, r * cell_h, (c + 1) * cell_w, (r + 1) * cell_h]
+            for r in range(GRID_ROWS) for c in range(GRID_COLUMNS)]
+
+
+def run_mode(mode: str, pdf_path: str, dpi: int, repeat: int) -> dict:
+    """在当前进程中运行一种方式，返回耗时和内存统计。"""
+    from srcProject.data_loaders.page_buffer import PageBufferPool
+    from srcProject.data_loaders.pdf_dataset import PDFDataset
+    from srcProject.utlis.aftertreatment import crop_image_region
+
+    dataset = PDFDataset(pdf_path)
+    buffer_pool = PageBufferPool(max_buffers=1) if mode == 'array' else None
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    checksum = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page_index in range(len(dataset)):
+            if mode == 'pil':
+                image = dataset.get_page_image(page_index, dpi=dpi)
+                model_input = np.ascontiguousarray(np.asarray(image)[:, :, ::-1])
+                width, height = image.size
+            else:
+                image = dataset.get_page_array(page_index, dpi=dpi, buffer_pool=buffer_pool)
+                # 与 DocLayoutYOLO._to_model_input 相同（这里不导入模型依赖）：反转通道顺序的视图
+                model_input = image[..., 2::-1]
+                height, width = image.shape[:2]
+            checksum += int(model_input[height // 2, width // 2, 0])
+            for bbox in _grid_boxes(width, height):
+                crop = crop_image_region(image, bbox)
+                checksum += crop.width
+            if buffer_pool is not None:
+                buffer_pool.release(image)
+            del image, model_input
+    elapsed = time.perf_counter() - start
+    pages = len(dataset) * repeat
+    result = {
+        'mode': mode,
+        'pages': pages,
+        'seconds': round(elapsed, 3),
+        'ms_per_page': round(elapsed / pages * 1000, 2),
+        # Linux 下 ru_maxrss 以 KB 为单位
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'rss_growth_mb': round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024, 1),
+        'checksum': checksum,
+    }
+    if buffer_pool is not None:
+        result['buffer_pool'] = buffer_pool.stats()
+    dataset.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="页面像素传递方式基准测试")
+    parser.add_argument('--pdf', default=os.path.join(PROJECT_ROOT, 'tests', 'test_data', 'AlphaGo_Zero.pdf'))
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--mode', choices=['pil', 'array'], help="只运行一种方式（供子进程使用）")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.pdf, args.dpi, args.repeat)))
+        return
+
+    results = []
+    for mode in ('pil', 'array'):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--mode', mode, '--pdf', args.pdf,
+             '--dpi', str(args.dpi), '--repeat', str(args.repeat)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    for result in results:
+        print(f"{result['mode']:>5}: {result['ms_per_page']:8.2f} ms/页  峰值内存 {result['peak_rss_mb']:8.1f} MB"
+              f"  (增长 {result['rss_growth_mb']:.1f} MB)")
+    baseline, optimized = results
+    if baseline['checksum'] != optimized['checksum']:
+        print("警告：两种方式的结果不一致")
+    print(f"耗时降低 {(1 - optimized['seconds'] / baseline['seconds']) * 100:.1f}%，"
+          f"峰值内存降低 {baseline['peak_rss_mb'] - optimized['peak_rss_mb']:.1f} MB")
+    if 'buffer_pool' in optimized:
+        print(f"页面缓冲池: {optimized['buffer_pool']}")
+
+
+if __name__ == '__main__':
+    main()
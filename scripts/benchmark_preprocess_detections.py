@@ -0,0 +1,134 @@
+"""
+检测结果重叠过滤（preprocess_detections）的基准测试：逐对循环的原实现对比空间索引实现。
+
+在合成页面上生成 50~2000 个框：版面网格中的文本块、嵌套在大框里的小框、轻微偏移的重复框，
+坐标取整后有大量面积相同的框，覆盖排序中的并列情况。每种规模先确认两种实现的输出完全一致，再报告耗时。
+
+用法：
+    python scripts/benchmark_preprocess_detections.py --sizes 50 200 500 1000 2000 --repeat 3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from srcProject.config.constants import FilterCategories_VALUES
+from srcProject.utlis.aftertreatment import poly_to_bbox, compute_area, compute_iou, is_contained, \
+    preprocess_detections
+
+PAGE_WIDTH, PAGE_HEIGHT = 2480, 3508 # A4 @ 300 DPI
+
+
+def preprocess_detections_reference(detections: List[Dict[str, Any]], iou_threshold: float = 0.5):
+    """原实现（逐对调用 is_contained 和 compute_iou），作为一致性基准。"""
+    valid_detections = [det for det in detections if det['category_id'] not in FilterCategories_VALUES]
+    if not valid_detections:
+        return []
+    boxes = [poly_to_bbox(det['poly']) for det in valid_detections]
+    areas = [compute_area(box) for box in boxes]
+    keep = [True] * len(valid_detections)
+    indices = np.argsort([-area for area in areas])
+    for i in range(len(valid_detections)):
+        if not keep[indices[i]]:
+            continue
+        box_i = boxes[indices[i]]
+        for j in range(i + 1, len(valid_detections)):
+            if not keep[indices[j]]:
+                continue
+            box_j = boxes[indices[j]]
+            if is_contained(box_j, box_i):
+                keep[indices[j]] = False
+                continue
+            if compute_iou(box_i, box_j) > iou_threshold:
+                keep[indices[j]] = False
+    return [det for i, det in enumerate(valid_detections) if keep[i]]
+
+
+def synthetic_page(count: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """生成一页 count 个检测结果：约一半为网格文本块，其余为嵌套框和偏移的重复框。"""
+    boxes = []
+    columns = max(1, int(np.sqrt(count / 2)))
+    cell_w, cell_h = PAGE_WIDTH / columns, PAGE_HEIGHT / columns
+    for index in range(count // 2):
+        row, column = divmod(index, columns)
+        x0, y0 = column * cell_w, (row % columns) * cell_h
+        boxes.append([x0 + 10, y0 + 10, x0 + cell_w - 10, y0 + cell_h * rng.uniform(0.3, 0.95)])
+    while len(boxes) < count:
+        x0, y0, x1, y1 = boxes[rng.integers(len(boxes))]
+        if rng.random() < 0.5:
+            # 嵌套的小框
+            w, h = (x1 - x0) * rng.uniform(0.2, 0.9), (y1 - y0) * rng.uniform(0.2, 0.9)
+            nx0, ny0 = x0 + rng.uniform(0, x1 - x0 - w), y0 + rng.uniform(0, y1 - y0 - h)
+            boxes.append([nx0, ny0, nx0 + w, ny0 + h])
+        else:
+            # 轻微偏移的重复框
+            dx, dy = rng.normal(0, 25, 2)
+            boxes.append([x0 + dx, y0 + dy, x1 + dx, y1 + dy])
+    detections = []
+    for x0, y0, x1, y1 in boxes:
+        x0, y0, x1, y1 = int(x0), int(y0), int(x1), int(y1)
+        detections.append({
+            'category_id': int(rng.integers(10)),
+            'poly': [x0, y0, x1, y0, x1, y1, x0, y1],
+            'score': round(float(rng.uniform(0.3, 1.0)), 3),
+        })
+    return detections
+
+
+def time_call(function, detections, iou_threshold: float, repeat: int) -> float:
+    """返回 repeat 次调用中最快一次的耗时（秒）。"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(detections, iou_threshold)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='preprocess_detections 基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 500, 1000, 2000])
+    parser.add_argument('--iou', type=float, default=0.05, help='与流水线相同的 IoU 阈值')
+    parser.add_argument('--pages', type=int, default=3, help='每种规模生成的页数')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='把报告另存为 JSON')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    report = []
+    for size in args.sizes:
+        pages = [synthetic_page(size, rng) for _ in range(args.pages)]
+        for page in pages:
+            expected = preprocess_detections_reference(page, args.iou)
+            actual = preprocess_detections(page, args.iou)
+            if [id(det) for det in actual] != [id(det) for det in expected]:
+                raise AssertionError(f"{size} 个框时两种实现的输出不一致")
+        reference = sum(time_call(preprocess_detections_reference, page, args.iou, args.repeat) for page in pages)
+        vectorized = sum(time_call(preprocess_detections, page, args.iou, args.repeat) for page in pages)
+        row = {
+            'boxes': size,
+            'kept': round(float(np.mean([len(preprocess_detections(page, args.iou)) for page in pages])), 1),
+            'reference_ms': round(reference / len(pages) * 1000, 2),
+            'vectorized_ms': round(vectorized / len(pages) * 1000, 2),
+            'speedup': round(reference / vectorized, 1),
+        }
+        report.append(row)
+        print(f"{size:>5} 个框：保留 {row['kept']}，原实现 {row['reference_ms']} ms/页，"
+              f"空间索引实现 {row['vectorized_ms']} ms/页，加速 {row['speedup']}x（输出一致）")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"报告已保存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
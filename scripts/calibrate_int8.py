@@ -0,0 +1,135 @@
+"""
+在 tests/test_data 上校准并导出静态量化（INT8）的布局检测 ONNX 模型，供 configs.yaml 的 quantization 模式使用。
+
+流程：
+1. 以与推理相同的方式（PDF 按 PDF_RENDER_DPI 渲染、letterbox 预处理）准备校准页面
+2. onnxruntime.quantization.quant_pre_process 做形状推断和图优化
+3. quantize_static 以 QDQ 格式量化：权重按通道 INT8，激活按校准得到的范围 UINT8；
+   检测头（最后一个模块）默认保持 fp32，框坐标和分数对量化误差最敏感
+阅读顺序模型（LayoutLMv3）使用动态量化，加载时完成，不需要校准。
+
+用法：
+    python scripts/export_layout_onnx.py
+    python scripts/calibrate_int8.py --max-pages 32
+精度、耗时和内存的对比见 scripts/benchmark_int8.py。
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from typing import List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+DEFAULT_ONNX = os.path.join(PROJECT_ROOT, 'data', 'models', 'structure',
+                            'doclayout_yolo_docstructbench_imgsz1280_2501.onnx')
+DEFAULT_DATA = os.path.join(PROJECT_ROOT, 'tests', 'test_data')
+
+
+def load_calibration_pages(data_dir: str, max_pages: int) -> List[np.ndarray]:
+    """从目录中的 PDF 和图片均匀抽取最多 max_pages 页，返回 RGB 数组。"""
+    from srcProject.data_loaders.multi_file_dataset import MultiFileDataset
+
+    dataset = MultiFileDataset(data_dir)
+    step = max(1, len(dataset) // max_pages)
+    page_indices = list(range(0, len(dataset), step))[:max_pages]
+    pages = [np.asarray(dataset[index]['image'].convert('RGB')) for index in page_indices]
+    dataset.close()
+    return pages
+
+
+class LetterboxCalibrationReader:
+    """
+    onnxruntime.quantization 的校准数据读取器（实现 get_next 即可），逐页产出 letterbox 后的模型输入。
+    动态尺寸模型与推理时一样只填充到 stride 的整数倍。
+    """
+    def __init__(self, model_path: str, pages: List[np.ndarray]):
+        import onnxruntime as ort
+        from srcProject.config.constants import LAYOUT_SETTING_IMGSIZE
+
+        session = ort.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+        model_input = session.get_inputs()[0]
+        self.input_name = model_input.name
+        _, _, height, width = model_input.shape
+        self.dynamic_shape = not (isinstance(height, int) and isinstance(width, int))
+        self.imgsz = (LAYOUT_SETTING_IMGSIZE, LAYOUT_SETTING_IMGSIZE) if self.dynamic_shape else (height, width)
+        self.pages = pages
+        self._index = 0
+
+    def get_next(self):
+        from srcProject.models.layout_detector_onnx import letterbox_batch
+
+        if self._index >= len(self.pages):
+            return None
+        page = self.pages[self._index]
+        self._index += 1
+        return {self.input_name: letterbox_batch([page], self.imgsz, auto=self.dynamic_shape)}
+
+    def rewind(self):
+        self._index = 0
+
+
+def head_node_names(model_path: str) -> List[str]:
+    """返回检测头（节点名前缀 /model.<最大序号>/ 的模块）中的节点名。"""
+    import onnx
+
+    model = onnx.load(model_path, load_external_data=False)
+    pattern = re.compile(r'^/model\.(\d+)/')
+    indices = [int(match.group(1)) for node in model.graph.node if (match := pattern.match(node.name))]
+    if not indices:
+        return []
+    prefix = f'/model.{max(indices)}/'
+    return [node.name for node in model.graph.node if node.name.startswith(prefix)]
+
+
+def calibrate(model_path: str, output: str, pages: List[np.ndarray], quantize_head: bool = False,
+              method: str = 'minmax') -> str:
+    """静态量化 ONNX 模型并返回输出路径。"""
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    calibrate_methods = {'minmax': CalibrationMethod.MinMax, 'entropy': CalibrationMethod.Entropy,
+                         'percentile': CalibrationMethod.Percentile}
+    with tempfile.TemporaryDirectory() as work_dir:
+        prepared = os.path.join(work_dir, 'prepared.onnx')
+        quant_pre_process(model_path, prepared)
+        excluded = [] if quantize_head else head_node_names(prepared)
+        print(f"校准页数 {len(pages)}，保持 fp32 的检测头节点 {len(excluded)} 个")
+        quantize_static(
+            prepared, output,
+            calibration_data_reader=LetterboxCalibrationReader(prepared, pages),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method=calibrate_methods[method],
+            nodes_to_exclude=excluded,
+        )
+    return output
+
+
+def main():
+    from srcProject.config.settings import QUANTIZED_LAYOUT_PATH
+
+    parser = argparse.ArgumentParser(description='校准并导出 INT8 布局检测模型')
+    parser.add_argument('--onnx', default=DEFAULT_ONNX, help='fp32 ONNX 模型（scripts/export_layout_onnx.py 导出）')
+    parser.add_argument('--output', default=QUANTIZED_LAYOUT_PATH, help='INT8 模型输出路径，默认为 configs.yaml 中的路径')
+    parser.add_argument('--data', default=DEFAULT_DATA, help='校准数据目录')
+    parser.add_argument('--max-pages', type=int, default=32)
+    parser.add_argument('--method', choices=['minmax', 'entropy', 'percentile'], default='minmax')
+    parser.add_argument('--quantize-head', action='store_true', help='检测头也量化（更快，但框和分数误差更大）')
+    args = parser.parse_args()
+
+    pages = load_calibration_pages(args.data, args.max_pages)
+    output = calibrate(args.onnx, args.output, pages, quantize_head=args.quantize_head, method=args.method)
+    print(f"已导出 INT8 模型: {output}（{os.path.getsize(output) / 2 ** 20:.1f} MB，"
+          f"fp32 模型 {os.path.getsize(args.onnx) / 2 ** 20:.1f} MB）")
+
+
+if __name__ == '__main__':
+    main()
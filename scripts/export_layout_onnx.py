@@ -0,0 +1,76 @@
+"""
+把 DocLayoutYOLO 的 .pt 权重导出为 ONNX 模型，供 doclayout_yolo_onnx 后端（ONNX Runtime）使用。
+
+默认导出动态批大小和动态尺寸的模型：整批推理，且与 torch 路径一样只把页面填充到 stride 的整数倍。
+导出完成后用 ONNX Runtime 加载一次，确认模型可用。
+
+用法：
+    python scripts/export_layout_onnx.py
+    python scripts/export_layout_onnx.py --weights data/models/structure/xxx.pt --output data/models/structure/xxx.onnx
+然后在 configs.yaml 中把 layout_model 的 name 改为 doclayout_yolo_onnx，path 指向导出的 .onnx 文件。
+"""
+import argparse
+import os
+import shutil
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from srcProject.config.constants import LAYOUT_SETTING_IMGSIZE
+
+DEFAULT_WEIGHTS = os.path.join(PROJECT_ROOT, 'data', 'models', 'structure',
+                               'doclayout_yolo_docstructbench_imgsz1280_2501.pt')
+
+
+def export_onnx(weights: str, output: str = None, imgsz: int = LAYOUT_SETTING_IMGSIZE, opset: int = 17,
+                dynamic: bool = True, simplify: bool = False) -> str:
+    """
+    导出 ONNX 模型并返回其路径。
+    Args:
+        weights: .pt 权重路径。
+        output: 输出路径，默认与权重同目录、同名的 .onnx 文件。
+        imgsz: 模型输入尺寸；动态尺寸时为推理时的默认长边。
+        dynamic: 是否导出动态批大小和动态尺寸。
+    """
+    from doclayout_yolo import YOLOv10
+
+    model = YOLOv10(weights)
+    exported = model.export(format='onnx', imgsz=imgsz, opset=opset, dynamic=dynamic, simplify=simplify)
+    output = output or os.path.splitext(weights)[0] + '.onnx'
+    if os.path.abspath(exported) != os.path.abspath(output):
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        shutil.move(exported, output)
+    return output
+
+
+def check_onnx(path: str):
+    """用 ONNX Runtime 加载导出的模型，打印输入输出信息。"""
+    import onnxruntime as ort
+
+    session = ort.InferenceSession(path, providers=['CPUExecutionProvider'])
+    for model_input in session.get_inputs():
+        print(f"输入 {model_input.name}: {model_input.shape} {model_input.type}")
+    for model_output in session.get_outputs():
+        print(f"输出 {model_output.name}: {model_output.shape} {model_output.type}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导出 DocLayoutYOLO ONNX 模型')
+    parser.add_argument('--weights', default=DEFAULT_WEIGHTS, help='.pt 权重路径')
+    parser.add_argument('--output', default=None, help='输出 .onnx 路径，默认与权重同名')
+    parser.add_argument('--imgsz', type=int, default=LAYOUT_SETTING_IMGSIZE)
+    parser.add_argument('--opset', type=int, default=17)
+    parser.add_argument('--static', action='store_true', help='导出固定批大小（1）和固定输入尺寸的模型')
+    parser.add_argument('--simplify', action='store_true', help='使用 onnxslim 简化计算图')
+    args = parser.parse_args()
+
+    output = export_onnx(args.weights, args.output, imgsz=args.imgsz, opset=args.opset,
+                         dynamic=not args.static, simplify=args.simplify)
+    print(f"已导出 ONNX 模型: {output}")
+    check_onnx(output)
+
+
+if __name__ == '__main__':
+    main()
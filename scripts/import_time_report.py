@@ -0,0 +1,117 @@
+"""
+启动耗时报告：用 python -X importtime 在全新的解释器中导入各入口模块，对照导入预算检查。
+
+预算（best-of-repeat 的累计导入耗时，参考机器为没有 GPU 的普通 x86 CPU）：
+- srcProject.main_process_sequence   800 ms  流水线入口（Flask 服务、命令行），含 pymupdf、numpy、PIL
+- srcProject.models.model_manager    400 ms  只导入配置和登记表，模型在创建时才导入各自的框架
+- srcProject.models.reader_xy_cut    300 ms  只需要 numpy 和 PIL
+- srcProject.utlis.aftertreatment    300 ms  后处理和 Markdown 表格转换，不依赖 pandas
+除耗时外，以上模块都不允许导入推理框架和 SDK（torch、transformers、doclayout_yolo、onnxruntime、cv2、
+google.genai、openai、pandas、tqdm），它们只在对应的模型或功能第一次使用时导入。
+这一项与机器无关，出现即视为超出预算；没有安装这些包的环境中，违反规则的导入会直接导致导入失败。
+
+用法：
+    python scripts/import_time_report.py --repeat 3 --top 10
+    python scripts/import_time_report.py --modules srcProject.models.reader_xy_cut --budget-scale 2
+退出码为 0 表示全部模块都在预算内。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGETS_MS = {
+    'srcProject.main_process_sequence': 800,
+    'srcProject.models.model_manager': 400,
+    'srcProject.models.reader_xy_cut': 300,
+    'srcProject.utlis.aftertreatment': 300,
+}
+HEAVY_MODULES = ('torch', 'transformers', 'doclayout_yolo', 'onnxruntime', 'cv2', 'google.genai', 'openai',
+                 'pandas', 'tqdm')
+
+
+def measure(module: str) -> List[Dict]:
+    """在新的解释器中导入 module，返回 importtime 的每一行：{'name', 'depth', 'self_us', 'cumulative_us'}。"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = PROJECT_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败：\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append({'name': name.strip(), 'depth': depth,
+                        'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+    return entries
+
+
+def module_entry(entries: List[Dict], module: str) -> Dict:
+    """
+    module 本身的一行。导入时启动的后台线程会继续导入，它不一定是最后一行；
+    importtime 的缩进在线程间共享，它的深度也不一定是 0。
+    """
+    return next(entry for entry in entries if entry['name'] == module)
+
+
+def heavy_imports(entries: List[Dict]) -> List[str]:
+    """导入过程中加载的 HEAVY_MODULES 中的包。"""
+    names = {entry['name'] for entry in entries}
+    return [heavy for heavy in HEAVY_MODULES
+            if any(name == heavy or name.startswith(heavy + '.') for name in names)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='入口模块导入耗时报告')
+    parser.add_argument('--modules', nargs='+', default=list(BUDGETS_MS), help='要测量的模块')
+    parser.add_argument('--repeat', type=int, default=3, help='每个模块导入的次数，取最快一次')
+    parser.add_argument('--top', type=int, default=8, help='列出耗时最多的直接依赖数')
+    parser.add_argument('--budget-scale', type=float, default=1.0, help='按机器性能放宽或收紧预算的系数')
+    parser.add_argument('--output', default=None, help='把报告另存为 JSON')
+    args = parser.parse_args()
+
+    report, within_budget = [], True
+    for module in args.modules:
+        runs = [measure(module) for _ in range(args.repeat)]
+        entries = min(runs, key=lambda run: module_entry(run, module)['cumulative_us'])
+        root = module_entry(entries, module)
+        total_ms = root['cumulative_us'] / 1000
+        budget_ms = BUDGETS_MS.get(module)
+        heavy = heavy_imports(entries)
+        ok = not heavy and (budget_ms is None or total_ms <= budget_ms * args.budget_scale)
+        within_budget &= ok
+        # 比 module 深一级的是它直接导入（并首次加载）的模块
+        children = sorted((entry for entry in entries[:entries.index(root)] if entry['depth'] == root['depth'] + 1),
+                          key=lambda entry: entry['cumulative_us'], reverse=True)[:args.top]
+        row = {
+            'module': module,
+            'total_ms': round(total_ms, 1),
+            'budget_ms': budget_ms * args.budget_scale if budget_ms is not None else None,
+            'heavy_imports': heavy,
+            'within_budget': ok,
+            'top_imports': [{'name': entry['name'], 'cumulative_ms': round(entry['cumulative_us'] / 1000, 1)}
+                            for entry in children],
+        }
+        report.append(row)
+        budget_text = f"预算 {row['budget_ms']:.0f} ms" if budget_ms is not None else "无预算"
+        print(f"{module}：{row['total_ms']} ms（{budget_text}）{'' if ok else '  超出预算'}")
+        if heavy:
+            print(f"    导入了推理框架或 SDK：{', '.join(heavy)}")
+        for entry in row['top_imports']:
+            print(f"    {entry['cumulative_ms']:>8.1f} ms  {entry['name']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"报告已保存到 {args.output}")
+    sys.exit(0 if within_budget else 1)
+
+
+if __name__ == '__main__':
+    main()
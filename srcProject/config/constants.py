@@ -3,6 +3,12 @@ from enum import Enum
 LAYOUT_SETTING_IMGSIZE = 1280
 LAYOUT_SETTING_CONF = 0.3
 LAYOUT_SETTING_IOU = 0.1
+# PDF 页面渲染分辨率，检测结果的像素坐标均以此为准
+PDF_RENDER_DPI = 300
+# 支持的输入文件类型；TIFF 的每一帧作为一页
+PDF_EXTENSIONS = ('.pdf',)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.webp')
+MULTI_FRAME_EXTENSIONS = ('.tif', '.tiff')
 # --- 核心枚举：单一数据源 ---
 class BlockType(Enum):
     TITLE = 0
@@ -52,6 +58,62 @@ OCR_TEXT_VALUES = [member.value for member in OCR_RECOGNITION_TYPES]
 FilterCategories_TYPES = {BlockType.ABANDON, BlockType.FORMULA_CAPTION}
 FilterCategories_VALUES = [member.value for member in FilterCategories_TYPES]
 
+# --- 文本层快速通道：这些类型的区域在原生数字 PDF 中可直接使用文本层文字，无需 OCR ---
+TEXT_LAYER_TYPES = {
+    BlockType.TITLE,
+    BlockType.PLAIN_TEXT,
+    BlockType.FIGURE_CAPTION,
+    BlockType.TABLE_CAPTION,
+    BlockType.TABLE_FOOTNOTE,
+}
+TEXT_LAYER_VALUES = [member.value for member in TEXT_LAYER_TYPES]
+TEXT_LAYER_MIN_COVERAGE = 0.3 # 区域内文本跨度面积占比下限，扫描件区域几乎为 0
+TEXT_LAYER_MIN_CONFIDENCE = 0.98 # 可信字符（非乱码、非数学字体）占比下限
+
+# --- 两级分辨率渲染：整页按检测模型输入尺寸渲染，保留的区域再按以下 DPI 从 PDF 矢量数据重新渲染 ---
+REGION_RENDER_DPI = {
+    BlockType.TITLE: 200,
+    BlockType.PLAIN_TEXT: 200,
+    BlockType.FIGURE: 200,
+    BlockType.FIGURE_CAPTION: 200,
+    BlockType.TABLE: 300,
+    BlockType.TABLE_CAPTION: 200,
+    BlockType.TABLE_FOOTNOTE: 300,
+    BlockType.ISOLATE_FORMULA: 300,
+}
+REGION_RENDER_DPI_DEFAULT = 300
+REGION_TARGET_TEXT_PX = 28 # 有文本层时，按区域内字号中位数选择 DPI，使文字渲染高度约为该像素数
+REGION_MIN_DPI = 150
+REGION_MAX_DPI = 300
+
+# --- 页面色彩空间：黑白文档以单通道灰度渲染，页面内存和 OCR 图片约为 RGB 的 1/3 ---
+COLORSPACE_RGB = 'rgb'
+COLORSPACE_GRAY = 'gray'
+COLORSPACE_AUTO = 'auto' # 按页检测，没有有效彩色内容时使用灰度
+COLORSPACE_OPTIONS = (COLORSPACE_RGB, COLORSPACE_GRAY, COLORSPACE_AUTO)
+COLOR_DETECT_DPI = 24 # 自动检测时渲染缩略图的分辨率
+COLOR_PIXEL_MIN_CHROMA = 32 # 通道最大值与最小值之差超过该值的像素视为彩色像素
+COLOR_PAGE_MIN_RATIO = 0.002 # 彩色像素占比低于该值的页面视为黑白页面（忽略零星的彩色链接、标记）
+
+# --- 页面预过滤：空白页跳过，近似重复页复用已处理页面的结果 ---
+PAGE_FILTER_SAMPLE_SIZE = 512 # 计算墨迹和哈希时降采样后的长边像素数
+PAGE_FILTER_INK_RATIO = 0.6 # 灰度低于背景（中位数）该比例的像素视为墨迹
+BLANK_PAGE_MAX_INK = 0.002 # 墨迹覆盖率低于该值的页面视为空白页
+DUPLICATE_MAX_HASH_DISTANCE = 10 # 感知哈希（64 位）汉明距离上限
+DUPLICATE_MIN_CORRELATION = 0.9 # 内容指纹相关系数下限
+DUPLICATE_MAX_PIXEL_DIFFERENCE = 24 # 内容图（允许 1 像素错位）逐像素灰度差上限，宁可漏判也不把不同页面当作重复页
+DUPLICATE_HISTORY_PAGES = 256 # 近似重复页只和最近这么多个已处理页面比较（每页保留一张内容图）
+
+# --- 自适应批大小：按测得的吞吐量和单页内存选择布局模型每批的页数 ---
+ADAPTIVE_BATCH_MAX_SIZE = 32 # 批大小上限，实际还受一批渲染的页数 max_inflight_pages // (prefetch_depth + 3) 限制
+ADAPTIVE_BATCH_MIN_GAIN = 0.05 # 批大小翻倍后吞吐量提升不足该比例时停止增大
+ADAPTIVE_BATCH_MEMORY_FRACTION = 0.5 # 一批的峰值内存最多占用当前可用内存的比例
+ADAPTIVE_BATCH_SAMPLE_INTERVAL = 0.02 # CPU 上采样进程内存的间隔（秒）
+
+# --- 阅读顺序模型批量推理：页面按框数分桶，同一组的页面补齐后一次前向推理 ---
+READER_LENGTH_BUCKETS = (64, 128, 256, 512) # 序列长度（框数 + [CLS]/[EOS]）的分桶上界
+READER_BATCH_MAX_TOKENS = 8192 # 一次前向推理的 token 数上限（页数 × 桶长度）
+
 # --- 颜色映射 ---
 DEFAULT_COLORS = {
     BlockType.TITLE: (255, 0, 0),
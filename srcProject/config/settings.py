@@ -33,4 +33,41 @@ FLOW_CONFIG = _config_data.get('gpt-api', {})
 FLOW_API_KEY = FLOW_CONFIG.get('api_key', '')
 FLOW_URL = FLOW_CONFIG.get('base_url', '')
 FLOW_API_NAME = FLOW_CONFIG.get('api_name', 'Siliconflow')
-FLOW_USE_MODEL_NAME = FLOW_CONFIG.get('model_name', 'Pro/Qwen/Qwen2.5-VL-7B-Instruct')
\ No newline at end of file
+FLOW_USE_MODEL_NAME = FLOW_CONFIG.get('model_name', 'Pro/Qwen/Qwen2.5-VL-7B-Instruct')
+
+# 流水线配置：页面按批次流式渲染、检测、裁剪后即释放
+PIPELINE_CONFIG = _config_data.get('pipeline') or {}
+MAX_INFLIGHT_PAGES = int(PIPELINE_CONFIG.get('max_inflight_pages', 8))
+# batch_size 为 auto 时由 AdaptiveBatcher 在运行中测量选择。布局模型每次推理的页数不超过一批渲染的页数，
+# 即 MAX_INFLIGHT_PAGES // (PREFETCH_DEPTH + 3)（不预取时为 MAX_INFLIGHT_PAGES），见 layout_prediction
+ADAPTIVE_BATCH_SIZE = str(PIPELINE_CONFIG.get('batch_size', 4)).lower() == 'auto'
+LAYOUT_BATCH_SIZE = MAX_INFLIGHT_PAGES if ADAPTIVE_BATCH_SIZE else int(PIPELINE_CONFIG.get('batch_size', 4))
+RENDER_WORKERS = int(PIPELINE_CONFIG.get('render_workers', 0))
+TEXT_LAYER_ENABLED = bool(PIPELINE_CONFIG.get('text_layer', False))
+RENDER_MODE = PIPELINE_CONFIG.get('render_mode', 'full')
+RENDER_COLORSPACE = PIPELINE_CONFIG.get('colorspace', 'rgb')
+IMAGE_MAX_PIXELS = int(PIPELINE_CONFIG.get('image_max_pixels', 0))
+PAGE_FILTER_ENABLED = bool(PIPELINE_CONFIG.get('page_filter', False))
+PREFETCH_DEPTH = int(PIPELINE_CONFIG.get('prefetch_depth', 0))
+MODEL_WARM_UP = bool(PIPELINE_CONFIG.get('warm_up', False))
+# 已构建的阅读顺序模型和 OCR 客户端的缓存容量（MB），切换回最近用过的模型时不再重新加载
+MODEL_REGISTRY_MEMORY_MB = int(PIPELINE_CONFIG.get('model_registry_mb', 2048))
+
+# 渲染页面缓存配置
+PAGE_CACHE_CONFIG = _config_data.get('page_cache') or {}
+PAGE_CACHE_ENABLED = bool(PAGE_CACHE_CONFIG.get('enabled', False))
+PAGE_CACHE_MEMORY_MB = int(PAGE_CACHE_CONFIG.get('memory_mb', 512))
+PAGE_CACHE_DISK_MB = int(PAGE_CACHE_CONFIG.get('disk_mb', 4096))
+PAGE_CACHE_DIR = os.path.join(BASE_DIR, PAGE_CACHE_CONFIG.get('dir', 'data/cache/pages'))
+
+# 布局检测结果缓存配置
+DETECTION_CACHE_CONFIG = _config_data.get('detection_cache') or {}
+DETECTION_CACHE_ENABLED = bool(DETECTION_CACHE_CONFIG.get('enabled', False))
+DETECTION_CACHE_MAX_ENTRIES = int(DETECTION_CACHE_CONFIG.get('max_entries', 100000))
+DETECTION_CACHE_PATH = os.path.join(BASE_DIR, DETECTION_CACHE_CONFIG.get('path', 'data/cache/detections.sqlite3'))
+
+# INT8 量化推理配置
+QUANTIZATION_CONFIG = _config_data.get('quantization') or {}
+QUANTIZATION_ENABLED = bool(QUANTIZATION_CONFIG.get('enabled', False))
+QUANTIZED_LAYOUT_PATH = os.path.join(BASE_DIR, QUANTIZATION_CONFIG.get(
+    'layout_path', 'data/models/structure/doclayout_yolo_docstructbench_imgsz1280_2501_int8.onnx'))
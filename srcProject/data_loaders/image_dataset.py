@@ -5,4 +5,191 @@ ImageDataset class for:
 - Loading single or multiple image files
 - Preprocessing images for model input
 - Managing image metadata
-"""
\ No newline at end of file
+"""
+import math
+import os
+from typing import List, Dict, Any, Tuple, Iterator, Union, Optional
+import numpy as np
+from PIL import Image, ImageOps
+from srcProject.config.constants import IMAGE_EXTENSIONS, MULTI_FRAME_EXTENSIONS, COLORSPACE_RGB, COLORSPACE_GRAY
+from srcProject.data_loaders.Base_dataset import BaseDataset
+from srcProject.data_loaders.page_cache import PageImageCache, file_content_hash
+from srcProject.utlis.colorspace import check_colorspace, convert_image_colorspace
+
+
+def open_normalized_image(file_path: str, frame: int = 0, max_pixels: int = 0,
+                          colorspace: str = COLORSPACE_RGB) -> Image.Image:
+    """
+    解码一张图片（或多页 TIFF 的一帧）并归一化：
+    - 像素数超过 max_pixels 时，JPEG 借助 draft 直接按 1/2、1/4、1/8 比例解码，不产生全尺寸位图，
+      其余格式解码后再缩小；最终等比缩放到不超过 max_pixels
+    - 按 EXIF 方向旋转，之后的检测坐标、裁剪和可视化都基于旋转后的图像
+    - 按色彩空间设置转换，灰度时 JPEG 直接解码为单通道
+    Args:
+        max_pixels: 像素预算，0 表示不缩放。
+
+    Returns:
+        与文件句柄无关的 PIL Image（RGB 或 L 模式）。
+    """
+    with Image.open(file_path) as image:
+        if frame:
+            image.seek(frame)
+        width, height = image.size
+        scale = math.sqrt(max_pixels / (width * height)) if max_pixels and width * height > max_pixels else 1.0
+        if scale < 1.0 and image.format == 'JPEG':
+            draft_mode = 'L' if colorspace == COLORSPACE_GRAY else image.mode
+            image.draft(draft_mode, (math.ceil(width * scale), math.ceil(height * scale)))
+        image.load()
+        ImageOps.exif_transpose(image, in_place=True)
+        if colorspace == COLORSPACE_GRAY and image.mode != 'L':
+            # 先转灰度再缩放，缩放只需处理单通道
+            image = image.convert('L')
+        if scale < 1.0:
+            width, height = image.size
+            scale = min(math.sqrt(max_pixels / (width * height)), 1.0)
+            if scale < 1.0:
+                image = image.resize((max(1, int(width * scale)), max(1, int(height * scale))),
+                                     Image.Resampling.LANCZOS, reducing_gap=3.0)
+        # convert 返回新图像，与文件句柄无关
+        return convert_image_colorspace(image, colorspace)
+
+
+class ImageDataset(BaseDataset):
+    """
+    图片数据集实现。
+    负责：
+    - 把一张或多张图片（多页 TIFF 的每一帧）组织为页面序列
+    - 构建索引时只读取文件头（尺寸、帧数），像素在 __getitem__ 时才解码
+    - 解码时归一化（按像素预算缩小、按 EXIF 方向旋转、转换色彩空间），
+      归一化结果写入页面缓存，检测、裁剪和可视化共用同一份图像
+    """
+    def __init__(self, file_paths: Union[str, List[str]], colorspace: str = COLORSPACE_RGB,
+                 max_pixels: int = 0, page_cache: Optional[PageImageCache] = None):
+        super().__init__()
+        self.file_paths = [file_paths] if isinstance(file_paths, str) else list(file_paths)
+        self.colorspace = check_colorspace(colorspace)
+        self.max_pixels = max_pixels # 像素预算，0 表示保持原始尺寸
+        self.page_cache = page_cache
+        self._content_hashes = {} # 文件路径 -> 内容哈希，首次写入缓存时计算
+        # 每页对应 (文件路径, 帧序号, (宽, 高))
+        self._pages: List[Tuple[str, int, Tuple[int, int]]] = []
+        for file_path in self.file_paths:
+            self._index_file(file_path)
+
+    def _index_file(self, file_path: str):
+        """读取图片文件头，登记其中的每一页。"""
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension not in IMAGE_EXTENSIONS:
+            raise ValueError(f"文件 {file_path} 不是支持的图片格式。")
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"文件 {file_path} 不存在。")
+        try:
+            with Image.open(file_path) as image:
+                frame_count = getattr(image, 'n_frames', 1) if extension in MULTI_FRAME_EXTENSIONS else 1
+                for frame in range(frame_count):
+                    if frame:
+                        image.seek(frame)
+                    self._pages.append((file_path, frame, image.size))
+        except Exception as e:
+            raise IOError(f"无法打开或读取图片文件 {file_path}: {e}")
+
+    def __len__(self) -> int:
+        """返回页面总数（多页 TIFF 按帧计数）。"""
+        return len(self._pages)
+
+    def __getitem__(self, page_index: int) -> Dict[str, Any]:
+        """
+        解码并返回一页。
+
+        Returns:
+            Dict[str, Any]: {'image': PIL.Image, 'page_size': (w, h), 'page_index': int, 'scale': 1.0,
+                             'colorspace': 'rgb' 或 'gray', 'source': 文件路径, 'frame': 帧序号}
+        """
+        if not (0 <= page_index < len(self)):
+            raise IndexError(f"页码 {page_index} 超出范围。数据集共有 {len(self)} 页。")
+        image = self.get_page_image(page_index)
+        return self._make_page(page_index, image)
+
+    def _make_page(self, page_index: int, image: Union[Image.Image, np.ndarray]) -> Dict[str, Any]:
+        file_path, frame, _ = self._pages[page_index]
+        if isinstance(image, np.ndarray):
+            height, width = image.shape[:2]
+            is_gray = image.ndim == 2
+        else:
+            width, height = image.size
+            is_gray = image.mode == 'L'
+        return {
+            "image": image,
+            "page_size": (int(width), int(height)),
+            "page_index": page_index,
+            "scale": 1.0,
+            "colorspace": COLORSPACE_GRAY if is_gray else COLORSPACE_RGB,
+            "source": file_path,
+            "frame": frame,
+        }
+
+    def _cache_key(self, page_index: int) -> str:
+        file_path, frame, _ = self._pages[page_index]
+        if file_path not in self._content_hashes:
+            self._content_hashes[file_path] = file_content_hash(file_path)
+        return PageImageCache.make_image_key(self._content_hashes[file_path], frame, self.max_pixels, self.colorspace)
+
+    def get_page_array(self, page_index: int) -> np.ndarray:
+        """
+        返回指定页归一化后的像素数组（RGB 为 (H, W, 3)，灰度为 (H, W)）。
+        启用页面缓存时优先取缓存，未命中时解码并写入缓存。
+        """
+        if not (0 <= page_index < len(self)):
+            raise ValueError(f"页码 {page_index} 超出范围。数据集共有 {len(self)} 页。")
+        if self.page_cache is not None:
+            array = self.page_cache.get(self._cache_key(page_index))
+            if array is not None:
+                return array
+        file_path, frame, _ = self._pages[page_index]
+        array = np.asarray(open_normalized_image(file_path, frame, self.max_pixels, self.colorspace))
+        if self.page_cache is not None:
+            self.page_cache.put(self._cache_key(page_index), array)
+        return array
+
+    def get_page_image(self, page_index: int) -> Image.Image:
+        """返回指定页归一化后的 PIL Image（按像素预算缩小、按 EXIF 方向旋转并转换色彩空间）。"""
+        if self.page_cache is None:
+            if not (0 <= page_index < len(self)):
+                raise ValueError(f"页码 {page_index} 超出范围。数据集共有 {len(self)} 页。")
+            file_path, frame, _ = self._pages[page_index]
+            return open_normalized_image(file_path, frame, self.max_pixels, self.colorspace)
+        return Image.fromarray(self.get_page_array(page_index))
+
+    def get_page_dimensions(self, page_index: int) -> Tuple[int, int]:
+        """返回指定页文件中记录的原始像素尺寸 (宽, 高)，不解码像素（未经归一化缩放和旋转）。"""
+        return self._pages[page_index][2]
+
+    def get_page_source(self, page_index: int) -> Tuple[str, int]:
+        """返回指定页所在的文件路径和帧序号。"""
+        file_path, frame, _ = self._pages[page_index]
+        return file_path, frame
+
+    def iter_page_batches(self, batch_size: int, as_array: bool = False, **kwargs) -> Iterator[List[Dict[str, Any]]]:
+        """
+        按批次惰性解码页面，接口与 PDFDataset.iter_page_batches 一致（PDF 专用的参数被忽略）。
+        Args:
+            batch_size: 每批解码的页数。
+            as_array: 为 True 时 'image' 为 uint8 数组（RGB 为 (H, W, 3)，灰度为 (H, W)）。
+
+        Yields:
+            List[Dict[str, Any]]: 一批页面，每项与 __getitem__ 的返回值相同。
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size 必须大于 0，当前为 {batch_size}。")
+        for start in range(0, len(self), batch_size):
+            page_indices = range(start, min(start + batch_size, len(self)))
+            if as_array:
+                page_batch = [self._make_page(page_index, self.get_page_array(page_index)) for page_index in page_indices]
+            else:
+                page_batch = [self[page_index] for page_index in page_indices]
+            yield page_batch
+            del page_batch
+
+    def close(self):
+        """图片在每次解码后即关闭，这里无需释放资源，仅与 PDFDataset 保持接口一致。"""
+        pass
@@ -5,4 +5,150 @@ MultiFileDataset class for:
 - Managing collections of different file types
 - Providing unified interface for mixed document types
 - Coordinating processing across multiple files
-"""
\ No newline at end of file
+"""
+import bisect
+import os
+from typing import List, Dict, Any, Iterator, Optional, Union, Tuple
+from pymupdf import pymupdf
+from srcProject.config.constants import PDF_EXTENSIONS, IMAGE_EXTENSIONS, COLORSPACE_RGB
+from srcProject.data_loaders.Base_dataset import BaseDataset
+from srcProject.data_loaders.image_dataset import ImageDataset
+from srcProject.data_loaders.page_cache import PageImageCache
+from srcProject.data_loaders.pdf_dataset import PDFDataset
+from srcProject.utlis.colorspace import check_colorspace
+
+
+def collect_input_files(inputs: Union[str, List[str]]) -> List[str]:
+    """
+    把单个文件、目录或二者混合的列表展开为按顺序排列的文件列表。
+    目录按文件名排序，只收集支持的 PDF 和图片文件；显式给出的文件必须是支持的类型。
+    """
+    inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                file_path = os.path.join(path, name)
+                if os.path.isfile(file_path) and os.path.splitext(name)[1].lower() in PDF_EXTENSIONS + IMAGE_EXTENSIONS:
+                    files.append(file_path)
+        elif os.path.splitext(path)[1].lower() in PDF_EXTENSIONS + IMAGE_EXTENSIONS:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"文件 {path} 不存在。")
+            files.append(path)
+        else:
+            raise ValueError(f"不支持的文件类型: {os.path.splitext(path)[1].lower()}")
+    return files
+
+
+class MultiFileDataset(BaseDataset):
+    """
+    多文件数据集实现。
+    把目录或 PDF / 图片混合的文件列表组织为一条连续的页面流：
+    - 初始化时只读取每个文件的页数，PDF 文档和图片像素都在访问到对应页时才打开和解码
+    - 同一时间只保持一个 PDF 文档处于打开状态
+    - 每页带有来源元数据：'source'（文件路径）、'source_page'（文件内页码）、'page_index'（全局页码）
+    - 图片在解码时按 max_pixels 像素预算归一化（见 ImageDataset）
+    """
+    def __init__(self, inputs: Union[str, List[str]], page_cache: Optional[PageImageCache] = None,
+                 colorspace: str = COLORSPACE_RGB, max_pixels: int = 0):
+        super().__init__()
+        self._open_index = None
+        self._open_dataset = None
+        self.file_paths = collect_input_files(inputs)
+        self.page_cache = page_cache
+        self.colorspace = check_colorspace(colorspace)
+        self.max_pixels = max_pixels
+        self._page_counts = [self._count_pages(file_path) for file_path in self.file_paths]
+        # _offsets[i] 为第 i 个文件第一页的全局页码
+        self._offsets = []
+        total = 0
+        for count in self._page_counts:
+            self._offsets.append(total)
+            total += count
+        self._total_pages = total
+
+    @staticmethod
+    def _is_pdf(file_path: str) -> bool:
+        return os.path.splitext(file_path)[1].lower() in PDF_EXTENSIONS
+
+    def _count_pages(self, file_path: str) -> int:
+        """读取文件的页数（PDF 页数或图片帧数），不渲染、不解码像素。"""
+        if self._is_pdf(file_path):
+            try:
+                with pymupdf.open(file_path) as document:
+                    return document.page_count
+            except Exception as e:
+                raise IOError(f"无法打开或读取 PDF 文件 {file_path}: {e}")
+        return len(ImageDataset(file_path))
+
+    def _get_dataset(self, file_index: int) -> Union[PDFDataset, ImageDataset]:
+        """返回第 file_index 个文件的数据集，切换文件时关闭上一个。"""
+        if self._open_index != file_index:
+            self._close_open_dataset()
+            file_path = self.file_paths[file_index]
+            if self._is_pdf(file_path):
+                self._open_dataset = PDFDataset(file_path, page_cache=self.page_cache, colorspace=self.colorspace)
+            else:
+                self._open_dataset = ImageDataset(file_path, colorspace=self.colorspace, max_pixels=self.max_pixels,
+                                                  page_cache=self.page_cache)
+            self._open_index = file_index
+        return self._open_dataset
+
+    def _close_open_dataset(self):
+        if self._open_dataset is not None:
+            self._open_dataset.close()
+        self._open_dataset = None
+        self._open_index = None
+
+    def locate(self, page_index: int) -> Tuple[int, int]:
+        """把全局页码换算为 (文件序号, 文件内页码)。"""
+        if not (0 <= page_index < len(self)):
+            raise IndexError(f"页码 {page_index} 超出范围。数据集共有 {len(self)} 页。")
+        file_index = bisect.bisect_right(self._offsets, page_index) - 1
+        # 跳过没有页面的文件（offset 相同）
+        while self._page_counts[file_index] == 0:
+            file_index += 1
+        return file_index, page_index - self._offsets[file_index]
+
+    def __len__(self) -> int:
+        """返回所有文件的页面总数。"""
+        return self._total_pages
+
+    def __getitem__(self, page_index: int) -> Dict[str, Any]:
+        """
+        获取全局页码对应的一页，返回对应数据集的页面数据并补充来源元数据。
+        """
+        file_index, source_page = self.locate(page_index)
+        page = self._get_dataset(file_index)[source_page]
+        return self._with_metadata(page, file_index, source_page)
+
+    def _with_metadata(self, page: Dict[str, Any], file_index: int, source_page: int) -> Dict[str, Any]:
+        page["source"] = self.file_paths[file_index]
+        page["source_page"] = source_page
+        page["page_index"] = self._offsets[file_index] + source_page
+        return page
+
+    def iter_page_batches(self, batch_size: int, **kwargs) -> Iterator[List[Dict[str, Any]]]:
+        """
+        依次对每个文件按批次惰性产出页面，参数与 PDFDataset.iter_page_batches 相同
+        （图片文件忽略 PDF 专用参数）。批次不跨文件，因此文件末尾的批次可能不足 batch_size 页；
+        使用 buffer_pool 时，页面数组同样只在本批次内有效（release_buffers=False 时直到调用方归还）。
+        """
+        for file_index in range(len(self.file_paths)):
+            if self._page_counts[file_index] == 0:
+                continue
+            dataset = self._get_dataset(file_index)
+            try:
+                for page_batch in dataset.iter_page_batches(batch_size, **kwargs):
+                    for page in page_batch:
+                        self._with_metadata(page, file_index, page["page_index"])
+                    yield page_batch
+            finally:
+                self._close_open_dataset()
+
+    def close(self):
+        """关闭当前打开的文档。"""
+        self._close_open_dataset()
+
+    def __del__(self):
+        self.close()
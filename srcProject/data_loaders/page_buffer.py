@@ -0,0 +1,105 @@
+"""
+页面像素数组与缓冲池。
+
+- PixmapArray：直接引用 pymupdf.Pixmap 像素缓冲区的 numpy 数组（零拷贝），并持有 Pixmap 的引用，
+  保证数组及其切片存活期间缓冲区不会被释放
+- PageBufferPool：预分配的页面缓冲区池，渲染结果拷贝进复用的缓冲区，避免逐页分配大块内存
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+class PixmapArray(np.ndarray):
+    """
+    共享 pymupdf.Pixmap 像素内存的 uint8 数组（RGB 为 (H, W, 3)，灰度为 (H, W)）。
+    pix.samples_mv 返回的 memoryview 并不引用 Pixmap 本身，因此由数组持有 Pixmap，
+    由它派生的切片（例如区域裁剪）通过 __array_finalize__ 继承同一引用。
+    """
+    def __array_finalize__(self, obj):
+        self._pixmap = getattr(obj, '_pixmap', None)
+
+
+def pixmap_to_array(pix, buffer_pool: Optional["PageBufferPool"] = None) -> np.ndarray:
+    """
+    把 pymupdf.Pixmap 转换为 uint8 数组：RGB 为 (H, W, 3)，灰度为 (H, W)。
+    Args:
+        pix: 渲染得到的 Pixmap。
+        buffer_pool: 不为 None 时把像素拷贝进缓冲池中的复用缓冲区（Pixmap 随即可以释放）；
+                     否则返回直接引用 Pixmap 像素内存的 PixmapArray，不发生拷贝。
+    """
+    samples = np.frombuffer(pix.samples_mv, dtype=np.uint8)
+    if pix.stride != pix.width * pix.n:
+        # 行末带填充字节时按行跨度取视图
+        samples = samples.reshape(pix.height, pix.stride)[:, :pix.width * pix.n]
+    samples = samples.reshape((pix.height, pix.width) if pix.n == 1 else (pix.height, pix.width, pix.n))
+    if buffer_pool is not None:
+        array = buffer_pool.acquire(samples.shape)
+        np.copyto(array, samples)
+        return array
+    array = samples.view(PixmapArray)
+    array._pixmap = pix
+    return array
+
+
+class PageBufferPool:
+    """
+    页面缓冲区池。
+    acquire 返回至少能容纳指定形状的缓冲区视图，release 归还后供下一页复用；
+    空闲缓冲区最多保留 max_buffers 个，多余的交给垃圾回收。
+    调用方必须保证归还后不再使用该数组（其内容会被下一页覆盖）。
+    """
+    def __init__(self, max_buffers: int = 8):
+        self.max_buffers = max_buffers
+        self._free: List[np.ndarray] = []  # 空闲的一维缓冲区
+        self._in_use: Dict[int, np.ndarray] = {}  # id(视图) -> 一维缓冲区
+        self._lock = threading.Lock()
+        self.allocations = 0
+        self.reuses = 0
+
+    def acquire(self, shape: Tuple[int, ...]) -> np.ndarray:
+        """取出一块可容纳 shape 的缓冲区，返回对应形状的 uint8 视图。"""
+        nbytes = int(np.prod(shape))
+        with self._lock:
+            # 选择能放下的最小空闲缓冲区，尽量把大缓冲区留给大页面
+            # 按下标取出，ndarray 之间不能用 list.remove 的相等比较
+            fitting = [i for i, buffer in enumerate(self._free) if buffer.nbytes >= nbytes]
+            if fitting:
+                buffer = self._free.pop(min(fitting, key=lambda i: self._free[i].nbytes))
+                self.reuses += 1
+            else:
+                buffer = np.empty(nbytes, dtype=np.uint8)
+                self.allocations += 1
+            view = buffer[:nbytes].reshape(shape)
+            self._in_use[id(view)] = buffer
+            return view
+
+    def release(self, array: np.ndarray):
+        """归还 acquire 返回的数组。非本池分配的数组会被忽略。"""
+        with self._lock:
+            buffer = self._in_use.pop(id(array), None)
+            if buffer is None:
+                return
+            if len(self._free) < self.max_buffers:
+                self._free.append(buffer)
+            elif self._free:
+                # 池已满时保留较大的缓冲区
+                smallest = min(range(len(self._free)), key=lambda i: self._free[i].nbytes)
+                if self._free[smallest].nbytes < buffer.nbytes:
+                    self._free[smallest] = buffer
+
+    def owns(self, array: np.ndarray) -> bool:
+        """判断数组是否为本池当前借出的缓冲区。"""
+        with self._lock:
+            return id(array) in self._in_use
+
+    def stats(self) -> Dict[str, int]:
+        """返回分配与复用次数以及当前占用。"""
+        with self._lock:
+            return {
+                'allocations': self.allocations,
+                'reuses': self.reuses,
+                'in_use': len(self._in_use),
+                'free': len(self._free),
+                'free_bytes': sum(buffer.nbytes for buffer in self._free),
+            }
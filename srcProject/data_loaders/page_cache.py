@@ -0,0 +1,226 @@
+"""
+渲染页面缓存。
+
+PageImageCache 类用于：
+- 以 (文件内容哈希, 页码, DPI, 色彩空间) 为键缓存渲染后的页面像素
+- 内存层：按字节数限制的 LRU
+- 磁盘层：原始 uint8 数组由后台线程保存为 .npy 文件（不占用缓存锁，不阻塞渲染），命中时以内存映射方式读回，
+  按总大小淘汰最久未使用的文件
+- 统计各层命中与未命中次数
+同一文档再次处理（重试、切换模型、重新上传）时可完全跳过光栅化。
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from srcProject.config.settings import PAGE_CACHE_ENABLED, PAGE_CACHE_MEMORY_MB, PAGE_CACHE_DISK_MB, PAGE_CACHE_DIR
+
+
+def file_content_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """分块计算文件内容的 SHA-256 哈希，与文件名和路径无关。"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PageImageCache:
+    """
+    两级页面缓存：内存 LRU + 内存映射的磁盘存储。
+    """
+    def __init__(self, memory_limit_bytes: int, disk_dir: Optional[str] = None, disk_limit_bytes: int = 0):
+        self.memory_limit_bytes = memory_limit_bytes
+        self.disk_dir = disk_dir
+        self.disk_limit_bytes = disk_limit_bytes if disk_dir else 0
+        self._memory = OrderedDict()  # key -> np.ndarray
+        self._memory_bytes = 0
+        self._disk = OrderedDict()  # 文件路径 -> 字节数，按最近使用时间排列
+        self._disk_bytes = 0
+        self._pending = {}  # 文件路径 -> 等待后台写入的数组
+        self._writer = None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.disk_limit_bytes > 0:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def make_key(file_hash: str, page_index: int, dpi: float, colorspace: str) -> str:
+        """生成缓存键。DPI 保留三位小数，以兼容按页面尺寸计算出的非整数 DPI。"""
+        return f"{file_hash}_{page_index}_{dpi:.3f}_{colorspace}"
+
+    @staticmethod
+    def make_image_key(file_hash: str, frame: int, max_pixels: int, colorspace: str) -> str:
+        """生成图片输入的缓存键：归一化结果取决于帧序号、像素预算和色彩空间。"""
+        return f"{file_hash}_{frame}_max{max_pixels}_{colorspace}"
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.npy")
+
+    def _load_disk_index(self):
+        """扫描磁盘缓存目录，按修改时间从旧到新建立索引。"""
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith('.npy'):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(entries):
+            self._disk[path] = size
+            self._disk_bytes += size
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        查找缓存。先查内存层，再查磁盘层（以只读内存映射方式返回），都未命中时返回 None。
+        """
+        with self._lock:
+            array = self._memory.get(key)
+            if array is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return array
+            if self.disk_limit_bytes > 0:
+                path = self._disk_path(key)
+                array = self._pending.get(path)
+                if array is not None:
+                    # 已被内存层淘汰、还没写完的页面
+                    self.disk_hits += 1
+                    return array
+                if path in self._disk:
+                    try:
+                        array = np.load(path, mmap_mode='r')
+                    except (OSError, ValueError):
+                        # 文件损坏或已被外部删除，视为未命中
+                        self._disk_bytes -= self._disk.pop(path)
+                    else:
+                        self._disk.move_to_end(path)
+                        os.utime(path)
+                        self.disk_hits += 1
+                        return array
+            self.misses += 1
+            return None
+
+    def put(self, key: str, array: np.ndarray):
+        """
+        写入缓存：放入内存层，并在启用磁盘层时交给后台线程落盘。超出容量时淘汰最久未使用的条目。
+        array 之后不能再被修改（来自缓冲池的数组需先拷贝）。
+        """
+        with self._lock:
+            if array.nbytes <= self.memory_limit_bytes:
+                if key in self._memory:
+                    self._memory_bytes -= self._memory.pop(key).nbytes
+                self._memory[key] = array
+                self._memory_bytes += array.nbytes
+                while self._memory_bytes > self.memory_limit_bytes:
+                    _, evicted = self._memory.popitem(last=False)
+                    self._memory_bytes -= evicted.nbytes
+            if self.disk_limit_bytes > 0 and array.nbytes <= self.disk_limit_bytes:
+                path = self._disk_path(key)
+                if path in self._disk or path in self._pending:
+                    return
+                self._pending[path] = array
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='page-cache-writer')
+                self._writer.submit(self._write_disk, path)
+
+    def _write_disk(self, path: str):
+        """后台线程：把等待写入的数组保存到磁盘并登记，再淘汰超出容量的文件。文件读写都在锁外进行。"""
+        with self._lock:
+            array = self._pending[path]
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再原子替换，避免读到写了一半的文件
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"页面缓存写入磁盘失败 {path}: {e}")
+            with self._lock:
+                del self._pending[path]
+            return
+        with self._lock:
+            del self._pending[path]
+            self._disk[path] = size
+            self._disk_bytes += size
+            evicted = self._evict_disk()
+        self._remove_files(evicted)
+
+    def _evict_disk(self) -> List[Tuple[str, int]]:
+        """持有锁时调用：从索引中取出超出容量的最久未使用文件，返回待删除的 (路径, 字节数)。"""
+        evicted = []
+        while self._disk_bytes > self.disk_limit_bytes and self._disk:
+            path, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            evicted.append((path, size))
+        return evicted
+
+    def _remove_files(self, evicted: List[Tuple[str, int]]):
+        """
+        在锁外删除淘汰的文件。删除失败（如 Windows 上文件仍被内存映射）时把条目放回索引最旧的位置，
+        下次淘汰时再试，文件不会脱离索引而遗留在磁盘上。
+        """
+        failed = []
+        for path, size in evicted:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                failed.append((path, size))
+        if failed:
+            with self._lock:
+                for path, size in reversed(failed):
+                    if path not in self._disk:
+                        self._disk[path] = size
+                        self._disk.move_to_end(path, last=False)
+                        self._disk_bytes += size
+
+    def clear_memory(self):
+        """清空内存层。"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """返回命中统计和各层占用。"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                'memory_bytes': self._memory_bytes,
+                'memory_entries': len(self._memory),
+                'disk_bytes': self._disk_bytes,
+                'disk_entries': len(self._disk),
+                'disk_pending': len(self._pending),
+            }
+
+
+_default_page_cache = None
+_default_page_cache_lock = threading.Lock()
+
+
+def get_default_page_cache() -> Optional[PageImageCache]:
+    """返回按 configs.yaml 中 page_cache 配置创建的全局缓存；未启用时返回 None。"""
+    global _default_page_cache
+    if not PAGE_CACHE_ENABLED:
+        return None
+    with _default_page_cache_lock:
+        if _default_page_cache is None:
+            _default_page_cache = PageImageCache(
+                memory_limit_bytes=PAGE_CACHE_MEMORY_MB * 1024 * 1024,
+                disk_dir=PAGE_CACHE_DIR,
+                disk_limit_bytes=PAGE_CACHE_DISK_MB * 1024 * 1024
+            )
+        return _default_page_cache
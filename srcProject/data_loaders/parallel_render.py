@@ -0,0 +1,155 @@
+"""
+PDF 页面多进程并行渲染。
+
+ParallelPageRenderer 类用于：
+- 维护一个进程池（forkserver / spawn 启动，任务函数在只依赖 pymupdf 的 render_worker 中），每个工作进程打开自己的 pymupdf 文档句柄
+- 将一批页码切分为互不重叠的连续区间，交给不同进程渲染
+- 通过共享内存传回原始像素数据（而不是 pickle 后的 PIL Image），并按页码顺序还原为 PIL Image 或 numpy 数组
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Union, Sequence, Optional, Callable
+import numpy as np
+from PIL import Image
+from srcProject.data_loaders import render_worker
+from srcProject.data_loaders.page_buffer import PageBufferPool
+from srcProject.data_loaders.render_worker import pymupdf_colorspace, pixmap_mode
+
+# PIL 模式对应的通道数
+MODE_CHANNELS = {"L": 1, "RGB": 3, "RGBA": 4}
+
+
+def _worker_context():
+    """
+    工作进程的启动方式。fork 会复制主进程中其他线程（页面预取、模型加载、推理）持有的锁，可能导致子进程死锁，
+    因此使用 forkserver：由一个单线程的服务进程 fork 出工作进程，服务进程预先导入 render_worker（及 pymupdf）。
+    没有 forkserver 的平台（Windows）使用 spawn。两种方式下工作进程都会以 __mp_main__ 导入主模块，主模块必须可以安全导入。
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # 只在服务进程启动前生效
+        context.set_forkserver_preload(['__main__', render_worker.__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _split_contiguous(page_indices: List[int], parts: int) -> List[List[int]]:
+    """把页码列表切分为至多 parts 段长度相近的连续区间。"""
+    parts = max(1, min(parts, len(page_indices)))
+    chunk_size, remainder = divmod(len(page_indices), parts)
+    chunks = []
+    start = 0
+    for i in range(parts):
+        end = start + chunk_size + (1 if i < remainder else 0)
+        chunks.append(page_indices[start:end])
+        start = end
+    return chunks
+
+
+class ParallelPageRenderer:
+    """
+    PDF 页面多进程渲染器。
+    用法：
+        with ParallelPageRenderer(file_path, workers=4) as renderer:
+            images = renderer.render([0, 1, 2, 3], dpi=300)
+    """
+    def __init__(self, file_path: str, workers: int = None):
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"文件 {file_path} 不存在。")
+        self._executor = None
+        self.file_path = file_path
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=_worker_context(),
+            initializer=render_worker.init_worker,
+            initargs=(file_path,)
+        )
+
+    def render(self, page_indices: List[int], dpi: Union[float, Sequence[float]] = 300,
+               colorspace: Union[str, Sequence[str]] = 'rgb') -> List[Image.Image]:
+        """
+        并行渲染指定页码，返回与 page_indices 顺序一致的 PIL Image 列表。
+        dpi 可以是一个数值，也可以是与 page_indices 一一对应的每页 DPI 列表；colorspace 同理（'rgb' / 'gray'）。
+        """
+        return self._render(page_indices, dpi, colorspace,
+                            lambda view, width, height, mode: Image.frombytes(mode, (width, height), view))
+
+    def render_arrays(self, page_indices: List[int], dpi: Union[float, Sequence[float]] = 300,
+                      colorspace: Union[str, Sequence[str]] = 'rgb',
+                      buffer_pool: Optional[PageBufferPool] = None) -> List[np.ndarray]:
+        """
+        并行渲染指定页码，返回与 page_indices 顺序一致的 uint8 数组列表（RGB 为 (H, W, 3)，灰度为 (H, W)）。
+        buffer_pool 不为 None 时像素直接从共享内存拷贝进池中的复用缓冲区。
+        """
+        def to_array(view, width, height, mode):
+            channels = MODE_CHANNELS[mode]
+            shape = (height, width) if channels == 1 else (height, width, channels)
+            source = np.frombuffer(view, dtype=np.uint8).reshape(shape)
+            if buffer_pool is None:
+                return source.copy()
+            array = buffer_pool.acquire(source.shape)
+            np.copyto(array, source)
+            del source
+            return array
+        return self._render(page_indices, dpi, colorspace, to_array)
+
+    def _render(self, page_indices: List[int], dpi: Union[float, Sequence[float]],
+                colorspace: Union[str, Sequence[str]], convert: Callable) -> list:
+        """并行渲染并用 convert(共享内存视图, 宽, 高, 模式) 把每页像素转换为结果对象。"""
+        if self._executor is None:
+            raise ValueError("渲染器已关闭。")
+        page_indices = list(page_indices)
+        if not page_indices:
+            return []
+        dpis = list(dpi) if isinstance(dpi, (list, tuple)) else [dpi] * len(page_indices)
+        colorspaces = [colorspace] * len(page_indices) if isinstance(colorspace, str) else list(colorspace)
+        dpi_by_page = dict(zip(page_indices, dpis))
+        colorspace_by_page = dict(zip(page_indices, colorspaces))
+        futures = [
+            self._executor.submit(render_worker.render_range, chunk, [dpi_by_page[page_index] for page_index in chunk],
+                                  [colorspace_by_page[page_index] for page_index in chunk])
+            for chunk in _split_contiguous(page_indices, self.workers)
+        ]
+        results = []
+        error = None
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                error = error or e
+        images = {}
+        for shm_name, layout in results:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                if error is None:
+                    for page_index, width, height, mode, offset, size in layout:
+                        view = shm.buf[offset:offset + size]
+                        try:
+                            images[page_index] = convert(view, width, height, mode)
+                        finally:
+                            view.release()
+            finally:
+                # 无论成功与否都要释放共享内存，避免泄漏
+                shm.close()
+                shm.unlink()
+        if error is not None:
+            raise IOError(f"并行渲染 PDF 文件 {self.file_path} 失败: {error}")
+        return [images[page_index] for page_index in page_indices]
+
+    def close(self):
+        """关闭进程池。"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
@@ -6,11 +6,23 @@ PDFDataset 类用于：
 - 解析 PDF 结构
 - 将 PDF 页面转换为适合处理的格式
 """
+import functools
 import os
-from typing import List, Dict, Any, Tuple
+import threading
+from typing import List, Dict, Any, Tuple, Iterator, Optional
+import numpy as np
 from PIL import Image
 from pymupdf import pymupdf
+from srcProject.config.constants import LAYOUT_SETTING_IMGSIZE, COLORSPACE_AUTO, COLORSPACE_RGB, COLOR_DETECT_DPI
 from srcProject.data_loaders.Base_dataset import BaseDataset # 确保导入路径正确
+from srcProject.data_loaders.page_buffer import PageBufferPool, pixmap_to_array
+from srcProject.data_loaders.page_cache import PageImageCache, file_content_hash
+from srcProject.data_loaders.parallel_render import ParallelPageRenderer, pymupdf_colorspace, pixmap_mode
+from srcProject.utlis.colorspace import check_colorspace, detect_colorspace
+
+# PyMuPDF 不支持多个线程同时调用。渲染放到后台线程（BatchPrefetcher）时，
+# 其他线程调用 PyMuPDF 前需持有该锁，render_region 已在内部加锁
+PYMUPDF_LOCK = threading.RLock()
 
 class PDFDataset(BaseDataset):
     """
@@ -20,14 +32,58 @@ class PDFDataset(BaseDataset):
     - 解析 PDF 结构（获取页面图像和文本层）
     - 将 PDF 页面转换为适合处理的格式（PIL Image）
     """
-    def __init__(self, file_path: str): # 明确 file_path 的类型提示
+    def __init__(self, file_path: str, page_cache: Optional[PageImageCache] = None,
+                 colorspace: str = COLORSPACE_RGB): # 明确 file_path 的类型提示
         # BaseDataset 的 __init__ 方法不接受 file_path 参数，因此不带参数调用。
         # super().__init__() 是正确的用法。
         super().__init__()
         self.file_path = file_path
+        self.page_cache = page_cache # 渲染页面缓存，为 None 时每次都重新渲染
+        self.colorspace = check_colorspace(colorspace) # 'rgb' / 'gray' / 'auto'（按页检测）
+        self._page_colorspaces = {} # auto 模式下每页的检测结果
+        self._content_hash = None
         self._document = None # 初始化为 None
         self._open_document()
 
+    @property
+    def content_hash(self) -> str:
+        """PDF 文件内容的哈希，作为页面缓存键的一部分（首次访问时计算）。"""
+        if self._content_hash is None:
+            self._content_hash = file_content_hash(self.file_path)
+        return self._content_hash
+
+    def _cache_key(self, page_index: int, dpi: float, colorspace: str) -> str:
+        return PageImageCache.make_key(self.content_hash, page_index, dpi, colorspace)
+
+    def _get_cached_page_image(self, page_index: int, dpi: float, colorspace: str) -> Optional[Image.Image]:
+        """从页面缓存中取出已渲染的页面，未启用缓存或未命中时返回 None。"""
+        if self.page_cache is None:
+            return None
+        array = self.page_cache.get(self._cache_key(page_index, dpi, colorspace))
+        return None if array is None else Image.fromarray(array)
+
+    def _put_cached_page_image(self, page_index: int, dpi: float, colorspace: str, image: Image.Image):
+        """把渲染好的页面写入页面缓存。"""
+        if self.page_cache is not None:
+            self.page_cache.put(self._cache_key(page_index, dpi, colorspace), np.asarray(image))
+
+    def get_page_colorspace(self, page_index: int, document=None) -> str:
+        """
+        返回指定页实际使用的色彩空间（'rgb' 或 'gray'）。
+        auto 模式下以 COLOR_DETECT_DPI 渲染缩略图检测是否含有有效彩色内容，结果按页记录。
+        document 为 None 时使用本数据集打开的文档。
+        """
+        if self.colorspace != COLORSPACE_AUTO:
+            return self.colorspace
+        colorspace = self._page_colorspaces.get(page_index)
+        if colorspace is None:
+            zoom = COLOR_DETECT_DPI / 72.0
+            document = document if document is not None else self._document
+            pix = document.load_page(page_index).get_pixmap(matrix=pymupdf.Matrix(zoom, zoom))
+            colorspace = detect_colorspace(pixmap_to_array(pix))
+            self._page_colorspaces[page_index] = colorspace
+        return colorspace
+
     def _open_document(self):
         """打开 PDF 文档并存储其引用。"""
         # 检查文件扩展名是否为 .pdf
@@ -78,15 +134,16 @@ class PDFDataset(BaseDataset):
             "spans": page_spans
         }
 
-    def get_page_image(self, page_index: int, dpi: int = 300) -> Image.Image:
+    def get_page_image(self, page_index: int, dpi: float = 300, colorspace: Optional[str] = None) -> Image.Image:
         """
         获取指定页码的渲染图像。
         Args:
             page_index: 页码（从 0 开始）。
             dpi: 渲染图像的分辨率（每英寸点数）。更高的 DPI 意味着更高的分辨率图像。
+            colorspace: 'rgb' / 'gray'，为 None 时使用文档的色彩空间设置（auto 时按页检测）。
 
         Returns:
-            页面的 PIL Image 对象。
+            页面的 PIL Image 对象（RGB 或 L 模式）。
 
         Raises:
             ValueError: 如果文档未打开或页码超出范围。
@@ -97,22 +154,203 @@ class PDFDataset(BaseDataset):
         if not (0 <= page_index < self._document.page_count):
             raise ValueError(f"页码 {page_index} 超出范围。文档共有 {self._document.page_count} 页。")
 
+        colorspace = colorspace or self.get_page_colorspace(page_index)
+        cached_image = self._get_cached_page_image(page_index, dpi, colorspace)
+        if cached_image is not None:
+            return cached_image
+
         # 计算缩放因子：dpi / 72 (MuPDF 默认的 DPI)
         zoom = dpi / 72.0
         mat = pymupdf.Matrix(zoom, zoom) # 创建一个缩放矩阵
 
         page = self._document.load_page(page_index) # 加载指定页
-        pix = page.get_pixmap(matrix=mat) # 渲染页面为 Pixmap 对象
+        pix = page.get_pixmap(matrix=mat, colorspace=pymupdf_colorspace(colorspace)) # 渲染页面为 Pixmap 对象
 
         # 将 Pixmap 转换为 PIL Image 对象
         # pix.samples 是图像的原始字节数据
         # pix.width 和 pix.height 是图像的尺寸
-        # pix.n 是每个像素的字节数 (3 for RGB, 4 for RGBA)
-        mode = "RGBA" if pix.alpha else "RGB"
+        # pix.n 是每个像素的字节数 (1 for L, 3 for RGB, 4 for RGBA)
+        mode = pixmap_mode(pix)
+        if self.page_cache is not None:
+            # 启用缓存时直接以像素数组入缓存
+            array = pixmap_to_array(pix)
+            self.page_cache.put(self._cache_key(page_index, dpi, colorspace), array)
+            return Image.fromarray(array)
         img = Image.frombytes(mode, [pix.width, pix.height], pix.samples)
 
         return img
 
+    def get_page_array(self, page_index: int, dpi: float = 300,
+                       buffer_pool: Optional[PageBufferPool] = None, colorspace: Optional[str] = None) -> np.ndarray:
+        """
+        获取指定页码的渲染结果，以 uint8 numpy 数组返回（RGB 为 (H, W, 3)，灰度为 (H, W)），
+        避免构造 PIL Image 时的整页拷贝。
+        Args:
+            page_index: 页码（从 0 开始）。
+            dpi: 渲染分辨率。
+            colorspace: 'rgb' / 'gray'，为 None 时使用文档的色彩空间设置。
+            buffer_pool: 不为 None 时像素拷贝进池中的复用缓冲区，用完后应调用 buffer_pool.release 归还；
+                         否则返回直接引用 Pixmap 像素内存的数组（零拷贝）。
+
+        Returns:
+            页面像素数组。命中页面缓存时返回缓存中的数组（可能是只读的内存映射）。
+        """
+        if not self._document:
+            raise ValueError("PDF 文档未打开。请先调用 _open_document() 方法。")
+
+        if not (0 <= page_index < self._document.page_count):
+            raise ValueError(f"页码 {page_index} 超出范围。文档共有 {self._document.page_count} 页。")
+
+        colorspace = colorspace or self.get_page_colorspace(page_index)
+        if self.page_cache is not None:
+            cached_array = self.page_cache.get(self._cache_key(page_index, dpi, colorspace))
+            if cached_array is not None:
+                return cached_array
+
+        zoom = dpi / 72.0
+        pix = self._document.load_page(page_index).get_pixmap(matrix=pymupdf.Matrix(zoom, zoom),
+                                                              colorspace=pymupdf_colorspace(colorspace))
+        array = pixmap_to_array(pix, buffer_pool)
+        if self.page_cache is not None:
+            # 池中的缓冲区会被复用，入缓存时需要独立的拷贝
+            self.page_cache.put(self._cache_key(page_index, dpi, colorspace),
+                                array.copy() if buffer_pool is not None else array)
+        return array
+
+    def get_detection_dpi(self, page_index: int, target_size: int = LAYOUT_SETTING_IMGSIZE) -> float:
+        """
+        计算使页面长边恰好渲染为 target_size 像素的 DPI，即布局检测模型的输入分辨率。
+        以更高 DPI 渲染整页只会被检测模型缩小，浪费渲染时间和内存。
+        """
+        width, height = self.get_page_dimensions(page_index, to_pixels=False)
+        return target_size * 72.0 / max(width, height)
+
+    def render_region(self, page_index: int, bbox_points: Tuple[float, float, float, float],
+                      dpi: float = 300, colorspace: Optional[str] = None) -> Image.Image:
+        """
+        从 PDF 矢量数据中按指定 DPI 重新渲染页面的一个矩形区域。
+        Args:
+            page_index: 页码（从 0 开始）。
+            bbox_points: 区域边界框 (x0, y0, x1, y1)，PDF 点坐标。
+            dpi: 区域的渲染分辨率。
+            colorspace: 'rgb' / 'gray'，为 None 时与整页使用相同的色彩空间。
+
+        Returns:
+            区域的 PIL Image 对象。
+        """
+        zoom = dpi / 72.0
+        with PYMUPDF_LOCK:
+            # 批次预取时，渲染线程可能已转到下一个文件并关闭了本文档，此时临时打开一份，渲染完即关闭
+            document = self._document if self._document is not None else pymupdf.open(self.file_path)
+            try:
+                if not (0 <= page_index < document.page_count):
+                    raise ValueError(f"页码 {page_index} 超出范围。文档共有 {document.page_count} 页。")
+                page = document.load_page(page_index)
+                colorspace = colorspace or self.get_page_colorspace(page_index, document)
+                pix = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), clip=pymupdf.Rect(bbox_points),
+                                      colorspace=pymupdf_colorspace(colorspace))
+            finally:
+                if document is not self._document:
+                    document.close()
+        return Image.frombytes(pixmap_mode(pix), [pix.width, pix.height], pix.samples)
+
+    def iter_page_batches(self, batch_size: int, dpi: int = 300, workers: int = 0,
+                          with_spans: bool = False, detect_size: int = None, as_array: bool = False,
+                          buffer_pool: Optional[PageBufferPool] = None,
+                          release_buffers: bool = True) -> Iterator[List[Dict[str, Any]]]:
+        """
+        按批次惰性渲染页面。每次只渲染 batch_size 页，调用方处理完一批后即可释放，
+        因此峰值内存由批大小决定，而不是由文档页数决定。
+        Args:
+            batch_size: 每批渲染的页数。
+            dpi: 页面坐标所用的分辨率，'page_size' 以此为准。
+            workers: 渲染进程数。大于 1 时使用 ParallelPageRenderer 多进程渲染，否则在当前进程中逐页渲染。
+            with_spans: 是否同时提取每页的文本跨度（键 'spans'），供文本层快速通道使用。
+            detect_size: 不为 None 时，每页按长边 detect_size 像素渲染（检测模型的输入分辨率），
+                         而不是按 dpi 渲染；页面另带 'render_region'，用于从 PDF 矢量数据按需重新渲染区域。
+            as_array: 为 True 时 'image' 为 uint8 数组（RGB 为 (H, W, 3)，灰度为 (H, W)）而不是 PIL Image。
+            buffer_pool: as_array 时可选的页面缓冲池。调用方取下一批时，上一批借出的缓冲区即被归还复用，
+                         因此不能在批次之外保留页面数组或其切片。
+            release_buffers: 为 False 时不在取下一批时归还缓冲区，由调用方处理完页面后调用
+                             buffer_pool.release(page['image'])；提前渲染多批（BatchPrefetcher）时使用。
+
+        Yields:
+            List[Dict[str, Any]]: 一批页面，每项为
+                {'image': PIL.Image 或 np.ndarray, 'page_size': (w, h), 'page_index': int, 'scale': float,
+                 'colorspace': 'rgb' 或 'gray', 'source': 文件路径}，
+                其中 scale 为图像像素坐标换算到 dpi 像素坐标的比例。
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size 必须大于 0，当前为 {batch_size}。")
+        renderer = ParallelPageRenderer(self.file_path, workers) if workers > 1 else None
+        try:
+            for start in range(0, len(self), batch_size):
+                page_indices = list(range(start, min(start + batch_size, len(self))))
+                if detect_size:
+                    render_dpis = [self.get_detection_dpi(page_index, detect_size) for page_index in page_indices]
+                else:
+                    render_dpis = [dpi] * len(page_indices)
+                colorspaces = [self.get_page_colorspace(page_index) for page_index in page_indices]
+                if as_array:
+                    images = self._render_page_arrays(page_indices, render_dpis, colorspaces, renderer, buffer_pool)
+                elif renderer is not None:
+                    # 先查页面缓存，只把未命中的页面交给进程池渲染
+                    images = [self._get_cached_page_image(page_index, render_dpi, colorspace)
+                              for page_index, render_dpi, colorspace in zip(page_indices, render_dpis, colorspaces)]
+                    missing = [i for i, image in enumerate(images) if image is None]
+                    rendered = renderer.render([page_indices[i] for i in missing],
+                                               dpi=[render_dpis[i] for i in missing],
+                                               colorspace=[colorspaces[i] for i in missing])
+                    for i, image in zip(missing, rendered):
+                        images[i] = image
+                        self._put_cached_page_image(page_indices[i], render_dpis[i], colorspaces[i], image)
+                else:
+                    images = [self.get_page_image(page_index, dpi=render_dpi, colorspace=colorspace)
+                              for page_index, render_dpi, colorspace in zip(page_indices, render_dpis, colorspaces)]
+                page_batch = []
+                for page_index, image, render_dpi, colorspace in zip(page_indices, images, render_dpis, colorspaces):
+                    page = {
+                        "image": image,
+                        "page_size": self.get_page_dimensions(page_index, dpi=dpi),
+                        "page_index": page_index,
+                        "scale": dpi / render_dpi,
+                        "colorspace": colorspace,
+                        "source": self.file_path,
+                    }
+                    if detect_size:
+                        page["render_region"] = functools.partial(self.render_region, page_index)
+                    if with_spans:
+                        page["spans"] = self.get_page_spans(page_index)
+                    page_batch.append(page)
+                yield page_batch
+                if buffer_pool is not None and release_buffers:
+                    for image in images:
+                        buffer_pool.release(image)
+                del images, page_batch
+        finally:
+            if renderer is not None:
+                renderer.close()
+
+    def _render_page_arrays(self, page_indices: List[int], render_dpis: List[float], colorspaces: List[str],
+                            renderer: Optional[ParallelPageRenderer],
+                            buffer_pool: Optional[PageBufferPool]) -> List[np.ndarray]:
+        """以数组形式渲染一批页面：先查页面缓存，未命中的页面在当前进程或进程池中渲染。"""
+        if renderer is None:
+            return [self.get_page_array(page_index, dpi=render_dpi, buffer_pool=buffer_pool, colorspace=colorspace)
+                    for page_index, render_dpi, colorspace in zip(page_indices, render_dpis, colorspaces)]
+        keys = [self._cache_key(page_index, render_dpi, colorspace) if self.page_cache is not None else None
+                for page_index, render_dpi, colorspace in zip(page_indices, render_dpis, colorspaces)]
+        arrays = [self.page_cache.get(key) if key else None for key in keys]
+        missing = [i for i, array in enumerate(arrays) if array is None]
+        rendered = renderer.render_arrays([page_indices[i] for i in missing],
+                                          dpi=[render_dpis[i] for i in missing],
+                                          colorspace=[colorspaces[i] for i in missing], buffer_pool=buffer_pool)
+        for i, array in zip(missing, rendered):
+            arrays[i] = array
+            if keys[i]:
+                self.page_cache.put(keys[i], array.copy() if buffer_pool is not None else array)
+        return arrays
+
     def get_page_spans(self, page_index: int) -> List[Dict[str, Any]]:
         """
         获取指定页码的文本跨度（spans）信息。
@@ -141,10 +379,10 @@ class PDFDataset(BaseDataset):
         spans_data = []
 
         # 遍历文本块 (blocks)
-        for block in text_info.get("blocks", []):
+        for block_no, block in enumerate(text_info.get("blocks", [])):
             if block["type"] == 0: # 0 表示文本块，1 表示图像块
                 # 遍历行 (lines)
-                for line in block.get("lines", []):
+                for line_no, line in enumerate(block.get("lines", [])):
                     # 遍历跨度 (spans)
                     for span in line.get("spans", []):
                         # 提取我们关心的 span 信息
@@ -154,7 +392,9 @@ class PDFDataset(BaseDataset):
                             "font": span.get("font"),
                             "size": span.get("size"),
                             "color": span.get("color"), # 整数 RGB 值
-                            "flags": span.get("flags") # 字体标志，如粗体、斜体等
+                            "flags": span.get("flags"), # 字体标志，如粗体、斜体等
+                            "block": block_no, # 所属文本块序号
+                            "line": line_no # 所属行在文本块中的序号
                         }
                         spans_data.append(span_info)
 
@@ -203,10 +443,11 @@ class PDFDataset(BaseDataset):
 
     def close(self):
         """关闭 PDF 文档。"""
-        if self._document:
-            self._document.close()
-            self._document = None
-            print(f"PDF 文档 {self.file_path} 已关闭。")
+        with PYMUPDF_LOCK:
+            if self._document:
+                self._document.close()
+                self._document = None
+                print(f"PDF 文档 {self.file_path} 已关闭。")
 
     def __del__(self):
         """
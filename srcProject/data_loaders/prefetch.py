@@ -0,0 +1,90 @@
+"""
+页面批次预取。
+
+渲染（PyMuPDF 光栅化、图片解码）和布局推理都是 CPU 密集的，串行执行时二者交替空闲。
+BatchPrefetcher 在后台线程中提前从批次迭代器取出页面，放入有界队列，推理线程处理当前批次时下一批已在渲染；
+PyMuPDF 和 torch / ONNX Runtime 在计算时都会释放 GIL，因此两者可以在多核上同时运行。
+"""
+import contextlib
+import queue
+import threading
+import time
+from typing import Any, Iterator, List, Optional
+
+
+class _ProducerError:
+    """把后台线程中的异常传给消费方。"""
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
+
+
+class BatchPrefetcher:
+    """
+    在后台线程中迭代 batches，最多提前准备 depth 批。
+    Args:
+        batches: 批次迭代器（例如 MultiFileDataset.iter_page_batches 返回的生成器）。
+        depth: 队列中最多等待的批数，队列满时后台线程暂停。
+        lock: 不为 None 时，后台线程在取每一批时持有该锁（例如 PYMUPDF_LOCK，避免与其他线程同时调用 PyMuPDF）。
+    迭代方式与 batches 相同；后台线程中的异常在消费方取到对应位置时重新抛出。
+    注意：迭代器在取下一批时释放上一批资源的（如页面缓冲池），需要改为由消费方显式释放。
+    """
+    def __init__(self, batches: Iterator[List[Any]], depth: int = 1, lock: Optional[threading.RLock] = None):
+        self._batches = batches
+        self._queue = queue.Queue(maxsize=max(1, depth))
+        self._lock = lock if lock is not None else contextlib.nullcontext()
+        self._stop = threading.Event()
+        self.wait_seconds = 0.0 # 消费方等待渲染的累计时间
+        self._thread = threading.Thread(target=self._produce, name='page-prefetch', daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        """放入队列；消费方已关闭时返回 False。"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            while not self._stop.is_set():
+                with self._lock:
+                    batch = next(self._batches, _END)
+                if not self._put(batch) or batch is _END:
+                    return
+        except BaseException as e:
+            self._put(_ProducerError(e))
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        while True:
+            start = time.perf_counter()
+            item = self._queue.get()
+            self.wait_seconds += time.perf_counter() - start
+            if item is _END:
+                return
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+
+    def close(self):
+        """停止后台线程并关闭底层迭代器（执行其 finally，例如关闭文档和渲染进程池）。"""
+        self._stop.set()
+        self._thread.join()
+        # 丢弃未取走的批次
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        if hasattr(self._batches, 'close'):
+            with self._lock:
+                self._batches.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,68 @@
+"""
+PDF 并行渲染的工作进程。
+
+ParallelPageRenderer 的工作进程由 forkserver（Windows 上为 spawn）创建，执行的任务都在本模块中：
+- 本模块只依赖 pymupdf，工作进程不需要模型、推理框架和流水线模块
+- 工作进程同样会导入主模块，主模块必须可以安全导入（见 flask_react/server.py 中模型加载的条件）
+- 每个工作进程打开自己的 pymupdf 文档句柄，渲染一段连续页码，像素数据写入共享内存传回主进程
+"""
+from multiprocessing import shared_memory, resource_tracker
+from typing import List, Tuple
+from pymupdf import pymupdf
+from srcProject.config.constants import COLORSPACE_GRAY
+
+# 每个工作进程独立持有的文档句柄，由 init_worker 在进程启动时打开
+_worker_document = None
+
+# (页码, 宽, 高, 模式, 偏移, 字节数)
+PageLayout = Tuple[int, int, int, str, int, int]
+
+
+def pymupdf_colorspace(colorspace: str):
+    """把 'rgb' / 'gray' 转换为 pymupdf 的色彩空间对象。"""
+    return pymupdf.csGRAY if colorspace == COLORSPACE_GRAY else pymupdf.csRGB
+
+
+def pixmap_mode(pix) -> str:
+    """返回与 Pixmap 像素排列对应的 PIL 模式。"""
+    if pix.n == 1:
+        return "L"
+    return "RGBA" if pix.alpha else "RGB"
+
+
+def init_worker(file_path: str):
+    """工作进程初始化：打开本进程专用的 PDF 文档句柄。"""
+    global _worker_document
+    _worker_document = pymupdf.open(file_path)
+
+
+def render_range(page_indices: List[int], dpis: List[float],
+                 colorspaces: List[str]) -> Tuple[str, List[PageLayout]]:
+    """
+    在工作进程中渲染一段连续页码，并把像素数据依次写入一块新建的共享内存。
+
+    Returns:
+        共享内存名称，以及每页在共享内存中的布局信息。
+    """
+    pixmaps = [
+        _worker_document.load_page(page_index).get_pixmap(matrix=pymupdf.Matrix(dpi / 72.0, dpi / 72.0),
+                                                          colorspace=pymupdf_colorspace(colorspace))
+        for page_index, dpi, colorspace in zip(page_indices, dpis, colorspaces)
+    ]
+    total_size = sum(len(pix.samples_mv) for pix in pixmaps)
+    shm = shared_memory.SharedMemory(create=True, size=max(total_size, 1))
+    layout = []
+    offset = 0
+    try:
+        for page_index, pix in zip(page_indices, pixmaps):
+            size = len(pix.samples_mv)
+            shm.buf[offset:offset + size] = pix.samples_mv
+            mode = pixmap_mode(pix)
+            layout.append((page_index, pix.width, pix.height, mode, offset, size))
+            offset += size
+    finally:
+        # 只关闭本进程的映射，共享内存由主进程读取后负责 unlink，
+        # 因此不让本进程的 resource_tracker 在退出时再次清理它
+        shm.close()
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm.name, layout
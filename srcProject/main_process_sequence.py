@@ -1,66 +1,313 @@
 import asyncio
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from PIL import Image
-from typing import List, Dict, Any
-from tqdm.asyncio import tqdm_asyncio
-from flask_react.log import update_task_progress, handle_progress
-from srcProject.config.constants import OCR_TEXT_VALUES, BlockType_MEMBER, BlockType
-from srcProject.data_loaders.pdf_dataset import PDFDataset
+from typing import List, Dict, Any, Iterator, Union, Tuple, Optional
+from flask_react.log import update_task_progress, handle_progress, record_task_stats
+from srcProject.config.constants import OCR_TEXT_VALUES, BlockType_MEMBER, BlockType, PDF_RENDER_DPI, \
+    LAYOUT_SETTING_IMGSIZE, COLORSPACE_GRAY, ADAPTIVE_BATCH_MAX_SIZE, IMAGE_EXTENSIONS
+from srcProject.config.settings import LAYOUT_BATCH_SIZE, ADAPTIVE_BATCH_SIZE, MAX_INFLIGHT_PAGES, RENDER_WORKERS, \
+    TEXT_LAYER_ENABLED, RENDER_MODE, RENDER_COLORSPACE, IMAGE_MAX_PIXELS, PAGE_FILTER_ENABLED, PREFETCH_DEPTH
+from srcProject.data_loaders.page_buffer import PageBufferPool
+from srcProject.data_loaders.page_cache import get_default_page_cache
+from srcProject.data_loaders.multi_file_dataset import MultiFileDataset
+from srcProject.data_loaders.pdf_dataset import PYMUPDF_LOCK
+from srcProject.data_loaders.prefetch import BatchPrefetcher
+from srcProject.models.detection_cache import get_default_detection_cache
 from srcProject.models.layout_reader import find_reading_order_index
-from srcProject.models.model_manager import ModelManager
+from srcProject.models.model_base import DetectionBatch
+from srcProject.models.model_manager import get_default_model_manager
 from srcProject.utlis.aftertreatment import batch_preprocess_detections, normalize_polygons_to_bboxes, poly_to_bbox, \
     convert_html_tables_to_markdown
 from srcProject.utlis.common import find_project_root, prepare_directory
+from srcProject.utlis.page_filter import PageDeduplicator, compute_page_signature, is_blank_page, page_text, \
+    reuse_page_detections
+from srcProject.utlis.region_crops import PageRaster, CropHandle
+from srcProject.utlis.text_layer import apply_text_layer, choose_region_dpi, pixel_bbox_to_points
 from srcProject.utlis.visualization.visualize_document import visualize_document
 import os
 
 
-model_manager = ModelManager()
+def iter_page_batches(input_path: Union[str, List[str]], batch_size: int,
+                      buffer_pool: Optional[PageBufferPool] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    按批次惰性产出待检测的页面。输入可以是单个 PDF / 图片、目录或二者混合的列表，统一由 MultiFileDataset
+    组织为一条页面流：PDF 每次只渲染 batch_size 页，图片（含多页 TIFF 的每一帧）在取到时才解码，
+    并按 IMAGE_MAX_PIXELS 缩小、按 EXIF 方向旋转，归一化结果写入页面缓存供可视化复用。
+    每项为 {'image': 图像数组, 'page_size': (w, h), 'source': 文件路径, 'source_page': 文件内页码, ...}，
+    PDF 页面的图像借自 buffer_pool，处理完一批后由调用方归还（见 finish_page_batch），因此可以提前渲染多批。
+    按 RENDER_COLORSPACE 设置，黑白页面以单通道灰度产出。
+    启用文本层快速通道或两级渲染时 PDF 页面还带有 'spans'。
+    两级渲染模式下，整页只按检测模型输入尺寸渲染，页面另带 'scale'（检测坐标到 PDF_RENDER_DPI 坐标的比例）
+    和 'render_region'（从 PDF 矢量数据重新渲染区域的函数）。
+    """
+    dataset = MultiFileDataset(input_path, page_cache=get_default_page_cache(), colorspace=RENDER_COLORSPACE,
+                               max_pixels=IMAGE_MAX_PIXELS)
+    two_pass = RENDER_MODE == 'two_pass'
+    try:
+        yield from dataset.iter_page_batches(batch_size, dpi=PDF_RENDER_DPI, workers=RENDER_WORKERS,
+                                             with_spans=TEXT_LAYER_ENABLED or two_pass,
+                                             detect_size=LAYOUT_SETTING_IMGSIZE if two_pass else None,
+                                             as_array=True, buffer_pool=buffer_pool, release_buffers=False)
+    finally:
+        dataset.close()
+
+
+def image_pixels(image) -> int:
+    """返回 PIL Image 或页面数组的像素数。"""
+    if isinstance(image, Image.Image):
+        return image.width * image.height
+    return image.shape[0] * image.shape[1]
 
-async def layout_prediction(input_path: str, bool_ocr = True, task_id = None) -> List[List[Dict[str, Any]]]:
+
+def scale_page_detections(page: Dict[str, Any], page_detections: List[Dict[str, Any]]) -> None:
+    """为一页的检测结果补充页面尺寸，并把检测坐标换算到页面坐标（两级渲染时检测图像分辨率更低）。"""
+    scale = page.get('scale', 1.0)
+    if isinstance(page_detections, DetectionBatch):
+        page_detections.page_size = page['page_size']
+        if scale != 1.0:
+            page_detections.rescale(scale, scale)
+        return
+    for detection in page_detections:
+        if isinstance(detection, dict):
+            detection['page_size'] = page['page_size']
+            if scale != 1.0:
+                detection['poly'] = [int(round(p * scale)) for p in detection['poly']]
+
+
+def crop_page_detections(page: Dict[str, Any], page_detections: List[Dict[str, Any]], raster: PageRaster):
+    """
+    为过滤后保留的检测结果创建惰性裁剪句柄（CropHandle），此时不裁剪任何像素。
+    两级渲染时句柄物化时从 PDF 矢量数据按区域类型或字号选择的 DPI 重新渲染，否则从整页图像中裁剪。
     """
-    处理单个文档，执行布局分析、文本提取和结构化，并进行可视化。
+    render_region = page.get('render_region')
+    if render_region is None and raster.image is None:
+        return
+    # DetectionBatch 直接读取坐标和类别数组，不再逐个由 poly 换算
+    if isinstance(page_detections, DetectionBatch):
+        bboxes, category_ids = page_detections.boxes.tolist(), page_detections.classes.tolist()
+    else:
+        bboxes = [poly_to_bbox(detection['poly']) for detection in page_detections]
+        category_ids = [detection['category_id'] for detection in page_detections]
+    for detection, bbox, category_id in zip(page_detections, bboxes, category_ids):
+        render = None
+        if render_region is not None:
+            region = pixel_bbox_to_points(bbox, PDF_RENDER_DPI)
+            region_dpi = choose_region_dpi(category_id, page.get('spans'), region)
+            render = partial(render_region, region, region_dpi)
+        detection['cropped_image'] = raster.handle(bbox, render)
+
+
+def resolve_page_crops(page_detections: List[Dict[str, Any]], ocr: bool = True) -> int:
+    """
+    物化后续确实需要像素的裁剪句柄：图片区域（保存到 Markdown），以及启用 OCR 时尚无文字的识别区域；
+    其余句柄（例如已由文本层填充文字的区域）直接丢弃，不做裁剪。
+    Returns:
+        int: 为裁剪而新渲染的像素数。
+    """
+    rendered_pixels = 0
+    for detection in page_detections:
+        handle = detection.get('cropped_image')
+        if not isinstance(handle, CropHandle):
+            continue
+        category_id = detection['category_id']
+        if category_id == BlockType.FIGURE.value or (ocr and category_id in OCR_TEXT_VALUES and 'text' not in detection):
+            detection['cropped_image'] = handle.materialize()
+            rendered_pixels += handle.rendered_pixels
+        else:
+            handle.discard()
+            del detection['cropped_image']
+    return rendered_pixels
+
+
+def filter_page_batch(page_batch: List[Dict[str, Any]], first_position: int, deduplicator: PageDeduplicator,
+                      blank_pages: List[int], duplicate_pages: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    页面预过滤：在降采样灰度图上计算墨迹覆盖率、感知哈希和内容图（有文本层时还有文字），空白页记入 blank_pages，
+    与已处理页面近似重复的页面记入 duplicate_pages（序号 -> {'source': 源页面序号, 'page_size': 尺寸}）。
+    Returns:
+        需要送入布局检测的页面列表。
+    """
+    pages_to_detect = []
+    for offset, page in enumerate(page_batch):
+        position = first_position + offset
+        signature = compute_page_signature(page['image'], page_text(page.get('spans')))
+        if is_blank_page(signature):
+            blank_pages.append(position)
+            continue
+        source = deduplicator.find_duplicate(signature)
+        if source is not None:
+            duplicate_pages[position] = {'source': source, 'page_size': page['page_size']}
+            continue
+        deduplicator.add(signature, position)
+        pages_to_detect.append(page)
+    return pages_to_detect
+
+
+def finish_page_batch(page_batch: List[Dict[str, Any]], pages_to_detect: List[Dict[str, Any]],
+                      detections_per_page: List[List[Dict[str, Any]]],
+                      buffer_pool: Optional[PageBufferPool] = None,
+                      ocr: bool = True) -> Tuple[List[List[Dict[str, Any]]], Dict[str, int]]:
+    """
+    一批页面检测之后的处理：换算坐标、IoU 过滤、创建裁剪句柄、应用文本层，只裁剪之后需要像素的区域，
+    每页的句柄处理完即把整页图像的缓冲区归还 buffer_pool。
+    启用预取时在后台线程中执行，与下一批的推理重叠。
+    Returns:
+        与 page_batch 一一对应的检测结果（被跳过的页面为空列表），
+        以及统计 {'rendered_pixels': 渲染像素数, 'gray_pages': 灰度页数, 'text_layer_regions': 文本层识别的区域数}。
+    """
+    stats = {'rendered_pixels': 0, 'gray_pages': 0, 'text_layer_regions': 0}
+    for page, page_detections in zip(pages_to_detect, detections_per_page):
+        scale_page_detections(page, page_detections)
+    filtered_batch = batch_preprocess_detections(detections_per_page, iou_threshold=0.05)
+    release = buffer_pool.release if buffer_pool is not None else None
+    for page, page_detections in zip(pages_to_detect, filtered_batch):
+        stats['rendered_pixels'] += image_pixels(page['image'])
+        stats['gray_pages'] += page.get('colorspace') == COLORSPACE_GRAY
+        raster = PageRaster(page['image'], release)
+        crop_page_detections(page, page_detections, raster)
+        # 文本层填充了文字的区域不再需要裁剪
+        if TEXT_LAYER_ENABLED:
+            stats['text_layer_regions'] += apply_text_layer(page_detections, page.get('spans'), PDF_RENDER_DPI)
+        stats['rendered_pixels'] += resolve_page_crops(page_detections, ocr)
+        # 只保留裁剪结果，整页图像的缓冲区交给后续批次复用
+        raster.close()
+    # 被跳过的页面先以空列表占位，保持页面序号
+    detected = {id(page): page_detections for page, page_detections in zip(pages_to_detect, filtered_batch)}
+    batch_results = [detected.get(id(page), []) for page in page_batch]
+    if release is not None:
+        for page in page_batch:
+            if id(page) not in detected:
+                release(page['image'])
+    return batch_results, stats
+
+
+async def layout_prediction(input_path: Union[str, List[str]], bool_ocr = True, task_id = None,
+                            batch_size: int = LAYOUT_BATCH_SIZE,
+                            page_images: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+    """
+    处理文档（单个文件、目录或文件列表），执行布局分析、文本提取和结构化，并进行可视化。
+    页面按批次流式处理：渲染一批、检测、过滤、只裁剪之后需要像素的区域，随即释放整页图像，
+    同时驻留内存的页面数不超过 MAX_INFLIGHT_PAGES。
+    PREFETCH_DEPTH > 0 时三段流水线并行：后台线程提前渲染最多 PREFETCH_DEPTH 批，
+    当前批次推理的同时，上一批在另一个线程中裁剪（finish_page_batch）。
+    batch_size 设为 auto（ADAPTIVE_BATCH_SIZE）时，布局模型每次推理的页数由 AdaptiveBatcher 自动选择，
+    最终的批大小写入日志和任务结果的 pipeline_stats['layout_batch']。
+    一次推理的页面必须同时驻留内存，因此自动选择的批大小不超过一批渲染的页数
+    MAX_INFLIGHT_PAGES // (PREFETCH_DEPTH + 3)：跨批凑页或按分批器放大渲染批都会突破 MAX_INFLIGHT_PAGES 的内存上限。
+    启用页面预过滤时，空白页不做检测和 OCR（结果为空列表），近似重复页在 OCR 后复制源页面的结果。
+    启用检测结果缓存时，处理过的页面（重新上传、重试、切换 OCR 模型后重新处理）直接复用缓存的检测结果。
+    page_images 不为 None 时，图片输入第一页的归一化图像（缩小、EXIF 旋转后的数组）按文件路径存入其中，
+    可视化（visualize_document 的 page_image）直接在其上绘制，不再重新解码原图。
     """
     if task_id:
         update_task_progress(task_id, 5, 'processing', '正在进行布局识别....')
-    file_extension = os.path.splitext(input_path)[1].lower()
-    all_page_images = []
-    if file_extension == '.pdf':
-        dataset = PDFDataset(input_path)
-        for page_index in range(len(dataset)):
-            page_image = dataset.get_page_image(page_index, dpi=300)
-            all_page_images.append({"image": page_image, "page_size": dataset.get_page_dimensions(page_index)})
-        dataset.close()
-    elif file_extension in ['.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff']:
-        image = Image.open(input_path).convert("RGB")
-        all_page_images.append({"image": image, "page_size": (int(image.width), int(image.height))})
-    else:
-        raise ValueError(f"不支持的文件类型: {file_extension}")
-    print(f"开始对 {len(all_page_images)} 页进行布局预测...")
-    detections_per_page = model_manager.layout_detector.batch_predict(
-        images=all_page_images,
-        batch_size=4  # 根据你的GPU显存和图片大小调整批处理大小
-    )
-    for i in range(len(detections_per_page)):
-        if isinstance(all_page_images[i], dict):
-            this_page_image = all_page_images[i]['image']
+    # 预取时同时驻留内存的批次：排队的 PREFETCH_DEPTH 批、渲染中 1 批、推理中 1 批、裁剪中 1 批
+    inflight_batches = PREFETCH_DEPTH + 3 if PREFETCH_DEPTH > 0 else 1
+    batch_size = max(1, min(batch_size, MAX_INFLIGHT_PAGES // inflight_batches))
+    filtered_detections = []
+    totals = {'rendered_pixels': 0, 'gray_pages': 0, 'text_layer_regions': 0}
+    deduplicator = PageDeduplicator()
+    blank_pages, duplicate_pages = [], {}
+    # 自适应时每次推理的页数由分批器决定，最多为一批渲染的页数
+    detect_batch_size = None if ADAPTIVE_BATCH_SIZE else batch_size
+    print(f"开始流式布局预测，每批 {batch_size} 页，布局模型批大小: {detect_batch_size or 'auto'}，"
+          f"预取深度: {PREFETCH_DEPTH}...")
+    if ADAPTIVE_BATCH_SIZE and batch_size < ADAPTIVE_BATCH_MAX_SIZE:
+        print(f"自动批大小最大为 {batch_size} 页（max_inflight_pages {MAX_INFLIGHT_PAGES} / 驻留批数 {inflight_batches}），"
+              f"需要更大的批时调大 max_inflight_pages 或减小 prefetch_depth")
+
+    def collect(batch_results: List[List[Dict[str, Any]]], stats: Dict[str, int]):
+        filtered_detections.extend(batch_results)
+        for key, value in stats.items():
+            totals[key] += value
+        print(f"已完成 {len(filtered_detections)} 页的布局预测")
+
+    # 页面缓冲区在 finish_page_batch 中归还，整个输入只需分配约 batch_size * inflight_batches 块缓冲区
+    buffer_pool = PageBufferPool(max_buffers=batch_size * inflight_batches)
+    page_batches = iter_page_batches(input_path, batch_size, buffer_pool)
+    prefetcher, finisher, pending = None, None, None
+    if PREFETCH_DEPTH > 0:
+        prefetcher = BatchPrefetcher(page_batches, PREFETCH_DEPTH, lock=PYMUPDF_LOCK)
+        finisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='page-finish')
+    pages_seen = 0
+    try:
+        for page_batch in (prefetcher if prefetcher is not None else page_batches):
+            if page_images is not None:
+                for page in page_batch:
+                    if page['source_page'] == 0 and os.path.splitext(page['source'])[1].lower() in IMAGE_EXTENSIONS:
+                        # 池中的缓冲区在裁剪后会被复用，这时需要拷贝
+                        image = page['image']
+                        page_images[page['source']] = image.copy() if buffer_pool.owns(image) else image
+            pages_to_detect = page_batch
+            if PAGE_FILTER_ENABLED:
+                pages_to_detect = filter_page_batch(page_batch, pages_seen, deduplicator, blank_pages, duplicate_pages)
+            pages_seen += len(page_batch)
+            detections_per_page = get_default_model_manager().layout_detector.batch_predict(
+                images=pages_to_detect,
+                batch_size=detect_batch_size
+            ) if pages_to_detect else []
+            if finisher is None:
+                collect(*finish_page_batch(page_batch, pages_to_detect, detections_per_page, buffer_pool, bool_ocr))
+            else:
+                # 上一批的裁剪与本批的推理同时进行，这里等它完成后再提交本批
+                if pending is not None:
+                    collect(*pending.result())
+                pending = finisher.submit(finish_page_batch, page_batch, pages_to_detect, detections_per_page,
+                                          buffer_pool, bool_ocr)
+            del page_batch, pages_to_detect, detections_per_page
+        if pending is not None:
+            collect(*pending.result())
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
         else:
-            this_page_image = None
-        for j in range(len(detections_per_page[i])):
-            if isinstance(detections_per_page[i][j], dict):
-                detections_per_page[i][j]['page_size'] = all_page_images[i]['page_size']
-                if this_page_image is not None:
-                    bbox = poly_to_bbox(detections_per_page[i][j]['poly'])
-                    cropped_image = this_page_image.crop(bbox)
-                    detections_per_page[i][j]['cropped_image'] = cropped_image
+            page_batches.close()
+        if finisher is not None:
+            finisher.shutdown(wait=True)
     print("布局预测完成。")
+    print(f"页面缓冲池统计: {buffer_pool.stats()}")
+    if prefetcher is not None:
+        print(f"推理线程等待页面渲染共 {prefetcher.wait_seconds:.2f} 秒")
+    layout_batch_stats = get_default_model_manager().layout_detector.get_batcher(detect_batch_size).stats()
+    print(f"布局模型批大小: {layout_batch_stats}")
+    record_task_stats(task_id, 'layout_batch', {**layout_batch_stats, 'max_pages_per_call': batch_size})
+    print("布局预测iou过滤完成")
+    if filtered_detections:
+        print(f"渲染模式 {RENDER_MODE}：平均每页渲染 "
+              f"{totals['rendered_pixels'] / len(filtered_detections) / 1e6:.2f} 百万像素")
+        print(f"色彩空间 {RENDER_COLORSPACE}：{totals['gray_pages']}/{len(filtered_detections)} 页以灰度处理")
+    page_cache = get_default_page_cache()
+    if page_cache is not None:
+        print(f"页面缓存统计: {page_cache.stats()}")
+    detection_cache = get_default_detection_cache()
+    if detection_cache is not None:
+        detection_cache_stats = detection_cache.stats()
+        print(f"布局检测结果缓存统计: {detection_cache_stats}")
+        record_task_stats(task_id, 'detection_cache', detection_cache_stats)
+    if TEXT_LAYER_ENABLED:
+        print(f"文本层快速通道直接识别了 {totals['text_layer_regions']} 个区域，这些区域跳过 OCR")
+    if PAGE_FILTER_ENABLED:
+        page_filter_stats = {
+            'total_pages': len(filtered_detections),
+            'blank_pages': [position + 1 for position in blank_pages],
+            'duplicate_pages': [{'page': position + 1, 'same_as': duplicate['source'] + 1}
+                                for position, duplicate in duplicate_pages.items()],
+        }
+        print(f"页面预过滤（页码从 1 开始）：跳过空白页 {page_filter_stats['blank_pages']}，"
+              f"复用重复页 {page_filter_stats['duplicate_pages']}")
+        record_task_stats(task_id, 'page_filter', page_filter_stats)
     if task_id:
         update_task_progress(task_id, 10, 'processing', '布局识别....完成')
-    filtered_detections = batch_preprocess_detections(detections_per_page, iou_threshold=0.05)
-    print("布局预测iou过滤完成")
     # 调用异步OCR函数
     if bool_ocr:
         filtered_detections = await ocr_test(data=filtered_detections,task_id=task_id,
                                              progress_callback=handle_progress)
+    # 重复页复制源页面的检测和 OCR 结果
+    for position, duplicate in duplicate_pages.items():
+        filtered_detections[position] = reuse_page_detections(filtered_detections[duplicate['source']],
+                                                              duplicate['page_size'])
     return filtered_detections
 
 
@@ -77,7 +324,7 @@ async def ocr_test(data: List[List[Dict[str, Any]]],
     async def run_ocr_task(image, i_idx, j_idx, inf: BlockType = None):
         nonlocal completed_count, total_tasks
         async with semaphore:
-            text = await model_manager.ocr_recognizer.predict(image, inf)
+            text = await get_default_model_manager().ocr_recognizer.predict(image, inf)
             completed_count += 1
             # 当任务完成时，调用回调函数
             if progress_callback:
@@ -87,7 +334,9 @@ async def ocr_test(data: List[List[Dict[str, Any]]],
 
     for i in range(len(data)):
         for j in range(len(data[i])):
-            if isinstance(data[i][j], dict) and data[i][j]['category_id'] in OCR_TEXT_VALUES:
+            # 已由文本层填充文字的区域不再发送给 OCR
+            if isinstance(data[i][j], Mapping) and data[i][j]['category_id'] in OCR_TEXT_VALUES \
+                    and 'text' not in data[i][j]:
                 category_id = int(data[i][j]['category_id'])
                 blockquote = BlockType_MEMBER[category_id]
                 task = asyncio.create_task(run_ocr_task(data[i][j]['cropped_image'], i, j, blockquote))
@@ -97,6 +346,7 @@ async def ocr_test(data: List[List[Dict[str, Any]]],
     if not ocr_tasks:
         return data
 
+    from tqdm.asyncio import tqdm_asyncio
     results = await tqdm_asyncio.gather(
         *ocr_tasks,
         total=total_tasks,
@@ -112,7 +362,7 @@ async def ocr_test(data: List[List[Dict[str, Any]]],
 def read_prediction(data:List[List[Dict[str, Any]]], task_id = None)->List[List[int]]:
     if task_id:
         update_task_progress(task_id, 92, 'processing', '正在计算阅读顺序...')
-    page_order = model_manager.read_model.batch_predict(data)
+    page_order = get_default_model_manager().read_model.batch_predict(data)
     order_in_list = find_reading_order_index(page_order)
     print(f'阅读顺序索引{order_in_list}')
     return order_in_list
@@ -176,16 +426,19 @@ def generate_markdown_document(data: List[List[Dict[str, Any]]], reading_order:
 async def main(path, task_id=None):
     sample_path = os.path.join(find_project_root(), path)
     file_name_without_extension, file_extension = os.path.splitext(os.path.basename(sample_path))
-    detections = await layout_prediction(sample_path, bool_ocr=True, task_id=task_id)
+    # 图片输入的归一化图像留给可视化复用
+    page_images = {}
+    detections = await layout_prediction(sample_path, bool_ocr=True, task_id=task_id, page_images=page_images)
     page_order = read_prediction(detections, task_id=task_id)
 
     visualize_path = visualize_document(
         input_path=sample_path,  # 传入原始输入路径
         detections_per_page=detections,
-        category_names=model_manager.layout_category_names,
+        page_image=page_images.get(sample_path),
+        category_names=get_default_model_manager().layout_category_names,
         page_order=page_order,
         file_prefix=file_name_without_extension,
-        dpi_for_image_output=300
+        dpi_for_image_output=PDF_RENDER_DPI
     )
     md_save_path = os.path.join(find_project_root(),
                                 f"srcProject/output/visualizations/{file_name_without_extension}",
@@ -195,6 +448,5 @@ async def main(path, task_id=None):
 
 
 if __name__ == '__main__':
-    model_manager = ModelManager()
     asyncio.run(main('tests/test_data/demo1_页面_3.png'))
 
@@ -0,0 +1,195 @@
+"""
+自适应批大小。
+
+布局模型每批的页数取决于设备内存、页面尺寸和模型本身，手工调参很难兼顾不同机器。
+AdaptiveBatcher 在推理过程中测量每批的耗时和峰值内存：
+- 吞吐量（页/秒）随批大小提升时按倍数增大批大小，提升不足 ADAPTIVE_BATCH_MIN_GAIN 时回落到最佳值并固定
+- 由测得的单页峰值内存和当前可用内存计算批大小上限，页面变大时自动收缩
+- 推理时内存分配失败则批大小减半，同一批页面拆开重试，不丢页；单页仍失败时才抛出异常
+"""
+import gc
+import threading
+import time
+from typing import Any, Callable, Dict, List
+import psutil
+from srcProject.config.constants import ADAPTIVE_BATCH_MAX_SIZE, ADAPTIVE_BATCH_MIN_GAIN, \
+    ADAPTIVE_BATCH_MEMORY_FRACTION, ADAPTIVE_BATCH_SAMPLE_INTERVAL
+
+# 不同后端内存不足时的异常信息片段（torch CPU / CUDA、onnxruntime 等）
+_ALLOCATION_ERROR_MARKERS = ('out of memory', "can't allocate memory", 'failed to allocate', 'bad_alloc',
+                             'defaultcpuallocator')
+
+
+def is_allocation_error(error: BaseException) -> bool:
+    """判断异常是否为内存分配失败。"""
+    if isinstance(error, MemoryError):
+        return True
+    message = str(error).lower()
+    return isinstance(error, RuntimeError) and any(marker in message for marker in _ALLOCATION_ERROR_MARKERS)
+
+
+class _PeakMemorySampler:
+    """
+    测量一段代码执行期间的峰值内存增量（字节）。
+    CUDA 设备读取 torch 的显存峰值统计；CPU 上由后台线程按固定间隔采样进程 RSS。
+    """
+    def __init__(self, device: str):
+        self.cuda = str(device).startswith('cuda')
+        self.peak_bytes = 0
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = None
+        self._baseline = 0
+
+    def __enter__(self):
+        if self.cuda:
+            import torch
+            torch.cuda.reset_peak_memory_stats()
+            self._baseline = torch.cuda.memory_allocated()
+        else:
+            self._baseline = self._process.memory_info().rss
+            self._peak_rss = self._baseline
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(ADAPTIVE_BATCH_SAMPLE_INTERVAL):
+            self._peak_rss = max(self._peak_rss, self._process.memory_info().rss)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.cuda:
+            import torch
+            self.peak_bytes = max(0, torch.cuda.max_memory_allocated() - self._baseline)
+        else:
+            self._stop.set()
+            self._thread.join()
+            self._peak_rss = max(self._peak_rss, self._process.memory_info().rss)
+            self.peak_bytes = max(0, self._peak_rss - self._baseline)
+        return False
+
+
+def _available_memory(device: str) -> int:
+    """返回设备当前可用内存（字节）。"""
+    if str(device).startswith('cuda'):
+        import torch
+        free_bytes, _ = torch.cuda.mem_get_info()
+        return free_bytes
+    return psutil.virtual_memory().available
+
+
+def _release_memory(device: str):
+    """分配失败后尽量归还缓存的内存。"""
+    gc.collect()
+    if str(device).startswith('cuda'):
+        import torch
+        torch.cuda.empty_cache()
+
+
+class AdaptiveBatcher:
+    """
+    按测得的吞吐量和内存自动选择批大小，并在多次调用之间保留测量结果。
+    Args:
+        device: 推理设备，决定内存的测量方式。
+        initial_size: 初始批大小。
+        max_size: 批大小上限。
+        adaptive: 为 False 时固定使用 initial_size，只保留内存不足时的回退。
+    """
+    def __init__(self, device: str = 'cpu', initial_size: int = 1, max_size: int = ADAPTIVE_BATCH_MAX_SIZE,
+                 adaptive: bool = True):
+        self.device = device
+        self.max_size = max(1, max_size)
+        self.batch_size = max(1, min(initial_size, self.max_size))
+        self.adaptive = adaptive
+        self.settled = not adaptive
+        self.per_page_bytes = 0 # 单页峰值内存增量的估计值
+        self.backoffs = 0 # 内存不足而减半的次数
+        self._throughput: Dict[int, float] = {} # 批大小 -> 最近测得的吞吐量（页/秒）
+        self._ceiling = self.max_size # 发生分配失败后的批大小上限
+        self._warmed_up = False
+        self._largest_call = 0 # 单次调用的最大页数，批大小增大到它为止
+
+    def _memory_limit(self) -> int:
+        """按单页内存估计和当前可用内存计算批大小上限。"""
+        limit = self._ceiling
+        if self.per_page_bytes:
+            budget = _available_memory(self.device) * ADAPTIVE_BATCH_MEMORY_FRACTION
+            limit = min(limit, max(1, int(budget // self.per_page_bytes)))
+        return limit
+
+    def _record(self, size: int, seconds: float):
+        """记录一批的吞吐量并调整批大小。"""
+        if self.settled or size != self.batch_size:
+            # 不足一批的尾部页面不代表当前批大小的吞吐量
+            return
+        self._throughput[size] = size / max(seconds, 1e-6)
+        smaller = [s for s in self._throughput if s < size]
+        if smaller:
+            previous = max(smaller)
+            if self._throughput[size] < self._throughput[previous] * (1 + ADAPTIVE_BATCH_MIN_GAIN):
+                # 增大批大小不再带来足够的提升，回落到占用内存更少的上一档并固定
+                self.batch_size = previous
+                self.settled = True
+                print(f"自适应批大小确定为 {self.batch_size}，各批大小吞吐量(页/秒): {self._format_throughput()}")
+                return
+        grown = min(size * 2, self._ceiling, self.max_size, self._largest_call)
+        if grown == size:
+            self.settled = True
+            print(f"自适应批大小达到上限 {self.batch_size}，各批大小吞吐量(页/秒): {self._format_throughput()}")
+        else:
+            self.batch_size = grown
+
+    def _format_throughput(self) -> str:
+        return ', '.join(f"{size}: {value:.2f}" for size, value in sorted(self._throughput.items()))
+
+    def run(self, items: List[Any], predict: Callable[[List[Any]], List[Any]]) -> List[Any]:
+        """
+        按当前批大小分批调用 predict，返回与 items 一一对应的结果。
+        内存分配失败时批大小减半并从失败的那一批重新开始，已完成的结果保留。
+        """
+        results = []
+        index = 0
+        self._largest_call = max(self._largest_call, len(items))
+        while index < len(items):
+            size = max(1, min(self.batch_size, self._memory_limit(), len(items) - index))
+            chunk = items[index:index + size]
+            allocation_failed = False
+            try:
+                with _PeakMemorySampler(self.device) as sampler:
+                    start = time.perf_counter()
+                    chunk_results = predict(chunk)
+                    seconds = time.perf_counter() - start
+            except Exception as e:
+                if not is_allocation_error(e) or size == 1:
+                    raise
+                allocation_failed = True
+            if allocation_failed:
+                # 在 except 块之外释放，异常回溯引用的中间张量此时已可回收
+                _release_memory(self.device)
+                self.backoffs += 1
+                self._ceiling = max(1, size // 2)
+                self.batch_size = min(self.batch_size, self._ceiling)
+                self.settled = True
+                print(f"批大小 {size} 推理时内存不足，减小为 {self.batch_size} 后重试")
+                continue
+            results.extend(chunk_results)
+            index += size
+            if not self._warmed_up:
+                # 首批包含模型初始化、内存池扩张等一次性开销，不参与测量
+                self._warmed_up = True
+                continue
+            self.per_page_bytes = max(self.per_page_bytes, sampler.peak_bytes // size)
+            if self.adaptive:
+                self._record(size, seconds)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """返回当前批大小及测量结果，写入日志和任务结果。"""
+        return {
+            'batch_size': self.batch_size,
+            'adaptive': self.adaptive,
+            'settled': self.settled,
+            'per_page_mb': round(self.per_page_bytes / 2 ** 20, 1),
+            'backoffs': self.backoffs,
+            'throughput': {size: round(value, 2) for size, value in sorted(self._throughput.items())},
+        }
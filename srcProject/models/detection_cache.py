@@ -0,0 +1,138 @@
+"""
+Persistent cache for layout detection results.
+
+Provides:
+- DetectionCache: SQLite store of per-page detection arrays (boxes, classes, scores)
+- Keys made of the page raster hash and a detector namespace (model name, weights content hash, LAYOUT_SETTING_*)
+Changing the weights or the thresholds changes the namespace, so stale results are never returned.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from PIL import Image
+from srcProject.config.constants import LAYOUT_SETTING_IMGSIZE, LAYOUT_SETTING_CONF, LAYOUT_SETTING_IOU
+from srcProject.config.settings import DETECTION_CACHE_ENABLED, DETECTION_CACHE_PATH, DETECTION_CACHE_MAX_ENTRIES
+from srcProject.data_loaders.page_cache import file_content_hash
+from srcProject.models.model_base import DetectionBatch
+
+
+def raster_hash(image) -> str:
+    """计算页面像素的哈希，包含尺寸、通道和数据类型，与图像来源（文件、页码、缓存）无关。"""
+    digest = hashlib.sha256()
+    if isinstance(image, Image.Image):
+        digest.update(f"{image.mode}{image.size}".encode())
+        digest.update(image.tobytes())
+    else:
+        array = np.ascontiguousarray(image)
+        digest.update(f"{array.dtype}{array.shape}".encode())
+        digest.update(memoryview(array).cast('B'))
+    return digest.hexdigest()
+
+
+def detector_namespace(name: str, model_path: str) -> str:
+    """检测器标识：模型名称、权重文件内容哈希和检测阈值，任一变化时旧结果自动失效。"""
+    weights = file_content_hash(model_path) if os.path.isfile(model_path) else os.path.abspath(model_path)
+    return f"{name}_{weights}_{LAYOUT_SETTING_IMGSIZE}_{LAYOUT_SETTING_CONF}_{LAYOUT_SETTING_IOU}"
+
+
+class DetectionCache:
+    """
+    以 SQLite 保存每页检测结果的数组形式，命中时直接返回 DetectionBatch，跳过推理。
+    条目数超过 max_entries 时淘汰最久未使用的条目。
+    """
+    def __init__(self, db_path: str, max_entries: int = 100000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # Flask 的任务线程和流水线线程共用一个连接，由锁串行化
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS detections ('
+            'namespace TEXT NOT NULL, page_hash TEXT NOT NULL, '
+            'boxes BLOB NOT NULL, classes BLOB NOT NULL, scores BLOB NOT NULL, accessed REAL NOT NULL, '
+            'PRIMARY KEY (namespace, page_hash))')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS detections_accessed ON detections (accessed)')
+        self._connection.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, namespace: str, page_hashes: List[str]) -> Dict[str, DetectionBatch]:
+        """查找一批页面，返回命中的 {页面哈希: 检测结果}，并更新命中条目的访问时间。"""
+        unique_hashes = list(dict.fromkeys(page_hashes))
+        found = {}
+        with self._lock:
+            for start in range(0, len(unique_hashes), 500):
+                chunk = unique_hashes[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT page_hash, boxes, classes, scores FROM detections "
+                    f"WHERE namespace = ? AND page_hash IN ({','.join('?' * len(chunk))})",
+                    [namespace, *chunk]).fetchall()
+                for page_hash, boxes, classes, scores in rows:
+                    found[page_hash] = (boxes, classes, scores)
+            if found:
+                now = time.time()
+                self._connection.executemany(
+                    'UPDATE detections SET accessed = ? WHERE namespace = ? AND page_hash = ?',
+                    [(now, namespace, page_hash) for page_hash in found])
+                self._connection.commit()
+            hits = sum(page_hash in found for page_hash in page_hashes)
+            self.hits += hits
+            self.misses += len(page_hashes) - hits
+        return {page_hash: DetectionBatch(np.frombuffer(boxes, dtype=np.int64).copy(),
+                                          np.frombuffer(classes, dtype=np.int64).copy(),
+                                          np.frombuffer(scores, dtype=np.float64).copy())
+                for page_hash, (boxes, classes, scores) in found.items()}
+
+    def put_many(self, namespace: str, detections: Dict[str, DetectionBatch]):
+        """写入一批页面的检测结果，超出容量时淘汰最久未使用的条目。"""
+        now = time.time()
+        rows = [(namespace, page_hash, page.boxes.astype(np.int64).tobytes(), page.classes.astype(np.int64).tobytes(),
+                 page.scores.astype(np.float64).tobytes(), now)
+                for page_hash, page in detections.items()]
+        if not rows:
+            return
+        with self._lock:
+            self._connection.executemany('INSERT OR REPLACE INTO detections VALUES (?, ?, ?, ?, ?, ?)', rows)
+            count = self._connection.execute('SELECT COUNT(*) FROM detections').fetchone()[0]
+            if count > self.max_entries:
+                self._connection.execute(
+                    'DELETE FROM detections WHERE rowid IN '
+                    '(SELECT rowid FROM detections ORDER BY accessed LIMIT ?)', (count - self.max_entries,))
+            self._connection.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """返回命中统计和条目数。"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            entries = self._connection.execute('SELECT COUNT(*) FROM detections').fetchone()[0]
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': entries,
+            }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_default_detection_cache = None
+_default_detection_cache_lock = threading.Lock()
+
+
+def get_default_detection_cache() -> Optional[DetectionCache]:
+    """返回按 configs.yaml 中 detection_cache 配置创建的全局缓存；未启用时返回 None。"""
+    global _default_detection_cache
+    if not DETECTION_CACHE_ENABLED:
+        return None
+    with _default_detection_cache_lock:
+        if _default_detection_cache is None:
+            _default_detection_cache = DetectionCache(DETECTION_CACHE_PATH, DETECTION_CACHE_MAX_ENTRIES)
+        return _default_detection_cache
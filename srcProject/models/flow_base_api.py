@@ -4,14 +4,30 @@
 """
 import requests
 import base64
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from PIL import Image
 import io
 from io import BytesIO
 from srcProject.config.constants import INSTRUCTION, BlockType
 from srcProject.config.settings import FLOW_API_KEY, FLOW_URL, FLOW_API_NAME
 from srcProject.models.model_base import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import random
+
+# API 配置的校验（请求模型列表）在后台线程中进行，结果按 (客户端类型, 地址, 密钥) 在进程内复用，
+# 切换回已校验过的配置时不再请求；校验失败的配置不缓存，下次创建时重新校验
+_validation_futures: Dict[Tuple[str, str, str], Future] = {}
+_validation_lock = threading.Lock()
+_validation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ocr-validate')
+
+
+def _forget_failed_validation(key: Tuple[str, str, str], future: Future):
+    if future.exception() is not None:
+        with _validation_lock:
+            if _validation_futures.get(key) is future:
+                del _validation_futures[key]
+
 def image_to_base64(image: Image.Image) -> str:
     """
     将 PIL Image 对象转换为 base64 编码的字符串。
@@ -46,9 +62,31 @@ class FlowOCR(BaseModel):
 
     def _load_model(self):
         """
-        加载模型（对于API客户端，这里主要是验证API密钥）
+        加载模型（对于API客户端，这里主要是验证API密钥）。
+        校验（_validate）在后台线程中进行，不阻塞构造；同一配置已校验过时直接复用结果。
         """
+        key = (type(self).__name__, self.api_url, self.api_keys[0] if self.api_keys else '')
+        with _validation_lock:
+            future = _validation_futures.get(key)
+            created = future is None
+            if created:
+                future = _validation_executor.submit(self._validate)
+                _validation_futures[key] = future
+        if created:
+            future.add_done_callback(lambda done: _forget_failed_validation(key, done))
+        self.validation = future
+
+    def _validate(self):
+        """校验 API 配置（如请求模型列表），失败时抛出异常。"""
         pass
+
+    @property
+    def validation_status(self) -> str:
+        """API 配置的校验状态：validating / ready / failed: 错误信息。"""
+        if not self.validation.done():
+            return 'validating'
+        error = self.validation.exception()
+        return 'ready' if error is None else f'failed: {error}'
     def _get_keys_index(self)->int|None:
         """
         从列表中随机返回一个值，但该值不能是 -1。
@@ -25,11 +25,11 @@ class Google(FlowOCR):
         self.client = genai.Client(api_key=self.api_keys[0])
         super().__init__(api_keys, "", self.api_model_name)
 
-    def _load_model(self):
+    def _validate(self):
         """
-        加载模型（对于API客户端，这里主要是验证API密钥）
+        验证API密钥并列出可用模型（在后台线程中执行）
         """
-        print("def _load_model:", self.api_model_name,self.api_keys)
+        print("def _validate:", self.api_model_name,self.api_keys)
         for m in self.client.models.list():
             for action in m.supported_actions:
                 if action == "generateContent":
@@ -94,6 +94,20 @@ def boxes2inputs(boxes: List[List[int]]) -> Dict[str, torch.Tensor]:
     }
 
 
+def boxes2batch_inputs(list_of_boxes: List[List[List[int]]]) -> Dict[str, torch.Tensor]:
+    """
+    将多个页面的边界框列表整理为一批模型输入。
+    由 DataCollator 添加 [CLS] 和 [EOS] 并填充到批次中的最大序列长度，填充部分的注意力掩码为0，
+    每个页面的 bbox / input_ids / attention_mask 与 boxes2inputs 的结果只差末尾的填充。
+    预测阶段不需要标签，返回前去掉 labels。
+    """
+    features = [{"source_boxes": boxes, "target_index": list(range(1, len(boxes) + 1))}
+                for boxes in list_of_boxes]
+    inputs = DataCollator()(features)
+    inputs.pop("labels")
+    return inputs
+
+
 def prepare_inputs(
     inputs: Dict[str, torch.Tensor], model: LayoutLMv3ForTokenClassification
 ) -> Dict[str, torch.Tensor]:
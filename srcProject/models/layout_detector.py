@@ -5,12 +5,16 @@ Provides classes for:
 - Encapsulating layout detection models (e.g., YOLOv)
 - Inference code for document layout analysis
 - Detection result processing
+torch and doclayout_yolo are imported when the model is loaded, so subclasses such as the ONNX backend
+and tools that only need the detection types do not pull them in.
 """
-from doclayout_yolo import YOLOv10
+import numpy as np
 from srcProject.config.constants import LAYOUT_SETTING_IOU, LAYOUT_SETTING_CONF, LAYOUT_SETTING_IMGSIZE, \
-    BlockType_MEMBER
-from srcProject.models.model_base import BaseModel, BatchDetections, PageDetections
-from typing import List, Dict, Any
+    BlockType_MEMBER, ADAPTIVE_BATCH_MAX_SIZE
+from srcProject.models.adaptive_batcher import AdaptiveBatcher
+from srcProject.models.detection_cache import get_default_detection_cache, detector_namespace, raster_hash
+from srcProject.models.model_base import BaseModel, BatchDetections, PageDetections, DetectionBatch
+from typing import List, Dict, Any, Optional
 
 class DocLayoutYOLO(BaseModel):
     """
@@ -19,14 +23,21 @@ class DocLayoutYOLO(BaseModel):
     def __init__(self,model_path: str, device: str = 'cuda'):
         super().__init__(model_path, device)
         self.name = "doclayout_yolo"
+        self.batcher: Optional[AdaptiveBatcher] = None # 跨调用保留批大小的测量结果
+        self._cache_namespace: Optional[str] = None
 
     def _load_model(self):
         print(f"正在 {self.device} 上从 {self.model_path} 加载 DocLayoutYOLO 模型")
+        from doclayout_yolo import YOLOv10
         # 替换为你的 DocLayoutYOLO 模型的实际加载逻辑
         self.model = YOLOv10(self.model_path).to(self.device)
         print(f"加载 DocLayoutYOLO 模型成功")
 
-    def batch_predict(self, images: list, batch_size: int) -> BatchDetections:
+    def batch_predict(self, images: list, batch_size: Optional[int] = None) -> BatchDetections:
+        """
+        批量检测。batch_size 为 None 时由 AdaptiveBatcher 按测得的吞吐量和内存自动选择批大小，
+        否则固定按 batch_size 分批；两种方式在内存不足时都会减小批大小重试。
+        """
         # 检查 images 是否为列表
         if not isinstance(images, list):
             raise TypeError("参数 'images' 必须是一个列表。")
@@ -42,62 +53,100 @@ class DocLayoutYOLO(BaseModel):
         else:
             return self._batch_predict(images, batch_size)
 
-    def _batch_predict(self, images:List, batch_size:int) -> BatchDetections:
-        images_layout_res = []
-        for index in range(0, len(images), batch_size):
-            # [image_res.cpu() for image_res in ...] (列表推导式)
-            doclayout_yolo_res = [
-                image_res.cpu()
-                for image_res in self.model.predict(
-                    images[index : index + batch_size],
-                    imgsz=LAYOUT_SETTING_IMGSIZE,
-                    conf=LAYOUT_SETTING_CONF,
-                    iou=LAYOUT_SETTING_IOU,
-                    verbose=False,
-                    device=self.device,
-                )
-            ]
-            for image_res in doclayout_yolo_res:
-                layout_res = []
-                for xyxy, conf, cla in zip(
-                    image_res.boxes.xyxy,
-                    image_res.boxes.conf,
-                    image_res.boxes.cls,
-                ):
-                    xmin, ymin, xmax, ymax = [int(p.item()) for p in xyxy]
-                    new_item = {
-                        "category_id": int(cla.item()),
-                        "poly": [xmin, ymin, xmax, ymin, xmax, ymax, xmin, ymax],
-                        "score": round(float(conf.item()), 3),
-                    }
-                    layout_res.append(new_item)
-                images_layout_res.append(layout_res)
+    @staticmethod
+    def _to_model_input(image):
+        """
+        转换为模型输入。PIL Image 原样传入（灰度图由 YOLO 转为 RGB）；numpy 数组按 RGB 排列，
+        而 YOLO 把数组视为 BGR，因此传入反转通道顺序的视图，不拷贝像素；
+        灰度数组以广播视图扩展为三通道，只在缩放到模型输入尺寸时才生成三通道数据。
+        """
+        if isinstance(image, np.ndarray):
+            if image.ndim == 2:
+                return np.broadcast_to(image[..., None], image.shape + (3,))
+            if image.shape[2] >= 3:
+                return image[..., 2::-1]
+        return image
 
-        return images_layout_res
+    @property
+    def batcher_device(self) -> str:
+        """分批器测量内存时使用的设备。"""
+        return self.device
 
-    def predict(self, image)-> PageDetections:
-        layout_res = []  # 最终要返回的列表
+    def get_batcher(self, batch_size: Optional[int] = None) -> AdaptiveBatcher:
+        """返回与批大小设置对应的分批器，设置不变时复用，保留已有的测量结果。"""
+        adaptive = batch_size is None
+        if (self.batcher is None or self.batcher.adaptive != adaptive
+                or (not adaptive and self.batcher.max_size != batch_size)):
+            if adaptive:
+                self.batcher = AdaptiveBatcher(self.batcher_device, initial_size=1, max_size=ADAPTIVE_BATCH_MAX_SIZE)
+            else:
+                self.batcher = AdaptiveBatcher(self.batcher_device, initial_size=batch_size, max_size=batch_size,
+                                               adaptive=False)
+        return self.batcher
+
+    def _predict_chunk(self, images: List) -> BatchDetections:
+        """
+        对一批模型输入做一次前向推理。整批的检测张量 (x0, y0, x1, y1, conf, cls) 拼接后一次性转为 numpy，
+        每页的结果以列存储的 DetectionBatch 返回，不为每个检测框构建字典。
+        """
+        import torch
         doclayout_yolo_res = self.model.predict(
-            image,
+            images,
             imgsz=LAYOUT_SETTING_IMGSIZE,
             conf=LAYOUT_SETTING_CONF,
             iou=LAYOUT_SETTING_IOU,
-            verbose=False, device=self.device
-        )[0]  # [0] 表示取第一个（也是唯一一个）图像的预测结果
-        for xyxy, conf, cla in zip(
-                doclayout_yolo_res.boxes.xyxy.cpu(),  # 边界框坐标
-                doclayout_yolo_res.boxes.conf.cpu(),  # 置信度
-                doclayout_yolo_res.boxes.cls.cpu(),  # 类别ID
-        ):
-            xmin, ymin, xmax, ymax = [int(p.item()) for p in xyxy]  # 将 tensor 转为 int
-            new_item = {
-                "category_id": int(cla.item()),  # 类别ID
-                "poly": [xmin, ymin, xmax, ymin, xmax, ymax, xmin, ymax],  # 四边形顶点坐标
-                "score": round(float(conf.item()), 3),  # 置信度，保留三位小数
-            }
-            layout_res.append(new_item)
-        print(layout_res)
-        return layout_res
+            verbose=False,
+            device=self.device,
+        )
+        boxes_data = [image_res.boxes.data for image_res in doclayout_yolo_res]
+        if not boxes_data:
+            return []
+        detections = torch.cat(boxes_data).cpu().numpy()
+        counts = np.cumsum([len(data) for data in boxes_data])[:-1]
+        # 与 Boxes.xyxy / conf / cls 相同的列：前 4 列为坐标，倒数第 2、1 列为置信度和类别
+        return [DetectionBatch.from_xyxy(page[:, :4], page[:, -1], page[:, -2])
+                for page in np.split(detections, counts)]
+
+    @property
+    def cache_namespace(self) -> str:
+        """检测结果缓存中本检测器的标识，首次使用时计算权重文件的内容哈希。"""
+        if self._cache_namespace is None:
+            self._cache_namespace = detector_namespace(self.name, self.model_path)
+        return self._cache_namespace
+
+    def _batch_predict(self, images:List, batch_size: Optional[int]) -> BatchDetections:
+        """
+        启用检测结果缓存时先按页面像素哈希查缓存，只有未命中的页面送入模型，结果写回缓存。
+        """
+        cache = get_default_detection_cache()
+        if cache is None:
+            images = [self._to_model_input(image) for image in images]
+            return self.get_batcher(batch_size).run(images, self._predict_chunk)
+        page_hashes = [raster_hash(image) for image in images]
+        cached = cache.get_many(self.cache_namespace, page_hashes)
+        results: BatchDetections = [None] * len(images)
+        missing = []
+        for index, page_hash in enumerate(page_hashes):
+            if page_hash in cached:
+                # 每页一个新的结果对象，同一批中的重复页面在后续修改时互不影响
+                results[index] = cached[page_hash].copy()
+            else:
+                missing.append(index)
+        if missing:
+            predicted = self.get_batcher(batch_size).run(
+                [self._to_model_input(images[index]) for index in missing], self._predict_chunk)
+            for index, page in zip(missing, predicted):
+                results[index] = page
+            cache.put_many(self.cache_namespace, {page_hashes[index]: page for index, page in zip(missing, predicted)})
+        return results
+
+    def predict(self, image)-> PageDetections:
+        """单页检测，结果格式与 batch_predict 的每一页相同。"""
+        return self._predict_chunk([self._to_model_input(image)])[0]
+
+    def warm_up(self):
+        """对一张与 A4 页面比例相同的空白灰度页推理一次，不经过分批器和检测结果缓存。"""
+        self.predict(np.full((LAYOUT_SETTING_IMGSIZE, LAYOUT_SETTING_IMGSIZE * 707 // 1000), 255, dtype=np.uint8))
 
     @property
     def names(self) -> Dict[int, str]:
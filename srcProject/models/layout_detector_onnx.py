@@ -0,0 +1,169 @@
+"""
+ONNX Runtime backend for the layout detector.
+
+Provides:
+- DocLayoutYOLOOnnx: runs the exported DocLayoutYOLO model (scripts/export_layout_onnx.py) with ONNX Runtime
+- Letterbox preprocessing, box rescaling and NMS implemented with numpy
+The output format is the same as DocLayoutYOLO (category_id, poly, score).
+onnxruntime and cv2 are imported on first use; this backend never imports torch.
+"""
+import ast
+from typing import List, Tuple
+import numpy as np
+from PIL import Image
+from srcProject.config.constants import LAYOUT_SETTING_IOU, LAYOUT_SETTING_CONF, LAYOUT_SETTING_IMGSIZE
+from srcProject.models.layout_detector import DocLayoutYOLO
+from srcProject.models.model_base import BatchDetections, DetectionBatch
+
+LETTERBOX_FILL = 114 # 与 YOLO 相同的填充灰度
+MAX_DETECTIONS = 300 # 每页最多保留的检测框数，与 YOLO 的 max_det 默认值相同
+
+
+def letterbox_batch(images: List[np.ndarray], imgsz: Tuple[int, int], stride: int = 32,
+                    auto: bool = False) -> np.ndarray:
+    """
+    按 YOLO 的 LetterBox 规则把一批图像等比缩放并居中填充，返回 (B, 3, H, W) 的 float32 模型输入（RGB，0~1）。
+    Args:
+        images: RGB (H, W, 3) 或灰度 (H, W) 的 uint8 数组，灰度在写入时广播为三通道。
+        imgsz: 模型输入尺寸 (高, 宽)。
+        auto: 为 True 时只填充到 stride 的整数倍（要求整批图像尺寸相同，模型输入尺寸需为动态）。
+    """
+    import cv2
+    shapes = []
+    for image in images:
+        height, width = image.shape[:2]
+        ratio = min(imgsz[0] / height, imgsz[1] / width)
+        new_width, new_height = int(round(width * ratio)), int(round(height * ratio))
+        pad_width, pad_height = imgsz[1] - new_width, imgsz[0] - new_height
+        if auto:
+            pad_width, pad_height = pad_width % stride, pad_height % stride
+        shapes.append((new_width, new_height, pad_width / 2, pad_height / 2))
+    # auto 时整批图像尺寸相同，填充后的尺寸也相同
+    new_width, new_height, pad_width, pad_height = shapes[0]
+    out_height = new_height + int(round(pad_height - 0.1)) + int(round(pad_height + 0.1))
+    out_width = new_width + int(round(pad_width - 0.1)) + int(round(pad_width + 0.1))
+    canvas = np.full((len(images), out_height, out_width, 3), LETTERBOX_FILL, dtype=np.uint8)
+    for index, (image, (new_width, new_height, pad_width, pad_height)) in enumerate(zip(images, shapes)):
+        if (image.shape[1], image.shape[0]) != (new_width, new_height):
+            image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+        top, left = int(round(pad_height - 0.1)), int(round(pad_width - 0.1))
+        region = canvas[index, top:top + new_height, left:left + new_width]
+        region[...] = image[..., None] if image.ndim == 2 else image[..., :3]
+    batch = canvas.transpose(0, 3, 1, 2).astype(np.float32)
+    batch *= 1 / 255.0
+    return batch
+
+
+def scale_boxes(boxes: np.ndarray, input_shape: Tuple[int, int], image_shape: Tuple[int, int]) -> np.ndarray:
+    """把模型输入坐标系 (高, 宽) 下的 xyxy 框换算回原图坐标，并裁剪到图像范围内。"""
+    gain = min(input_shape[0] / image_shape[0], input_shape[1] / image_shape[1])
+    pad_x = round((input_shape[1] - image_shape[1] * gain) / 2 - 0.1)
+    pad_y = round((input_shape[0] - image_shape[0] * gain) / 2 - 0.1)
+    boxes = (boxes - np.array([pad_x, pad_y, pad_x, pad_y], dtype=boxes.dtype)) / gain
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, image_shape[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, image_shape[0])
+    return boxes
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, classes: np.ndarray, iou_threshold: float,
+        max_det: int = MAX_DETECTIONS) -> np.ndarray:
+    """
+    按类别的非极大值抑制，返回保留框的下标（按分数降序）。
+    不同类别的框平移到互不重叠的区域，一次处理所有类别；每轮用向量运算计算当前框与其余框的 IoU。
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    offset_boxes = boxes + (classes.astype(boxes.dtype) * (boxes.max() + 1))[:, None]
+    x1, y1, x2, y2 = offset_boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while order.size and len(keep) < max_det:
+        current, rest = order[0], order[1:]
+        keep.append(current)
+        inter = (np.clip(np.minimum(x2[current], x2[rest]) - np.maximum(x1[current], x1[rest]), 0, None)
+                 * np.clip(np.minimum(y2[current], y2[rest]) - np.maximum(y1[current], y1[rest]), 0, None))
+        iou = inter / (areas[current] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def decode_predictions(output: np.ndarray, conf: float = LAYOUT_SETTING_CONF,
+                       iou: float = LAYOUT_SETTING_IOU) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    解码单张图像的模型输出，返回模型输入坐标系下的 (xyxy 框, 分数, 类别)。
+    - YOLOv10 端到端输出 (N, 6)：[x1, y1, x2, y2, score, class]，模型内部已去重，只按置信度过滤（与 torch 路径一致）
+    - 原始输出 (4 + 类别数, 锚点数)：[cx, cy, w, h, 各类别分数]，按置信度过滤后做 NMS
+    """
+    if output.shape[-1] == 6:
+        output = output[output[:, 4] > conf]
+        return output[:, :4], output[:, 4], output[:, 5].astype(np.int64)
+    predictions = output.T
+    class_scores = predictions[:, 4:]
+    classes = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(classes)), classes]
+    mask = scores > conf
+    xywh, scores, classes = predictions[mask, :4], scores[mask], classes[mask]
+    boxes = np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2], axis=1)
+    keep = nms(boxes, scores, classes, iou)
+    return boxes[keep], scores[keep], classes[keep]
+
+
+class DocLayoutYOLOOnnx(DocLayoutYOLO):
+    """
+    使用 ONNX Runtime 推理的 DocLayoutYOLO，适合没有 GPU 的机器。
+    模型由 scripts/export_layout_onnx.py 从 .pt 权重导出；导出时启用动态尺寸的模型可以整批推理，
+    并与 torch 路径一样只把页面填充到 stride 的整数倍。批大小的选择与 DocLayoutYOLO 相同。
+    """
+    def __init__(self, model_path: str, device: str = 'cpu'):
+        super().__init__(model_path, device)
+        self.name = "doclayout_yolo_onnx"
+
+    def _load_model(self):
+        print(f"正在 {self.device} 上从 {self.model_path} 加载 DocLayoutYOLO ONNX 模型")
+        import onnxruntime as ort
+        providers = ['CPUExecutionProvider']
+        if str(self.device).startswith('cuda'):
+            providers.insert(0, 'CUDAExecutionProvider')
+        self.session = ort.InferenceSession(self.model_path, providers=providers)
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # 动态维度在 ONNX 中以字符串或 None 表示
+        _, _, height, width = model_input.shape
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+        self.dynamic_shape = not (isinstance(height, int) and isinstance(width, int))
+        self.imgsz = (LAYOUT_SETTING_IMGSIZE, LAYOUT_SETTING_IMGSIZE) if self.dynamic_shape else (height, width)
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.stride = int(ast.literal_eval(metadata['stride'])) if 'stride' in metadata else 32
+        print(f"加载 DocLayoutYOLO ONNX 模型成功，输入尺寸 {self.imgsz}，"
+              f"动态批大小: {self.dynamic_batch}，动态尺寸: {self.dynamic_shape}")
+
+    @property
+    def batcher_device(self) -> str:
+        # ONNX Runtime 的内存不经过 torch，按进程内存测量
+        return 'cpu'
+
+    @staticmethod
+    def _to_model_input(image):
+        """转换为 RGB 或灰度 uint8 数组，letterbox 直接读取 RGB，无需像 YOLO 那样转换为 BGR。"""
+        if isinstance(image, Image.Image):
+            return np.asarray(image if image.mode in ('L', 'RGB') else image.convert('RGB'))
+        return image
+
+    def _predict_chunk(self, images: List) -> BatchDetections:
+        """对一批模型输入做一次前向推理；模型输入批大小固定时逐张推理。"""
+        if not self.dynamic_batch:
+            return [detections for image in images for detections in self._run_session([image])]
+        return self._run_session(images)
+
+    def _run_session(self, images: List[np.ndarray]) -> BatchDetections:
+        # 与 YOLO 一致：整批图像尺寸相同且模型支持动态尺寸时，只填充到 stride 的整数倍
+        auto = self.dynamic_shape and len({image.shape[:2] for image in images}) == 1
+        batch = letterbox_batch(images, self.imgsz, self.stride, auto)
+        outputs = self.session.run(None, {self.input_name: batch})[0]
+        images_layout_res = []
+        for output, image in zip(outputs, images):
+            boxes, scores, classes = decode_predictions(output, LAYOUT_SETTING_CONF, LAYOUT_SETTING_IOU)
+            boxes = scale_boxes(boxes, batch.shape[2:], image.shape[:2])
+            images_layout_res.append(DetectionBatch.from_xyxy(boxes, classes, scores))
+        return images_layout_res
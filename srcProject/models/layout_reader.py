@@ -1,9 +1,7 @@
 import os.path
 from abc import ABC, abstractmethod
-import torch
 from PIL import Image, ImageDraw
-from transformers import LayoutLMv3ForTokenClassification
-from srcProject.models.helpers import boxes2inputs, prepare_inputs, parse_logits
+from srcProject.config.constants import READER_LENGTH_BUCKETS, READER_BATCH_MAX_TOKENS
 from srcProject.models.model_base import BaseModel
 from srcProject.utlis.aftertreatment import normalize_polygons_to_bboxes
 from srcProject.utlis.common import find_project_root
@@ -14,8 +12,12 @@ class LayoutReader(BaseModel):
     """
     一个基于 LayoutLMv3ForTokenClassification 的阅读顺序模型。
     它接收边界框列表，并预测它们的阅读顺序。
+    quantize 为 True 时，在 CPU 上把模型的线性层动态量化为 INT8（权重预先量化，激活在推理时按批量化）。
+    torch、transformers 和 helpers 在加载模型和推理时才导入，使用 XY_CUT 时导入本模块
+    （find_reading_order_index）不会加载它们。
     """
-    def __init__(self, model_path: str, device: str = 'cuda'):
+    def __init__(self, model_path: str, device: str = 'cuda', quantize: bool = False):
+        self.quantize = quantize
         # BaseModel 的 __init__ 会自动调用 _load_model()
         super().__init__(model_path, device)
         self.name = "layout_reader"
@@ -25,16 +27,29 @@ class LayoutReader(BaseModel):
         从预训练路径加载 LayoutLMv3ForTokenClassification 模型。
         """
         print(f"正在 {self.device} 上从 {self.model_path} 加载 LayoutLMv3ForTokenClassification 模型")
+        from transformers import LayoutLMv3ForTokenClassification
         try:
             self.model = LayoutLMv3ForTokenClassification.from_pretrained(
                 self.model_path
             )
             # 将模型移动到指定设备并设置为评估模式
             self.model.to(self.device).eval()
+            if self.quantize:
+                self._quantize_model()
             print("加载 LayoutLMv3ForTokenClassification 模型成功")
         except Exception as e:
             raise RuntimeError(f"加载模型失败: {e}")
 
+    def _quantize_model(self):
+        """线性层动态量化为 INT8。量化算子只有 CPU 实现，其他设备保持 fp32。"""
+        if str(self.device) != 'cpu':
+            print(f"INT8 动态量化只支持 CPU，{self.device} 上保持 fp32")
+            self.quantize = False
+            return
+        import torch
+        self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        print("已将 LayoutLMv3 的线性层动态量化为 INT8")
+
     def predict(self, boxes: List[List[int]]) -> List[int]:
         """
         预测单个页面中一组边界框的阅读顺序。
@@ -46,6 +61,8 @@ class LayoutReader(BaseModel):
         """
         if not self.model:
             raise RuntimeError("模型未加载。")
+        import torch
+        from srcProject.models.helpers import boxes2inputs, prepare_inputs, parse_logits
         # 将边界框列表转换为模型输入
         inputs = boxes2inputs(boxes)
         # 准备模型输入
@@ -57,9 +74,16 @@ class LayoutReader(BaseModel):
         # 解析 logits，得到排序索引
         return parse_logits(logits, len(boxes))
 
+    def warm_up(self):
+        """对两个上下排列的框预测一次阅读顺序。"""
+        self.predict([[100, 100, 900, 200], [100, 300, 900, 400]])
+
     def batch_predict(self, data:List[List[Dict[str, Any]]]) -> List[List[int]]:
         """
         批量预测多个页面中边界框的阅读顺序。
+        页面按框数分组（见 group_by_length），同一组的页面填充到组内最长的序列后一次前向推理，
+        再逐页解析 logits，长文档只需少数几次前向推理。没有框的页面直接返回空列表，
+        框数超过 MAX_LEN 的页面仍单独预测。
         Args:
             data (List[List[Dict[str, Any]]]): 多个页面的边界框列表。
 
@@ -69,14 +93,22 @@ class LayoutReader(BaseModel):
         list_of_boxes = normalize_polygons_to_bboxes(data)
         if not self.model:
             raise RuntimeError("模型未加载。")
-        all_sorted_indices = []
-        for boxes in list_of_boxes:
-            # 批量预测实际上是对每个页面进行单次预测，然后收集结果
-            # 如果模型支持真正的 batch-level 推理，这里可以优化
-            # 但根据你的代码，它是在循环中逐页预测的
-            sorted_indices = self.predict(boxes)
-            all_sorted_indices.append(sorted_indices)
-
+        import torch
+        from srcProject.models.helpers import MAX_LEN, boxes2batch_inputs, prepare_inputs, parse_logits
+        all_sorted_indices: List[List[int]] = [[] for _ in list_of_boxes]
+        batchable = []
+        for index, boxes in enumerate(list_of_boxes):
+            if len(boxes) > MAX_LEN:
+                all_sorted_indices[index] = self.predict(boxes)
+            elif boxes:
+                batchable.append(index)
+        for group in group_by_length([len(list_of_boxes[index]) for index in batchable]):
+            pages = [batchable[position] for position in group]
+            inputs = prepare_inputs(boxes2batch_inputs([list_of_boxes[index] for index in pages]), self.model)
+            with torch.no_grad():
+                logits = self.model(**inputs).logits.cpu()
+            for index, page_logits in zip(pages, logits):
+                all_sorted_indices[index] = parse_logits(page_logits, len(list_of_boxes[index]))
         return all_sorted_indices
 
     def names(self) -> Dict[int, str]:
@@ -86,6 +118,29 @@ class LayoutReader(BaseModel):
         return {}
 
 
+def group_by_length(lengths: List[int], buckets=READER_LENGTH_BUCKETS,
+                    max_tokens: int = READER_BATCH_MAX_TOKENS) -> List[List[int]]:
+    """
+    按序列长度（框数 + [CLS]/[EOS]）把页面分入长度桶，每个桶再按 max_tokens 切分为若干组。
+    Args:
+        lengths: 每个页面的框数。
+        buckets: 递增的桶上界，超出最大桶的页面单独成桶。
+        max_tokens: 每组页数 × 桶上界的上限，每组至少一页。
+    Returns:
+        每组页面的下标列表，组内按框数升序。同一组的页面属于同一个桶，填充浪费的计算不超过桶宽。
+    """
+    bucket_pages: Dict[int, List[int]] = {}
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        length = lengths[index] + 2
+        bucket = next((size for size in buckets if length <= size), length)
+        bucket_pages.setdefault(bucket, []).append(index)
+    groups = []
+    for bucket, pages in sorted(bucket_pages.items()):
+        per_group = max(max_tokens // bucket, 1)
+        groups.extend(pages[start:start + per_group] for start in range(0, len(pages), per_group))
+    return groups
+
+
 def find_reading_order_index(reading_order: List[List[int]]) -> List[List[int]]:
     """
     在一个阅读顺序的列表或嵌套列表中找到给定ID的索引位置。
@@ -1,13 +1,177 @@
 # src/models/layout_detector.py
 from abc import ABC, abstractmethod # 导入抽象基类模块
+from collections.abc import MutableMapping, Sequence
+import numpy as np
 from PIL import Image
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 # 字典，例如 {'bbox': [x0,y0,x1,y1], 'category_id': int, 'score': float}
 LayoutDetection = Dict[str, Any]
 # 列表，包含一张的所有检测结果
 PageDetections = List[LayoutDetection]
 # 列表，包含多张的检测结果 (每项对应一页的PageDetections)
 BatchDetections = List[PageDetections]
+
+# poly 的 8 个坐标在 [x0, y0, x1, y1] 中的下标：左上、右上、右下、左下
+_POLY_INDEX = [0, 1, 2, 1, 2, 3, 0, 3]
+
+
+def _poly_bbox(poly) -> List[int]:
+    """与 aftertreatment.poly_to_bbox 相同：8 个坐标的 poly 取整后取外接框，4 个坐标视为 xyxy。"""
+    if len(poly) == 8:
+        xs, ys = [int(v) for v in poly[0::2]], [int(v) for v in poly[1::2]]
+        return [min(xs), min(ys), max(xs), max(ys)]
+    return list(poly)
+
+
+class DetectionView(MutableMapping):
+    """
+    DetectionBatch 中一行的字典视图，供按字典访问检测结果的代码使用。
+    'category_id'、'poly'、'score'、'page_size'、'cropped_image'、'text' 直接读写所属 DetectionBatch 的数组，
+    其他键（如 'text_source'）保存在该行的附加字典中。'poly' 总是由 xyxy 展开的轴对齐矩形。
+    """
+    __slots__ = ('batch', 'index')
+
+    def __init__(self, batch: "DetectionBatch", index: int):
+        self.batch = batch
+        self.index = index
+
+    def __getitem__(self, key):
+        return self.batch._get(self.index, key)
+
+    def __setitem__(self, key, value):
+        self.batch._set(self.index, key, value)
+
+    def __delitem__(self, key):
+        self.batch._delete(self.index, key)
+
+    def __iter__(self):
+        return iter(self.batch._keys(self.index))
+
+    def __len__(self) -> int:
+        return len(self.batch._keys(self.index))
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class DetectionBatch(Sequence):
+    """
+    一页检测结果的列存储：boxes 为 (N, 4) 的整数 xyxy，classes 为 (N,) 类别ID，scores 为 (N,) 置信度，
+    page_size 为整页共享的 (w, h)，crops、texts 为每行的裁剪图像和识别文字（没有时为 None）。
+    流水线各阶段（坐标换算、IoU 过滤、裁剪、阅读顺序）直接使用数组；按元素访问时返回 DetectionView，
+    用法与 {'category_id', 'poly', 'score', ...} 字典相同，修改直接写回数组。
+    """
+    _SIDE_KEYS = {'cropped_image': 'crops', 'text': 'texts'}
+
+    def __init__(self, boxes: np.ndarray, classes: np.ndarray, scores: np.ndarray,
+                 page_size: Optional[Tuple[int, int]] = None, crops: Optional[List[Any]] = None,
+                 texts: Optional[List[Optional[str]]] = None, extras: Optional[List[Optional[Dict]]] = None):
+        self.boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        self.classes = np.asarray(classes, dtype=np.int64).reshape(-1)
+        # 与 round(score, 3) 相同的三位小数
+        self.scores = np.round(np.asarray(scores, dtype=np.float64).reshape(-1), 3)
+        self.page_size = page_size
+        count = len(self.classes)
+        self.crops = list(crops) if crops is not None else [None] * count
+        self.texts = list(texts) if texts is not None else [None] * count
+        self.extras = list(extras) if extras is not None else [None] * count
+
+    @classmethod
+    def from_xyxy(cls, xyxy: np.ndarray, classes: np.ndarray, scores: np.ndarray) -> "DetectionBatch":
+        """由浮点 xyxy 坐标构建，坐标向零取整（与 int() 相同）。"""
+        return cls(np.trunc(xyxy), classes, scores)
+
+    def subset(self, selection) -> "DetectionBatch":
+        """按布尔掩码（keep）或下标数组取出若干行，返回新的 DetectionBatch，数组与原对象互不影响。"""
+        selection = np.asarray(selection)
+        indices = np.flatnonzero(selection) if selection.dtype == bool else selection.astype(np.int64).reshape(-1)
+        picked = indices.tolist()
+        return DetectionBatch(self.boxes[indices], self.classes[indices], self.scores[indices], self.page_size,
+                              [self.crops[i] for i in picked], [self.texts[i] for i in picked],
+                              [dict(self.extras[i]) if self.extras[i] else None for i in picked])
+
+    def copy(self) -> "DetectionBatch":
+        return self.subset(np.arange(len(self)))
+
+    def rescale(self, scale_x: float, scale_y: float):
+        """把坐标按比例换算并四舍五入为整数（与逐个坐标 int(round(p * scale)) 相同）。"""
+        self.boxes = np.round(self.boxes * np.array([scale_x, scale_y, scale_x, scale_y])).astype(np.int64)
+
+    def _get(self, index: int, key):
+        if key == 'category_id':
+            return int(self.classes[index])
+        if key == 'poly':
+            return self.boxes[index, _POLY_INDEX].tolist()
+        if key == 'score':
+            return float(self.scores[index])
+        if key == 'page_size' and self.page_size is not None:
+            return self.page_size
+        if key in self._SIDE_KEYS:
+            value = getattr(self, self._SIDE_KEYS[key])[index]
+            if value is not None:
+                return value
+        elif self.extras[index] and key in self.extras[index]:
+            return self.extras[index][key]
+        raise KeyError(key)
+
+    def _set(self, index: int, key, value):
+        if key == 'category_id':
+            self.classes[index] = value
+        elif key == 'poly':
+            self.boxes[index] = _poly_bbox(value)
+        elif key == 'score':
+            self.scores[index] = value
+        elif key == 'page_size':
+            # 页面尺寸整页共享
+            self.page_size = value
+        elif key in self._SIDE_KEYS:
+            getattr(self, self._SIDE_KEYS[key])[index] = value
+        else:
+            if self.extras[index] is None:
+                self.extras[index] = {}
+            self.extras[index][key] = value
+
+    def _delete(self, index: int, key):
+        if key in self._SIDE_KEYS and getattr(self, self._SIDE_KEYS[key])[index] is not None:
+            getattr(self, self._SIDE_KEYS[key])[index] = None
+        elif self.extras[index] and key in self.extras[index]:
+            del self.extras[index][key]
+        else:
+            raise KeyError(key)
+
+    def _keys(self, index: int) -> List[str]:
+        keys = ['category_id', 'poly', 'score']
+        if self.page_size is not None:
+            keys.append('page_size')
+        keys.extend(key for key, side in self._SIDE_KEYS.items() if getattr(self, side)[index] is not None)
+        if self.extras[index]:
+            keys.extend(self.extras[index])
+        return keys
+
+    def __len__(self) -> int:
+        return len(self.classes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.subset(np.arange(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('detection index out of range')
+        return DetectionView(self, index)
+
+    def __iter__(self):
+        return (DetectionView(self, index) for index in range(len(self)))
+
+    def __eq__(self, other):
+        if isinstance(other, (list, DetectionBatch)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr([dict(view) for view in self])
+
+
 class BaseModel(ABC):
     """
     所有模型的抽象基类。
@@ -26,6 +190,13 @@ class BaseModel(ABC):
         """
         pass
 
+    def warm_up(self):
+        """
+        用一次假输入完成推理后端的初始化（算子选择、内存分配等），避免第一个真实请求变慢。
+        默认不做任何事，需要预热的模型自行实现。
+        """
+        pass
+
     @property
     @abstractmethod
     def names(self) -> Dict[int, str]:
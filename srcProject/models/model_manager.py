@@ -7,72 +7,156 @@ Responsible for:
 - Coordinating inference across different model types
 - Corresponds to MonkeyOCR_model in the original implementation
 """
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Optional
 from srcProject.config.settings import LAYOUT_MODEL_NAME, LAYOUT_WEIGHTS_PATH, READ_MODEL_NAME, READ_WEIGHTS_PATH, \
-    FLOW_API_NAME, FLOW_API_KEY, FLOW_URL, DEVICE, FLOW_USE_MODEL_NAME
-from srcProject.models.google_api import Google
-from srcProject.models.layout_detector import DocLayoutYOLO
-from srcProject.models.layout_reader import LayoutReader
+    FLOW_API_NAME, FLOW_API_KEY, FLOW_URL, DEVICE, FLOW_USE_MODEL_NAME, QUANTIZATION_ENABLED, QUANTIZED_LAYOUT_PATH, \
+    MODEL_WARM_UP, MODEL_REGISTRY_MEMORY_MB
 from srcProject.models.model_base import BaseModel
-from srcProject.models.siliconflow_api import Silicon
-from srcProject.models.reader_xy_cut import XY_CUT
+from srcProject.models.model_registry import ModelRegistry
 
 class ModelFactory:
+    """
+    按名称创建模型。各模型的模块（torch、transformers、各 API SDK）在创建时才导入，
+    导入 model_manager 本身不加载任何推理框架。
+    """
     @staticmethod
     def create(model_name: str='',
                model_Path: str='',
                device: str = 'cuda',
                api_key: list|str = None,
                base_url: str = '',
-               api_name:str = 'api') -> BaseModel:
+               api_name:str = 'api',
+               quantize: bool = False) -> BaseModel:
         if model_name.lower() == 'doclayout_yolo':
+            from srcProject.models.layout_detector import DocLayoutYOLO
             return DocLayoutYOLO(model_Path, device)
+        elif model_name.lower() == 'doclayout_yolo_onnx':
+            from srcProject.models.layout_detector_onnx import DocLayoutYOLOOnnx
+            return DocLayoutYOLOOnnx(model_Path, device)
         elif model_name.lower() == 'layoutlmv3':
-            return LayoutReader(model_Path, device)
+            from srcProject.models.layout_reader import LayoutReader
+            return LayoutReader(model_Path, device, quantize=quantize)
         elif model_name.lower() == 'xy_cut':
+            from srcProject.models.reader_xy_cut import XY_CUT
             return XY_CUT()
         elif api_name.lower() == 'siliconflow':
+            from srcProject.models.siliconflow_api import Silicon
             return Silicon(api_keys=api_key, base_url=base_url, model_name=model_name)
         elif api_name.lower() == 'google':
+            from srcProject.models.google_api import Google
             return Google(api_keys=api_key, model_name=model_name)
         else:
             raise ValueError(f"不支持的模型名称: {model_name}")
 
 class ModelManager:
-    def __init__(self,device: str = DEVICE):
+    """
+    模型在后台线程中并行加载，构造函数立即返回，服务可以马上开始监听。
+    layout_detector / read_model / ocr_recognizer 在第一次访问时等待对应模型加载完成（加载失败时抛出加载时的异常），
+    status() 返回各模型的加载状态而不等待。warm_up 为 True 时模型加载后先用假输入推理一次，
+    第一个真实请求不再承担推理后端的初始化开销。OCR 客户端的 API 校验也在后台进行（见 FlowOCR）。
+    阅读顺序模型和 OCR 客户端登记在 registry 中（总内存不超过 MODEL_REGISTRY_MEMORY_MB，按 LRU 淘汰），
+    change_read_model / change_ocr_recognizer 切换回最近用过的模型或客户端时直接复用，不再重新加载。
+    """
+    def __init__(self,device: str = DEVICE, warm_up: bool = MODEL_WARM_UP):
         self.device = device
-        print(f"使用{self.device}加载了模型")
-        # 使用工厂创建布局检测器实例
-        self.layout_detector = ModelFactory.create(
-            model_name=LAYOUT_MODEL_NAME,
-            model_Path=LAYOUT_WEIGHTS_PATH,
-            device=device
-        )
-        # 现在可以通过检测器实例访问类别名称映射
-        self.layout_category_names = self.layout_detector.names
-        print(f"已加载布局模型: {LAYOUT_MODEL_NAME}，类别: {self.layout_category_names}")
-
-        self.read_model = ModelFactory.create(
-            model_name=READ_MODEL_NAME,
-            model_Path=READ_WEIGHTS_PATH,
-            device=device
-        )
-        print(f"已加载阅读顺序模型/算法: {READ_MODEL_NAME}")
-
-        self.ocr_recognizer = ModelFactory.create(
-            api_key=FLOW_API_KEY,
-            base_url=FLOW_URL,
-            api_name=FLOW_API_NAME,
-            model_name= FLOW_USE_MODEL_NAME
-        )
-        print(f"已加载OCR-api模型: {FLOW_API_NAME},当前激活: {FLOW_USE_MODEL_NAME}")
+        self.quantize = QUANTIZATION_ENABLED
+        self.warm_up = warm_up
+        self._futures: Dict[str, Future] = {}
+        self.registry = ModelRegistry(MODEL_REGISTRY_MEMORY_MB * 1024 * 1024)
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='model-load')
+        print(f"使用{self.device}在后台加载模型{'（INT8 量化）' if self.quantize else ''}")
+        # 量化模式下布局检测改用静态量化的 ONNX 模型
+        layout_model_name, layout_weights_path = LAYOUT_MODEL_NAME, LAYOUT_WEIGHTS_PATH
+        if self.quantize:
+            layout_model_name, layout_weights_path = 'doclayout_yolo_onnx', QUANTIZED_LAYOUT_PATH
+        self._futures['layout_detector'] = self._executor.submit(
+            self._load, '布局模型', None, layout_model_name, model_Path=layout_weights_path, device=device)
+        self._futures['read_model'] = self._executor.submit(
+            self._load, '阅读顺序模型/算法', self._read_model_key(READ_MODEL_NAME), READ_MODEL_NAME,
+            model_Path=READ_WEIGHTS_PATH, device=device, quantize=self.quantize)
+        self._futures['ocr_recognizer'] = self._executor.submit(
+            self._load, 'OCR-api模型', self._ocr_key(FLOW_API_NAME, FLOW_USE_MODEL_NAME, FLOW_API_KEY, FLOW_URL),
+            FLOW_USE_MODEL_NAME, api_key=FLOW_API_KEY, base_url=FLOW_URL, api_name=FLOW_API_NAME)
+
+    def _read_model_key(self, model_name: str) -> tuple:
+        return 'read_model', model_name.lower(), READ_WEIGHTS_PATH, self.device, self.quantize
+
+    @staticmethod
+    def _ocr_key(api_name: str, model_name: str, api_key: list|str, base_url: str) -> tuple:
+        return 'ocr_recognizer', api_name.lower(), model_name, base_url, \
+            tuple(api_key) if isinstance(api_key, list) else api_key
+
+    def _load(self, title: str, registry_key: Optional[tuple], model_name: str, **kwargs) -> BaseModel:
+        """
+        创建模型并按需预热。registry_key 不为 None 时先在 registry 中查找，命中则直接复用已构建的实例。
+        """
+        start = time.perf_counter()
+
+        def create() -> BaseModel:
+            model = ModelFactory.create(model_name=model_name, **kwargs)
+            if self.warm_up:
+                model.warm_up()
+            return model
+
+        if registry_key is None:
+            model, cached = create(), False
+        else:
+            model, cached = self.registry.get_or_create(registry_key, create)
+        print(f"已{'复用' if cached else '加载'}{title}: {model_name}，耗时 {time.perf_counter() - start:.2f} 秒")
+        return model
+
+    def _set(self, key: str, model: BaseModel):
+        future = Future()
+        future.set_result(model)
+        self._futures[key] = future
+
+    @property
+    def layout_detector(self) -> BaseModel:
+        return self._futures['layout_detector'].result()
+
+    @property
+    def layout_category_names(self) -> Dict:
+        # 通过检测器实例访问类别名称映射
+        return self.layout_detector.names
+
+    @property
+    def read_model(self) -> BaseModel:
+        return self._futures['read_model'].result()
+
+    @property
+    def ocr_recognizer(self) -> BaseModel:
+        return self._futures['ocr_recognizer'].result()
+
+    def status(self) -> Dict[str, str]:
+        """各模型的状态（loading / ready / failed: 错误信息），OCR 客户端为其 API 校验状态，不等待加载。"""
+        status = {}
+        for key, future in self._futures.items():
+            if not future.done():
+                status[key] = 'loading'
+            elif future.exception() is not None:
+                status[key] = f'failed: {future.exception()}'
+            else:
+                status[key] = getattr(future.result(), 'validation_status', 'ready')
+        return status
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """等待所有模型加载完成，超时返回 False。"""
+        _, not_done = wait(list(self._futures.values()), timeout=timeout)
+        return not not_done
 
     def change_read_model (self, model_name:str):
-        self.read_model = ModelFactory.create(
-            model_name=model_name,
+        self._set('read_model', self._load(
+            '阅读顺序模型/算法',
+            self._read_model_key(model_name),
+            model_name,
             model_Path=READ_WEIGHTS_PATH,
-            device=self.device
-        )
-        print(f"已加载阅读顺序模型/算法: {model_name}")
+            device=self.device,
+            quantize=self.quantize
+        ))
+        print(f"模型登记表统计: {self.registry.stats()}")
         return True
 
     def change_ocr_recognizer(self, model_name:str,
@@ -90,14 +174,35 @@ class ModelManager:
             return False
         if not api_name:
             api_name = FLOW_API_NAME
-        self.ocr_recognizer = ModelFactory.create(
+        # 客户端的 API 校验在后台进行，结果见 status()
+        self._set('ocr_recognizer', self._load(
+            f'OCR-api模型 {api_name}',
+            self._ocr_key(api_name, model_name, api_key, base_url),
+            model_name,
             api_key=api_key,
             base_url=base_url,
-            api_name=api_name,
-            model_name= model_name
-        )
-        print(f"已加载OCR-api模型: {api_name},当前激活: {model_name}")
+            api_name=api_name
+        ))
+        print(f"模型登记表统计: {self.registry.stats()}")
         return True
+
+
+_default_model_manager = None
+_default_model_manager_lock = threading.Lock()
+
+
+def get_default_model_manager() -> ModelManager:
+    """
+    返回全局的 ModelManager，第一次调用时创建（开始在后台加载模型）。
+    导入流水线模块不再加载模型，只用到 XY_CUT 或 Markdown 生成的工具不承担模型加载的开销。
+    """
+    global _default_model_manager
+    with _default_model_manager_lock:
+        if _default_model_manager is None:
+            _default_model_manager = ModelManager()
+        return _default_model_manager
+
+
 if __name__ == '__main__':
     # 获取当前脚本所在的目录
     ModelManager(device='cpu').change_ocr_recognizer(model_name="models/gemma-3-27b-it",
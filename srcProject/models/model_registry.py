@@ -0,0 +1,98 @@
+"""
+Registry of constructed models.
+
+Provides:
+- ModelRegistry: keyed cache of model instances with LRU eviction under a memory budget
+- estimate_model_bytes: parameter and buffer size of a model's torch module (0 for API clients and algorithms)
+Switching back to a recently used reading-order model or OCR client reuses the instance instead of
+reloading weights or re-creating the client.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+from srcProject.models.model_base import BaseModel
+
+
+def _tensor_bytes(value) -> int:
+    if hasattr(value, 'element_size') and hasattr(value, 'nelement'):
+        return value.element_size() * value.nelement()
+    if isinstance(value, (tuple, list)):
+        # 动态量化线性层的 state_dict 中，打包后的权重和偏置以元组保存
+        return sum(_tensor_bytes(item) for item in value)
+    return 0
+
+
+def estimate_model_bytes(model: BaseModel) -> int:
+    """估算模型占用的内存：底层 torch 模块 state_dict 中张量的字节数，没有 torch 模块时为 0。"""
+    state_dict = getattr(getattr(model, 'model', None), 'state_dict', None)
+    if not callable(state_dict):
+        return 0
+    try:
+        return sum(_tensor_bytes(value) for value in state_dict().values())
+    except Exception:
+        return 0
+
+
+class ModelRegistry:
+    """
+    按键缓存已构建的模型。总内存超过 memory_limit_bytes 时按最久未使用的顺序淘汰占用内存的模型
+    （不占内存的 API 客户端和算法淘汰了也不能释放内存，只受 max_entries 限制）；
+    刚登记的模型始终保留，即使它本身超出预算。
+    """
+    def __init__(self, memory_limit_bytes: int, max_entries: int = 16):
+        self.memory_limit_bytes = memory_limit_bytes
+        self.max_entries = max_entries
+        self._models = OrderedDict() # key -> (模型, 字节数)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_create(self, key: Hashable, create: Callable[[], BaseModel]) -> Tuple[BaseModel, bool]:
+        """
+        返回键对应的模型，未缓存时调用 create 构建并登记。
+        Returns:
+            (模型, 是否命中缓存)
+        """
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return entry[0], True
+            self.misses += 1
+        # 构建可能需要数秒（加载权重），不持有锁
+        model = create()
+        self.put(key, model)
+        return model, False
+
+    def put(self, key: Hashable, model: BaseModel):
+        """登记模型并设为最近使用，超出预算时淘汰最久未使用的模型。"""
+        size = estimate_model_bytes(model)
+        with self._lock:
+            if key in self._models:
+                self._bytes -= self._models.pop(key)[1]
+            self._models[key] = (model, size)
+            self._bytes += size
+            # 最后一项是刚登记的模型，不参与淘汰
+            candidates = [old_key for old_key, (_, old_size) in list(self._models.items())[:-1] if old_size > 0]
+            while self._bytes > self.memory_limit_bytes and candidates:
+                self._evict(candidates.pop(0))
+            while len(self._models) > self.max_entries:
+                self._evict(next(iter(self._models)))
+
+    def _evict(self, key: Hashable):
+        self._bytes -= self._models.pop(key)[1]
+        self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """返回命中统计和占用。"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._models),
+                'memory_bytes': self._bytes,
+            }
@@ -1,7 +1,9 @@
+from bisect import bisect_left, bisect_right
 from typing import List, Dict, Any
 from PIL import Image, ImageDraw, ImageFont
 
-from srcProject.models.model_base import BaseModel
+from srcProject.models.model_base import BaseModel, DetectionBatch
+from srcProject.utlis.spatial_index import IntervalGrid, overlapping_range
 
 
 class XY_CUT(BaseModel):
@@ -48,12 +50,20 @@ class XY_CUT(BaseModel):
         """
         if not text_blocks:
             return []
+        return self._sort_units(self._get_bboxes(text_blocks), list(text_blocks))
 
+    def _get_bboxes(self, text_blocks) -> List[tuple]:
+        """返回所有文本块的边界框，DetectionBatch 直接读取坐标数组。"""
+        if isinstance(text_blocks, DetectionBatch):
+            return [tuple(box) for box in text_blocks.boxes.tolist()]
+        return [self._get_bbox(tb) for tb in text_blocks]
+
+    def _sort_units(self, bboxes: List[tuple], items: List) -> List:
+        """按边界框对 items 排序，items 与 bboxes 一一对应。"""
         units = []
         page_l, page_r = float("inf"), -1
-        # 1. 计算每个文本块的边界框，并记录页面的左右边界
-        for tb in text_blocks:
-            bbox = self._get_bbox(tb)
+        # 1. 记录每个文本块的边界框和页面的左右边界
+        for bbox, tb in zip(bboxes, items):
             units.append((bbox, tb))
             if bbox[0] < page_l: page_l = bbox[0]
             if bbox[2] > page_r: page_r = bbox[2]
@@ -89,13 +99,8 @@ class XY_CUT(BaseModel):
         if not text_blocks:
             return []
 
-        # 在排序前，为每个文本块添加一个临时的 'original_index' 键
-        # 这样在排序后我们仍然可以找到其原始位置
-        indexed_text_blocks = [dict(tb, original_index=i) for i, tb in enumerate(text_blocks)]
-        # 调用现有的排序方法
-        sorted_text_blocks = self.sort_page(indexed_text_blocks)
-        # 提取并返回排序后的索引
-        return [tb['original_index'] for tb in sorted_text_blocks]
+        # 直接对原始位置排序，不再为每个文本块复制一份带 'original_index' 的字典
+        return self._sort_units(self._get_bboxes(text_blocks), list(range(len(text_blocks))))
 
     def batch_predict(self, pages:List[List[Dict[str, Any]]]) -> List[List[int]]:
         """
@@ -124,9 +129,12 @@ class XY_CUT(BaseModel):
         """
         flags1, flags2 = [True] * len(gaps1), [True] * len(gaps2)
         new_gaps1 = []
+        # 当前行的间隙从左到右排列且互不重叠，与 g1 重叠的是连续的一段，二分查找即可
+        lefts2, rights2 = [g[0] for g in gaps2], [g[1] for g in gaps2]
         # 查找间隙的重叠部分，这些重叠部分形成了新的、更窄的间隙
         for i1, g1 in enumerate(gaps1):
-            for i2, g2 in enumerate(gaps2):
+            for i2 in overlapping_range(lefts2, rights2, g1[0], g1[1]):
+                g2 = gaps2[i2]
                 inter_l = max(g1[0], g2[0])
                 inter_r = min(g1[1], g2[1])
                 if inter_l <= inter_r:
@@ -156,17 +164,14 @@ class XY_CUT(BaseModel):
         page_l -= 1;
         page_r += 1
         rows, completed_cuts, gaps = [], [], []
+        tops = [u[0][1] for u in units]
         row_index = unit_index = 0
         while unit_index < len(units):
             unit = units[unit_index]
             u_bottom = unit[0][3]
-            row = [unit]
-            next_idx = unit_index
-            # 识别同一行中的所有文本块
-            for i in range(unit_index + 1, len(units)):
-                if units[i][0][1] > u_bottom: break
-                row.append(units[i])
-                next_idx = i
+            # 识别同一行中的所有文本块：units 已按顶部排序，顶部不低于 u_bottom 的是连续的一段
+            next_idx = max(bisect_right(tops, u_bottom, lo=unit_index + 1) - 1, unit_index)
+            row = units[unit_index:next_idx + 1]
             unit_index = next_idx
 
             row.sort(key=lambda x: x[0][0])
@@ -214,35 +219,41 @@ class XY_CUT(BaseModel):
         root = {"x_left": cuts[0][0] - 1, "x_right": cuts[-1][1] + 1, "r_top": -1, "r_bottom": -1, "units": [],
                 "children": []}
         completed_nodes, now_nodes = [root], []
+        # 已完成节点按横向范围登记，查找父节点时只检查覆盖 node_r 的网格
+        completed_grid = IntervalGrid(root["x_left"], root["x_right"], cells=min(len(cuts), 64))
+        completed_grid.insert(root["x_left"], root["x_right"] + 1e-4, root)
 
         def complete(node):
             """将节点与其父节点关联并标记为完成。"""
             node_r, max_r = node["x_right"] - 2, -2
             max_nodes = []
-            for com_node in completed_nodes:
-                if not (com_node["x_left"] <= node_r < com_node["x_right"] + 1e-4): continue
+            # 节点按 r_bottom 非递减的顺序完成，倒序遍历时遇到更小的 r_bottom 即可停止
+            for com_node in reversed(completed_grid.candidates(node_r)):
                 if com_node["r_bottom"] >= node["r_top"]: continue
-                if com_node["r_bottom"] > max_r:
-                    max_r, max_nodes = com_node["r_bottom"], [com_node]
-                elif com_node["r_bottom"] == max_r:
-                    max_nodes.append(com_node)
+                if com_node["r_bottom"] < max_r: break
+                if not (com_node["x_left"] <= node_r < com_node["x_right"] + 1e-4): continue
+                max_r = com_node["r_bottom"]
+                max_nodes.append(com_node)
             if max_nodes:
-                max(max_nodes, key=lambda n: n["x_right"])["children"].append(node)
+                # 与正序遍历相同，x_right 相同时取最先完成的节点
+                max(reversed(max_nodes), key=lambda n: n["x_right"])["children"].append(node)
                 completed_nodes.append(node)
+                completed_grid.insert(node["x_left"], node["x_right"] + 1e-4, node)
 
         # 遍历每一行来构建树
         for r_i, row in enumerate(rows):
             row_gaps = rows_gaps[r_i]
+            # 间隙端点排序后二分查找，每个节点不再遍历整行的间隙
+            gap_points = sorted(p for gap in row_gaps for p in gap)
+            gap_lefts, gap_rights = sorted(gap[0] for gap in row_gaps), sorted(gap[1] for gap in row_gaps)
             new_nodes = []
             # 检查当前节点是否被新的间隙“切断”，如果是则完成它
             for node in now_nodes:
-                l_flag, r_flag, completed_flag = False, False, False
-                for gap in row_gaps:
-                    if abs(gap[1] - node["x_left"]) < 1e-4: l_flag = True
-                    if abs(gap[0] - node["x_right"]) < 1e-4: r_flag = True
-                    if node["x_left"] < gap[0] < node["x_right"] or node["x_left"] < gap[1] < node["x_right"]:
-                        completed_flag = True
-                        break
+                # 左右两侧都要与间隙相接，且没有间隙端点落在节点内部
+                l_flag = self._has_near(gap_rights, node["x_left"])
+                r_flag = self._has_near(gap_lefts, node["x_right"])
+                inside = bisect_right(gap_points, node["x_left"])
+                completed_flag = inside < len(gap_points) and gap_points[inside] < node["x_right"]
                 if not l_flag or not r_flag: completed_flag = True
                 if completed_flag:
                     complete(node)
@@ -252,21 +263,24 @@ class XY_CUT(BaseModel):
             now_nodes = new_nodes
 
             u_i = g_i = 0
+            # 同一对间隙之间的文本块是连续的，每对间隙只查找一次节点
+            gap_nodes = {}
             # 为当前行的每个文本块创建新的节点或添加到现有节点
             while u_i < len(row):
                 unit = row[u_i]
                 if g_i >= len(row_gaps) - 1: u_i += 1; continue
                 x_l, x_r = row_gaps[g_i][1], row_gaps[g_i + 1][0]
                 if unit[0][0] + 1e-4 > x_r: g_i += 1; continue
-                flag = False
-                for node in now_nodes:
-                    if abs(node["x_left"] - x_l) < 1e-4 and abs(node["x_right"] - x_r) < 1e-4:
-                        node["units"].append(unit)
-                        flag = True
-                        break
-                if flag: u_i += 1; continue
-                now_nodes.append(
-                    {"x_left": x_l, "x_right": x_r, "r_top": r_i, "r_bottom": r_i, "units": [unit], "children": []})
+                if g_i not in gap_nodes:
+                    for node in now_nodes:
+                        if abs(node["x_left"] - x_l) < 1e-4 and abs(node["x_right"] - x_r) < 1e-4:
+                            gap_nodes[g_i] = node
+                            break
+                    else:
+                        gap_nodes[g_i] = {"x_left": x_l, "x_right": x_r, "r_top": r_i, "r_bottom": r_i, "units": [],
+                                          "children": []}
+                        now_nodes.append(gap_nodes[g_i])
+                gap_nodes[g_i]["units"].append(unit)
                 u_i += 1
 
         for node in now_nodes: complete(node)
@@ -275,6 +289,14 @@ class XY_CUT(BaseModel):
             node["units"].sort(key=lambda u: u[0][1])
         return root
 
+    @staticmethod
+    def _has_near(values: List[float], x: float) -> bool:
+        """有序列表 values 中是否有与 x 相差小于 1e-4 的值。"""
+        for i in range(bisect_left(values, x - 2e-4), len(values)):
+            if values[i] > x + 2e-4: break
+            if abs(values[i] - x) < 1e-4: return True
+        return False
+
     def _preorder_traversal(self, root: Dict) -> List[Dict]:
         """
         对布局树进行前序遍历（根-左-右），这是生成阅读顺序的关键步骤。
@@ -21,9 +21,9 @@ class Silicon(FlowOCR):
         )
         super().__init__(api_keys, base_url, self.api_model_name)
 
-    def _load_model(self):
+    def _validate(self):
         """
-        加载模型（对于API客户端，这里主要是验证API密钥）
+        验证API密钥并获取模型列表（在后台线程中执行）
         """
         print(f"初始化Siliconflow, 获取模型列表")
         if not self.api_keys[0]:
@@ -1,10 +1,10 @@
-import re
 from typing import List, Dict, Any
 import numpy as np
 from srcProject.config.constants import FilterCategories_VALUES
+from srcProject.models.model_base import DetectionBatch
+from srcProject.utlis.html_table import convert_html_tables
+from srcProject.utlis.spatial_index import GridIndex
 from PIL import Image
-import pandas as pd
-from io import StringIO
 
 # --- 辅助函数：将多边形坐标转换为四边形 (如果需要) ---
 # 你的模型返回的是 poly: [xmin, ymin, xmax, ymin, xmax, ymax, xmin, ymax]
@@ -60,28 +60,29 @@ def poly_to_bbox_scaled(poly: List[float], page_size: tuple) -> List[int]:
 def normalize_polygons_to_bboxes(data: List[List[Dict[str, Any]]]) -> List[List[int]]:
     """
     将包含多边形坐标和页面尺寸的嵌套字典列表转换为以 1000 为比例放缩的整数边界框列表。
-    此实现借用了 poly_to_bbox 函数来简化逻辑。
+    每页整体按数组换算：DetectionBatch 直接使用其边界框数组，字典列表的多边形按 poly_to_bbox 的规则
+    （顶点坐标截断取整后取最小/最大值）一次转换，再按各自的页面尺寸放缩并四舍五入（与 round 相同，.5 取偶）。
     """
     result = []
     for page_data in data:
-        page_bboxes = []
-        for item in page_data:
-            poly = item['poly']
-            page_size = item['page_size']
-            width, height = page_size[0], page_size[1]
-
-            # 使用 poly_to_bbox 函数将多边形转换为原始尺寸的边界框
-            original_bbox = poly_to_bbox(poly)
-            # 计算缩放比例
-            x_scale = 1000.0 / width
-            y_scale = 1000.0 / height
-            # 使用缩放比例计算并四舍五入为整数
-            x0 = int(round(original_bbox[0] * x_scale))
-            y0 = int(round(original_bbox[1] * y_scale))
-            x1 = int(round(original_bbox[2] * x_scale))
-            y1 = int(round(original_bbox[3] * y_scale))
-            page_bboxes.append([x0, y0, x1, y1])
-        result.append(page_bboxes)
+        if isinstance(page_data, DetectionBatch):
+            width, height = page_data.page_size[0], page_data.page_size[1]
+            scale = np.array([1000.0 / width, 1000.0 / height, 1000.0 / width, 1000.0 / height])
+            result.append(np.round(page_data.boxes * scale).astype(np.int64).tolist())
+            continue
+        if not page_data:
+            result.append([])
+            continue
+        polys = [item['poly'] for item in page_data]
+        if all(len(poly) == 8 for poly in polys):
+            points = np.trunc(np.asarray(polys, dtype=np.float64))
+            boxes = np.stack([points[:, 0::2].min(axis=1), points[:, 1::2].min(axis=1),
+                              points[:, 0::2].max(axis=1), points[:, 1::2].max(axis=1)], axis=1)
+        else:
+            boxes = np.asarray([poly_to_bbox(poly)[:4] for poly in polys], dtype=np.float64)
+        sizes = np.asarray([item['page_size'][:2] for item in page_data], dtype=np.float64)
+        scale = 1000.0 / np.concatenate([sizes, sizes], axis=1)
+        result.append(np.round(boxes * scale).astype(np.int64).tolist())
     return result
 
 
@@ -117,8 +118,8 @@ def resize_image_for_mvl(image: Image.Image, min_size: int = 28) -> Image.Image:
     # 如果尺寸已经符合要求，直接返回原图
     if new_width == width and new_height == height:
         return image
-    # 创建一个白色背景的新图片
-    new_image = Image.new('RGB', (new_width, new_height), 'white')
+    # 创建一个白色背景的新图片，灰度图保持灰度
+    new_image = Image.new('L' if image.mode == 'L' else 'RGB', (new_width, new_height), 'white')
     # 计算粘贴位置，居中放置
     x_offset = (new_width - width) // 2
     y_offset = (new_height - height) // 2
@@ -126,6 +127,46 @@ def resize_image_for_mvl(image: Image.Image, min_size: int = 28) -> Image.Image:
     new_image.paste(image, (x_offset, y_offset))
     return new_image
 
+def crop_image_region(image, bbox: List[int]) -> Image.Image:
+    """
+    从整页图像中裁剪区域，返回独立的 PIL Image。
+    image 可以是 PIL Image，也可以是 RGB (H, W, 3) 或灰度 (H, W) 数组：数组以切片视图截取，
+    只拷贝区域本身的像素，超出页面的部分被截断。灰度页面裁剪出的区域仍为灰度（L 模式）。
+    Image.fromarray 对 C 连续的区域（如整行宽的灰度区域）会共享数组内存，而整页数组可能来自缓冲池、之后被下一页覆盖，
+    因此这里总是先拷贝区域。
+    """
+    if not isinstance(image, np.ndarray):
+        return image.crop(bbox)
+    x0, y0, x1, y1 = (max(int(v), 0) for v in bbox)
+    region = image[y0:y1, x0:x1]
+    if region.size == 0:
+        return Image.new('L' if image.ndim == 2 else 'RGB', (max(x1 - x0, 0), max(y1 - y0, 0)))
+    return Image.fromarray(np.array(region))
+
+def suppression_pairs(boxes: np.ndarray, iou_threshold: float):
+    """
+    按面积降序排列的框（(N, 4) 的 xyxy）之间的抑制关系，返回 (sources, targets)：targets 排在 sources 之后，
+    且完全包含在其内（is_contained）或二者 IoU 超过阈值（compute_iou），按 sources、targets 升序排列。
+    只有相交（含边界相接）的框才可能满足条件，候选对由 GridIndex 给出，密集页面上不再逐对比较。
+    """
+    if iou_threshold < 0:
+        # IoU 为 0 也超过阈值，不相交的框同样会被抑制，只能逐对判断
+        sources, targets = np.triu_indices(len(boxes), k=1)
+    else:
+        sources, targets = GridIndex(boxes).intersecting_pairs()
+    outer, inner = boxes[sources], boxes[targets]
+    contained = np.all(inner[:, :2] >= outer[:, :2], axis=1) & np.all(inner[:, 2:] <= outer[:, 2:], axis=1)
+    # 与 compute_iou 相同：交集宽或高为负时交集为 0，并集不大于 0 时 IoU 为 0
+    inter = np.prod(np.maximum(np.minimum(inner[:, 2:], outer[:, 2:]) - np.maximum(inner[:, :2], outer[:, :2]), 0),
+                    axis=1)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    union = areas[sources] + areas[targets] - inter
+    with np.errstate(divide='ignore', invalid='ignore'):
+        overlapping = np.where(union > 0, inter / union, 0.0) > iou_threshold
+    mask = contained | overlapping
+    return sources[mask], targets[mask]
+
+
 def preprocess_detections(
         detections: List[Dict[str, Any]],
         iou_threshold: float = 0.5  # 允许部分重叠，只在 IoU > 0.5 时删除
@@ -133,7 +174,16 @@ def preprocess_detections(
     """
     预处理检测结果，先移除指定类别，然后移除完全包含的框，
     最后通过 IoU 阈值移除重叠的框。
+    包含关系和 IoU 只在空间索引给出的相交框对上批量计算（suppression_pairs），再按面积从大到小贪心保留，
+    结果与逐对调用 is_contained / compute_iou 相同。
     """
+    if isinstance(detections, DetectionBatch):
+        # 列存储直接在数组上过滤，返回保留行组成的新 DetectionBatch
+        valid = detections.subset(~np.isin(detections.classes, FilterCategories_VALUES))
+        for index, cropped_process in enumerate(valid.crops):
+            if cropped_process is not None and isinstance(cropped_process, Image.Image):
+                valid.crops[index] = resize_image_for_mvl(cropped_process)
+        return valid.subset(overlap_keep_mask(valid.boxes, iou_threshold))
     if not detections:
         return []
     # 过滤指定类别
@@ -141,39 +191,38 @@ def preprocess_detections(
     valid_detections = [det for det in detections if det['category_id'] not in FilterCategories_VALUES]
     if not valid_detections:
         return []
-    # 计算所有边界框和面积
-    boxes = [poly_to_bbox(det['poly']) for det in valid_detections]
-    areas = [compute_area(box) for box in boxes]
-    # 标记要保留的检测
-    keep = [True] * len(valid_detections)
-    # 按面积从大到小排序
-    indices = np.argsort([-area for area in areas])
-    # 遍历检测
-    for i in range(len(valid_detections)):
-        cropped_process = valid_detections[i].get('cropped_image',None)
+    for det in valid_detections:
+        cropped_process = det.get('cropped_image', None)
         if cropped_process is not None and isinstance(cropped_process, Image.Image):
-            valid_detections[i]['cropped_image'] = resize_image_for_mvl(cropped_process)
-        if not keep[indices[i]]:
-            continue
-        box_i = boxes[indices[i]]
-        for j in range(i + 1, len(valid_detections)):
-            if not keep[indices[j]]:
-                continue
-            box_j = boxes[indices[j]]
-            # 用来判断 box_j 是否在 box_i 内部
-            if is_contained(box_j, box_i):
-                keep[indices[j]] = False
-                continue  # 如果是包含关系，直接继续下一个框，不再计算 IoU
-            # 如果不完全包含，则继续判断 IoU
-            iou = compute_iou(box_i, box_j)
-            if iou > iou_threshold:
-                keep[indices[j]] = False
+            det['cropped_image'] = resize_image_for_mvl(cropped_process)
+    # 计算所有边界框
+    boxes = np.array([poly_to_bbox(det['poly']) for det in valid_detections])
+    keep = overlap_keep_mask(boxes, iou_threshold)
 
     # 收集保留的检测
-    filtered_detections = [det for i, det in enumerate(valid_detections) if keep[i]]
+    filtered_detections = [det for det, kept in zip(valid_detections, keep.tolist()) if kept]
 
     return filtered_detections
 
+
+def overlap_keep_mask(boxes: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """对 (N, 4) 的 xyxy 框做包含关系和 IoU 过滤，返回与 boxes 对应的保留掩码。"""
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=bool)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    # 按面积从大到小排序
+    indices = np.argsort(-areas)
+    sources, targets = suppression_pairs(boxes[indices], iou_threshold)
+    # 贪心：按面积顺序，每个保留下来的框抑制其后与之包含或重叠的框
+    keep_sorted = np.ones(len(indices), dtype=bool)
+    bounds = np.searchsorted(sources, np.arange(len(indices) + 1))
+    for i in np.unique(sources).tolist():
+        if keep_sorted[i]:
+            keep_sorted[targets[bounds[i]:bounds[i + 1]]] = False
+    keep = np.zeros(len(indices), dtype=bool)
+    keep[indices] = keep_sorted
+    return keep
+
 def is_contained(box_inner: List[float], box_outer: List[float]) -> bool:
     """
     判断一个边界框 (box_inner) 是否完全包含在另一个边界框 (box_outer) 内部。
@@ -218,29 +267,14 @@ def batch_preprocess_detections(
 def convert_html_tables_to_markdown(content):
     """
     从字符串中提取所有 HTML 表格，将其转换为 Markdown 格式，
-    然后将修改后的内容返回，不保留任何额外 HTML 标签。
+    然后将修改后的内容返回，不保留任何额外 HTML 标签。转换规则见 srcProject/utlis/html_table.py。
     Args:
         content (str): 包含 HTML 表格的原始字符串。
     Returns:
         str: 替换了表格内容的新字符串。
     """
-    # 使用正则表达式找到所有 <table>...</table> 的内容
-    table_regex = re.compile(r'<table.*?</table>', re.IGNORECASE | re.DOTALL)
-    # 找到所有匹配的表格字符串
-    tables_found = table_regex.finditer(content)
-    replacements = []
-    for match in tables_found:
-        html_table = match.group(0)
-        # 将表格内容转换为 pandas DataFrame
-        df = pd.read_html(StringIO(html_table))[0]
-        df.columns = df.iloc[0]
-        # 删除第一行，因为现在它已经是列名了
-        df = df[1:]
-        markdown_table = df.to_markdown(index=False)
-        replacements.append((match.start(), match.end(), markdown_table))
-    for start, end, new_str in reversed(replacements):
-        content = content[:start] + new_str + content[end:]
-    return content
+    # html.parser 单遍解析，支持 rowspan / colspan、多行表头和单元格中的公式
+    return convert_html_tables(content)
 
 if __name__ == '__main__':
     pass
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""
+HTML 表格转 Markdown。
+
+VLM 识别出的表格是 HTML（<table><tr><td>...），这里用标准库 html.parser 单遍解析每个表格，不依赖 pandas / lxml / tabulate：
+- rowspan / colspan 展开到被覆盖的每个格子，内容重复填入（与 pandas.read_html 相同）
+- 表头为 <thead> 中的行或开头全部由 <th> 组成的行，表头单元格跨多行时表头包含被跨越的行；
+  都没有时只取第一行作表头，第一行中跨行单元格覆盖的行仍是数据行
+  多行表头按列自上而下合并为一行，相同的内容只保留一次，以 " / " 连接
+- 单元格中的公式（$...$、$$...$$、\\(...\\)、\\[...\\]）在解析前替换为占位符，原样保留，公式中的 < 不会被当作标签
+- 单元格内的换行和连续空白合并为一个空格，竖线转义为 \\|，<br> 视为空格
+"""
+import html
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
+
+_TABLE_TAG = re.compile(r'<(/?)table\b[^>]*>', re.IGNORECASE)
+_MATH_PATTERN = re.compile(r'\$\$.+?\$\$|(?<!\\)\$[^$\n]+?(?<!\\)\$|\\\(.+?\\\)|\\\[.+?\\\]', re.DOTALL)
+# 跨越单元格边界的“公式”（例如两个单元格中的货币符号 $）不是公式
+_STRUCTURE_TAG = re.compile(r'</?(?:table|thead|tbody|tfoot|tr|td|th)\b', re.IGNORECASE)
+_PLACEHOLDER = re.compile('\x00(\\d+)\x00')
+_SPAN_VALUE = re.compile(r'\s*(\d+)')
+# 单元格内按空格处理的标签
+_SPACE_TAGS = {'br', 'p', 'div', 'li', 'hr'}
+_MAX_SPAN = 1000
+
+
+class _TableParser(HTMLParser):
+    """
+    收集表格的行和单元格：rows 中每项为 (单元格列表, 是否在 <thead> 中)，
+    单元格为 [文字片段列表, rowspan, colspan, 是否为 <th>]。嵌套表格的内容并入外层单元格的文字。
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: List[Tuple[List[list], bool]] = []
+        self._row = None
+        self._cell = None
+        self._depth = 0
+        self._in_head = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self._depth += 1
+        if self._depth > 1 or tag in _SPACE_TAGS:
+            # 嵌套表格的单元格之间以空格分隔
+            if self._cell is not None and (tag in _SPACE_TAGS or tag in ('td', 'th', 'tr')):
+                self._cell[0].append(' ')
+            return
+        if tag == 'thead':
+            self._in_head = True
+        elif tag in ('tbody', 'tfoot'):
+            self._in_head = False
+        elif tag == 'tr':
+            self._end_row()
+            self._row = []
+        elif tag in ('td', 'th'):
+            self._end_cell()
+            if self._row is None:
+                self._row = []
+            attrs = dict(attrs)
+            self._cell = [[], _span(attrs.get('rowspan')), _span(attrs.get('colspan')), tag == 'th']
+
+    def handle_endtag(self, tag):
+        if tag == 'table':
+            self._depth -= 1
+            return
+        if self._depth > 1:
+            return
+        if tag in ('td', 'th'):
+            self._end_cell()
+        elif tag == 'tr':
+            self._end_row()
+        elif tag == 'thead':
+            self._end_row()
+            self._in_head = False
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell[0].append(data)
+
+    def _end_cell(self):
+        if self._cell is not None:
+            self._row.append(self._cell)
+            self._cell = None
+
+    def _end_row(self):
+        self._end_cell()
+        if self._row:
+            self.rows.append((self._row, self._in_head))
+        self._row = None
+
+    def close(self):
+        super().close()
+        self._end_row()
+
+
+def _span(value) -> int:
+    """解析 rowspan / colspan，无效值按 1 处理。"""
+    if value is None:
+        return 1
+    match = _SPAN_VALUE.match(value)
+    return min(max(int(match.group(1)), 1), _MAX_SPAN) if match else 1
+
+
+def _protect_math(table_html: str) -> Tuple[str, List[str]]:
+    """把公式替换为占位符，返回替换后的 HTML 和公式列表。"""
+    formulas = []
+
+    def replace(match):
+        if _STRUCTURE_TAG.search(match.group(0)):
+            return match.group(0)
+        formulas.append(html.unescape(match.group(0)))
+        return f'\x00{len(formulas) - 1}\x00'
+
+    return _MATH_PATTERN.sub(replace, table_html), formulas
+
+
+def _cell_text(parts: List[str], formulas: List[str]) -> str:
+    text = _PLACEHOLDER.sub(lambda match: formulas[int(match.group(1))], ''.join(parts))
+    return ' '.join(text.split()).replace('|', '\\|')
+
+
+def _expand_spans(rows: List[Tuple[List[list], bool]], formulas: List[str]) -> Tuple[List[Dict[int, str]], int]:
+    """把单元格按 rowspan / colspan 放入网格，返回每行 {列号: 文字} 和表头行数。"""
+    grid: List[Dict[int, str]] = [{} for _ in rows]
+    header_rows = 0
+    # 表头：<thead> 中的行，或开头全部为 <th> 的行
+    for cells, in_head in rows:
+        if not (in_head or all(cell[3] for cell in cells)):
+            break
+        header_rows += 1
+    # 没有真正的表头时只取第一行，它的 rowspan 不把下面的数据行并入表头
+    spans_extend_header = header_rows > 0
+    header_rows = max(header_rows, 1)
+    for row_index, (cells, _) in enumerate(rows):
+        column = 0
+        for parts, rowspan, colspan, _ in cells:
+            while column in grid[row_index]:
+                column += 1
+            text = _cell_text(parts, formulas)
+            # 跨行不超出表格末尾
+            for covered_row in grid[row_index:row_index + rowspan]:
+                for offset in range(colspan):
+                    covered_row[column + offset] = text
+            if spans_extend_header and row_index < header_rows:
+                header_rows = max(header_rows, min(row_index + rowspan, len(rows)))
+            column += colspan
+    return grid, header_rows
+
+
+def html_table_to_markdown(table_html: str) -> str:
+    """把一个 HTML 表格转换为 Markdown 表格；没有任何单元格时返回空字符串。"""
+    protected, formulas = _protect_math(table_html)
+    parser = _TableParser()
+    parser.feed(protected)
+    parser.close()
+    if not parser.rows:
+        return ''
+    grid, header_rows = _expand_spans(parser.rows, formulas)
+    width = max(max(row, default=-1) for row in grid) + 1
+    header = []
+    for column in range(width):
+        parts = []
+        for row in grid[:header_rows]:
+            text = row.get(column, '')
+            if text and text not in parts:
+                parts.append(text)
+        header.append(' / '.join(parts))
+    lines = ['| ' + ' | '.join(header) + ' |', '|' + '---|' * width]
+    for row in grid[header_rows:]:
+        lines.append('| ' + ' | '.join(row.get(column, '') for column in range(width)) + ' |')
+    return '\n'.join(lines)
+
+
+def find_tables(content: str) -> List[Tuple[int, int]]:
+    """返回最外层 <table>...</table> 的 (起点, 终点) 列表，嵌套表格归入外层；没有闭合的表格忽略。"""
+    spans, depth, start = [], 0, 0
+    for match in _TABLE_TAG.finditer(content):
+        if not match.group(1):
+            if depth == 0:
+                start = match.start()
+            depth += 1
+        elif depth > 0:
+            depth -= 1
+            if depth == 0:
+                spans.append((start, match.end()))
+    return spans
+
+
+def convert_html_tables(content: str) -> str:
+    """把字符串中的所有 HTML 表格替换为 Markdown 表格，表格之外的内容保持不变。"""
+    pieces, position = [], 0
+    for start, end in find_tables(content):
+        pieces.append(content[position:start])
+        markdown = html_table_to_markdown(content[start:end])
+        # Markdown 表格必须独占若干行
+        if markdown and start > 0 and content[start - 1] != '\n':
+            markdown = '\n' + markdown
+        if markdown and end < len(content) and content[end] != '\n':
+            markdown += '\n'
+        pieces.append(markdown)
+        position = end
+    pieces.append(content[position:])
+    return ''.join(pieces)
@@ -0,0 +1,236 @@
+"""
+页面预过滤：空白页与近似重复页检测。
+
+扫描批次中常夹有空白分隔页和重新扫描产生的重复页。这里在降采样后的灰度图上计算：
+- 墨迹覆盖率：明显深于纸张背景的像素占比，低于阈值的页面视为空白页，直接跳过
+- 感知哈希（pHash）：对内容区域做 32x32 DCT，取低频 8x8 系数与中位数比较得到 64 位哈希
+- 内容指纹：内容区域缩放到 48x48 后的归一化灰度向量，用相关系数复核哈希候选
+哈希和指纹只反映版式：同一模板、填写内容不同的表单页两项都非常接近。因此候选页最后还要确认内容：
+- 内容图：内容区域从原图按区域平均缩放到长边 PAGE_FILTER_SAMPLE_SIZE 的灰度图，允许 1 像素错位后逐像素比较，
+  灰度差超过 DUPLICATE_MAX_PIXEL_DIFFERENCE 即不是重复页，改动一个字符的页面在这里被排除
+- 文本层：页面有 PDF 文本层时，文字必须完全相同
+通过全部检查的页面直接复用已处理页面的检测和 OCR 结果。每个内容图约 200 KB，
+因此只和最近 DUPLICATE_HISTORY_PAGES 个已处理页面比较。
+"""
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from PIL import Image
+from srcProject.config.constants import PAGE_FILTER_SAMPLE_SIZE, PAGE_FILTER_INK_RATIO, BLANK_PAGE_MAX_INK, \
+    DUPLICATE_MAX_HASH_DISTANCE, DUPLICATE_MIN_CORRELATION, DUPLICATE_MAX_PIXEL_DIFFERENCE, \
+    DUPLICATE_HISTORY_PAGES
+from srcProject.models.model_base import DetectionBatch
+
+_HASH_GRID = 32
+_HASH_LOW_FREQ = 8
+_FINGERPRINT_GRID = 48
+
+
+class PageSignature(NamedTuple):
+    ink_coverage: float # 墨迹覆盖率
+    phash: int # 64 位感知哈希
+    fingerprint: np.ndarray # 单位长度的内容指纹向量
+    content: np.ndarray # 内容区域的 uint8 灰度图，长边 PAGE_FILTER_SAMPLE_SIZE
+    text: Optional[str] # 去掉空白的文本层文字，没有文本层时为 None
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """正交 DCT-II 变换矩阵。"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_DCT = _dct_matrix(_HASH_GRID)
+
+
+def _downsample_gray(image, size: int = PAGE_FILTER_SAMPLE_SIZE) -> np.ndarray:
+    """把页面（PIL Image 或像素数组）按整数步长降采样到长边约 size 像素，返回 float32 灰度数组。"""
+    if isinstance(image, Image.Image):
+        factor = max(1, max(image.size) // size)
+        image = np.asarray(image.reduce(factor) if factor > 1 else image)
+    else:
+        step = max(1, max(image.shape[:2]) // size)
+        # 步长采样得到的是视图，只有采样后的小图会被拷贝
+        image = image[::step, ::step]
+    if image.ndim == 3:
+        image = image[..., :3].mean(axis=2)
+    return image.astype(np.float32)
+
+
+def _area_resize(gray: np.ndarray, n: int) -> np.ndarray:
+    """按区域平均把灰度图缩放到 n x n。"""
+    height, width = gray.shape
+    rows = (np.arange(n) * height) // n
+    cols = (np.arange(n) * width) // n
+    sums = np.add.reduceat(np.add.reduceat(gray, rows, axis=0), cols, axis=1)
+    counts = np.outer(np.diff(np.append(rows, height)), np.diff(np.append(cols, width)))
+    return sums / counts
+
+
+def _ink_bounds(image, ink: np.ndarray, threshold: float) -> Tuple[int, int, int, int]:
+    """
+    内容区域（墨迹像素的外接矩形）在原图上的坐标 (x0, y0, x1, y1)。
+    先在降采样的墨迹图上定位，再在原图中边界附近的条带里逐行、逐列找第一条墨迹，误差不超过 1 像素。
+    """
+    width, height = image.size if isinstance(image, Image.Image) else (image.shape[1], image.shape[0])
+    step = max(1, max(width, height) // PAGE_FILTER_SAMPLE_SIZE)
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if len(rows) < _HASH_GRID or len(cols) < _HASH_GRID:
+        return 0, 0, width, height
+
+    def band_ink(x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        if isinstance(image, Image.Image):
+            band = np.asarray(image.crop((x0, y0, x1, y1)).convert('L'))
+        else:
+            band = image[y0:y1, x0:x1]
+            band = band[..., :3].mean(axis=2) if band.ndim == 3 else band
+        return band < threshold
+
+    def refine(coarse: int, limit: int, axis: int, first: bool) -> int:
+        lo = max(0, (coarse - 1) * step)
+        hi = min(limit, (coarse + 2) * step)
+        band = band_ink(0, lo, width, hi) if axis == 0 else band_ink(lo, 0, hi, height)
+        found = np.flatnonzero(band.any(axis=1 - axis))
+        if len(found) == 0:
+            return coarse * step if first else min(limit, (coarse + 1) * step)
+        return lo + int(found[0]) if first else lo + int(found[-1]) + 1
+
+    return (refine(cols[0], width, 1, True), refine(rows[0], height, 0, True),
+            refine(cols[-1], width, 1, False), refine(rows[-1], height, 0, False))
+
+
+def _content_image(image, bounds: Tuple[int, int, int, int]) -> np.ndarray:
+    """内容区域按区域平均缩放到长边 PAGE_FILTER_SAMPLE_SIZE 的 uint8 灰度图。"""
+    x0, y0, x1, y1 = bounds
+    scale = PAGE_FILTER_SAMPLE_SIZE / max(x1 - x0, y1 - y0)
+    size = (max(1, round((x1 - x0) * scale)), max(1, round((y1 - y0) * scale)))
+    if not isinstance(image, Image.Image):
+        image = Image.fromarray(image)
+    return np.asarray(image.resize(size, Image.BOX, box=bounds, reducing_gap=1.5).convert('L'))
+
+
+def _shifted_difference(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a 的每个像素与 b 中对应位置 3x3 邻域内最接近的像素之差（绝对值）。"""
+    height, width = a.shape
+    padded = np.pad(b.astype(np.int16), 1, mode='edge')
+    a = a.astype(np.int16)
+    difference = np.abs(a - padded[1:1 + height, 1:1 + width])
+    for dy in range(3):
+        for dx in range(3):
+            np.minimum(difference, np.abs(a - padded[dy:dy + height, dx:dx + width]), out=difference)
+    return difference
+
+
+def content_difference(a: np.ndarray, b: np.ndarray) -> int:
+    """
+    两页内容灰度图的差异：允许 1 像素错位后逐像素灰度差的最大值。尺寸不同（内容区域比例不同）时返回 255。
+    """
+    if a.shape != b.shape:
+        return 255
+    return int(max(_shifted_difference(a, b).max(), _shifted_difference(b, a).max()))
+
+
+def page_text(spans: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    """页面文本层的文字（去掉空白），没有文本层时返回 None。"""
+    text = ''.join(''.join((span.get('text') or '').split()) for span in spans or [])
+    return text or None
+
+
+def compute_page_signature(image, text: Optional[str] = None) -> PageSignature:
+    """
+    计算一页的墨迹覆盖率、感知哈希、内容指纹和内容图，text 为页面文本层的文字（见 page_text）。
+    哈希、指纹和内容图只在内容区域（墨迹像素的外接矩形）上计算，因此对扫描时的平移、留白和分辨率差异不敏感。
+    """
+    gray = _downsample_gray(image)
+    threshold = np.median(gray) * PAGE_FILTER_INK_RATIO
+    ink = gray < threshold
+    ink_coverage = float(np.count_nonzero(ink)) / ink.size
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if len(rows) >= _HASH_GRID and len(cols) >= _HASH_GRID:
+        content = gray[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+    else:
+        content = gray
+    content_image = _content_image(image, _ink_bounds(image, ink, threshold))
+    if min(content.shape) < _FINGERPRINT_GRID:
+        # 几乎空白的页面没有可比较的内容
+        return PageSignature(ink_coverage, 0, np.zeros(_FINGERPRINT_GRID * _FINGERPRINT_GRID, dtype=np.float32),
+                             content_image, text)
+
+    coefficients = _DCT @ _area_resize(content, _HASH_GRID) @ _DCT.T
+    low = coefficients[:_HASH_LOW_FREQ, :_HASH_LOW_FREQ].flatten()
+    bits = low > np.median(low[1:])
+    phash = int(np.packbits(bits).view('>u8')[0])
+
+    fingerprint = _area_resize(content, _FINGERPRINT_GRID).flatten()
+    fingerprint -= fingerprint.mean()
+    fingerprint /= np.linalg.norm(fingerprint) + 1e-6
+    return PageSignature(ink_coverage, phash, fingerprint.astype(np.float32), content_image, text)
+
+
+def is_blank_page(signature: PageSignature) -> bool:
+    """墨迹覆盖率低于 BLANK_PAGE_MAX_INK 的页面视为空白页。"""
+    return signature.ink_coverage < BLANK_PAGE_MAX_INK
+
+
+class PageDeduplicator:
+    """
+    记录已处理页面的签名，查找近似重复页。
+    候选页需同时满足：哈希汉明距离不超过 DUPLICATE_MAX_HASH_DISTANCE，
+    内容指纹的相关系数不低于 DUPLICATE_MIN_CORRELATION，
+    内容图的灰度差不超过 DUPLICATE_MAX_PIXEL_DIFFERENCE，文本层的文字相同（两页都没有文本层时不比较）。
+    只保留最近 DUPLICATE_HISTORY_PAGES 个已处理页面。
+    """
+    def __init__(self):
+        self._history: Deque[Tuple[PageSignature, int]] = deque(maxlen=DUPLICATE_HISTORY_PAGES)
+
+    def find_duplicate(self, signature: PageSignature) -> Optional[int]:
+        """返回与之近似重复的已处理页面序号，没有时返回 None。"""
+        candidates = []
+        for source, position in self._history:
+            if bin(source.phash ^ signature.phash).count('1') > DUPLICATE_MAX_HASH_DISTANCE:
+                continue
+            correlation = float(source.fingerprint @ signature.fingerprint)
+            if correlation >= DUPLICATE_MIN_CORRELATION:
+                candidates.append((correlation, position, source))
+        # 按相关系数从高到低确认内容，版式相同而文字不同的页面在这里被排除
+        for _, position, source in sorted(candidates, key=lambda item: -item[0]):
+            if source.text != signature.text:
+                continue
+            if content_difference(source.content, signature.content) <= DUPLICATE_MAX_PIXEL_DIFFERENCE:
+                return position
+        return None
+
+    def add(self, signature: PageSignature, position: int):
+        """登记一个已处理（送入检测）的页面。"""
+        self._history.append((signature, position))
+
+
+def reuse_page_detections(source_detections: List[Dict[str, Any]],
+                          page_size: Tuple[int, int]) -> List[Dict[str, Any]]:
+    """
+    为重复页复制源页面的检测和 OCR 结果。两页尺寸不同时（不同分辨率的重新扫描）按比例换算坐标。
+    """
+    if isinstance(source_detections, DetectionBatch):
+        reused = source_detections.copy()
+        source_size = reused.page_size
+        if source_size and tuple(source_size) != tuple(page_size):
+            reused.rescale(page_size[0] / source_size[0], page_size[1] / source_size[1])
+        reused.page_size = page_size
+        return reused
+    reused = []
+    for detection in source_detections:
+        detection = dict(detection)
+        source_size = detection.get('page_size')
+        if source_size and tuple(source_size) != tuple(page_size):
+            scale_x = page_size[0] / source_size[0]
+            scale_y = page_size[1] / source_size[1]
+            detection['poly'] = [int(round(p * (scale_x if i % 2 == 0 else scale_y)))
+                                 for i, p in enumerate(detection['poly'])]
+        detection['page_size'] = page_size
+        reused.append(detection)
+    return reused
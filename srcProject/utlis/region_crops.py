@@ -0,0 +1,102 @@
+"""
+检测区域的惰性裁剪。
+
+过滤后保留的检测区域只记录一个 CropHandle（所属页面 + 边界框），只有 OCR 编码或保存图片确实需要像素时
+才裁剪：整页数组上的区域以切片视图截取（不拷贝整页），两级渲染时从 PDF 矢量数据按区域 DPI 重新渲染。
+文本层已识别的区域、关闭 OCR 时的文字区域等不需要像素的区域直接丢弃句柄，不做任何裁剪。
+PageRaster 记录一页上尚未处理的句柄数，所有句柄都物化或丢弃、且页面不再产生新句柄（close）后
+立即释放整页图像（例如归还页面缓冲池）。
+"""
+import threading
+from typing import Any, Callable, List, Optional
+import numpy as np
+from PIL import Image
+from srcProject.utlis.aftertreatment import crop_image_region, resize_image_for_mvl
+
+
+class PageRaster:
+    """
+    一页图像及其上未处理的裁剪句柄计数。release 为释放整页图像时调用的函数（参数为图像），可以为 None。
+    """
+    def __init__(self, image: Any, release: Optional[Callable[[Any], None]] = None):
+        self.image = image
+        self._release = release
+        self._pending = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def handle(self, bbox: List[int], render: Optional[Callable[[], Image.Image]] = None) -> "CropHandle":
+        """为页面上的一个区域创建裁剪句柄。render 给出时，物化时调用它重新渲染区域，而不是从整页图像裁剪。"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("页面图像已关闭，不能再创建裁剪句柄。")
+            self._pending += 1
+        return CropHandle(self, bbox, render)
+
+    def close(self):
+        """页面不再创建新句柄。没有未处理的句柄时立即释放整页图像，否则在最后一个句柄处理后释放。"""
+        with self._lock:
+            self._closed = True
+            release = self._pending == 0
+        if release:
+            self._free()
+
+    def _done(self):
+        with self._lock:
+            self._pending -= 1
+            release = self._closed and self._pending == 0
+        if release:
+            self._free()
+
+    def _free(self):
+        image, self.image = self.image, None
+        if image is not None and self._release is not None:
+            self._release(image)
+
+    @property
+    def released(self) -> bool:
+        return self.image is None
+
+
+class CropHandle:
+    """
+    页面上一个区域的惰性裁剪。每个句柄只能物化（materialize）或丢弃（discard）一次。
+    """
+    __slots__ = ('raster', 'bbox', 'render', 'rendered_pixels', '_resolved')
+
+    def __init__(self, raster: PageRaster, bbox: List[int], render: Optional[Callable[[], Image.Image]] = None):
+        self.raster = raster
+        self.bbox = bbox
+        self.render = render
+        self.rendered_pixels = 0 # 物化时为此重新渲染的像素数
+        self._resolved = False
+
+    @property
+    def array(self) -> Optional[np.ndarray]:
+        """区域在整页数组上的零拷贝视图（页面为 PIL Image、已释放或需要重新渲染时为 None）。"""
+        image = self.raster.image
+        if self.render is not None or not isinstance(image, np.ndarray):
+            return None
+        x0, y0, x1, y1 = (max(int(v), 0) for v in self.bbox)
+        return image[y0:y1, x0:x1]
+
+    def materialize(self) -> Image.Image:
+        """裁剪（或重新渲染）区域并补齐到模型要求的最小尺寸，返回独立的 PIL Image。"""
+        if self._resolved:
+            raise RuntimeError("裁剪句柄已处理。")
+        try:
+            if self.render is not None:
+                cropped_image = self.render()
+                self.rendered_pixels = cropped_image.width * cropped_image.height
+            else:
+                cropped_image = crop_image_region(self.raster.image, self.bbox)
+            return resize_image_for_mvl(cropped_image)
+        finally:
+            self._resolved = True
+            self.raster._done()
+
+    def discard(self):
+        """不再需要该区域的像素。"""
+        if not self._resolved:
+            self._resolved = True
+            self.raster._done()
@@ -0,0 +1,131 @@
+"""
+检测框的空间索引。
+
+参考文献、目录、表单这类密集页面上有上百个框，逐对比较的开销随框数平方增长。这里提供：
+- GridIndex：把 (N, 4) 的框按均匀网格分桶，批量求出所有相交的框对，或查询与某个框相交的框
+- IntervalGrid：一维区间的均匀网格，可以逐个插入，按坐标查询覆盖该点的区间
+- overlapping_range：在按位置排好序、互不重叠的区间中二分查找与给定区间重叠的范围
+所有查询都以闭区间判断相交（边界相接也算相交），结果是精确判断的超集，调用方在候选上做原有的精确判断即可。
+"""
+import math
+from bisect import bisect_left, bisect_right
+from typing import Any, List, Sequence, Tuple
+import numpy as np
+
+
+class GridIndex:
+    """
+    静态的二维均匀网格。每个框登记到它覆盖的所有网格中，网格边长默认取框宽高的中位数，
+    框大小相近的密集页面上每个网格只有少数几个框，求相交框对的开销约为 O(n log n + 相交对数)。
+    """
+    def __init__(self, boxes: np.ndarray, cell_size: float = None):
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        # 坐标顺序颠倒的框按其覆盖范围处理
+        self.lower = np.minimum(boxes[:, :2], boxes[:, 2:])
+        self.upper = np.maximum(boxes[:, :2], boxes[:, 2:])
+        self.count = len(boxes)
+        if self.count == 0:
+            self.cell_size, self.origin, self.columns = 1.0, np.zeros(2), 1
+            self._keys = self._entries = np.zeros(0, dtype=np.int64)
+            return
+        self.origin = self.lower.min(axis=0)
+        if cell_size is None:
+            cell_size = float(np.median(self.upper - self.lower))
+            # 框很小而分布范围很大时限制网格总数，避免大框登记到过多网格
+            extent = self.upper.max(axis=0) - self.origin
+            cell_size = max(cell_size, math.sqrt(extent[0] * extent[1] / max(4 * self.count, 64)))
+        self.cell_size = max(cell_size, 1.0)
+        first, last = self._cells(self.lower), self._cells(self.upper)
+        self.columns = int(last[:, 0].max()) + 1
+        # 展开为 (网格键, 框序号) 并按网格键排序
+        spans = last - first + 1
+        counts = spans[:, 0] * spans[:, 1]
+        box_ids = np.repeat(np.arange(self.count), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cell_x = first[box_ids, 0] + local % spans[box_ids, 0]
+        cell_y = first[box_ids, 1] + local // spans[box_ids, 0]
+        keys = cell_y * self.columns + cell_x
+        order = np.lexsort((box_ids, keys))
+        self._keys, self._entries = keys[order], box_ids[order]
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+    def _intersects(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        return np.all(np.maximum(self.lower[i], self.lower[j]) <= np.minimum(self.upper[i], self.upper[j]), axis=1)
+
+    def intersecting_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        返回所有相交的框对 (i, j)，i < j，按 i、j 升序排列。
+        同一对框可能同时出现在多个网格中，只在包含二者交集左上角的网格中计一次。
+        """
+        if self.count < 2:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        # 每个登记项与同一网格中排在它之后的登记项组成候选对
+        boundaries = np.flatnonzero(np.diff(self._keys)) + 1
+        group_end = np.repeat(np.append(boundaries, len(self._keys)),
+                              np.diff(np.concatenate([[0], boundaries, [len(self._keys)]])))
+        after = group_end - np.arange(len(self._keys)) - 1
+        left = np.repeat(np.arange(len(self._keys)), after)
+        right = left + 1 + np.arange(after.sum()) - np.repeat(np.cumsum(after) - after, after)
+        i, j = self._entries[left], self._entries[right]
+        i, j = np.minimum(i, j), np.maximum(i, j)
+        corner_cells = self._cells(np.maximum(self.lower[i], self.lower[j]))
+        in_corner_cell = corner_cells[:, 1] * self.columns + corner_cells[:, 0] == self._keys[left]
+        mask = in_corner_cell & self._intersects(i, j)
+        i, j = i[mask], j[mask]
+        order = np.lexsort((j, i))
+        return i[order], j[order]
+
+    def query(self, box: Sequence[float]) -> np.ndarray:
+        """返回与 box 相交的框的序号（升序）。"""
+        if self.count == 0:
+            return np.zeros(0, dtype=np.int64)
+        box = np.asarray(box, dtype=np.float64)
+        lower, upper = np.minimum(box[:2], box[2:]), np.maximum(box[:2], box[2:])
+        first, last = self._cells(lower[None])[0], self._cells(upper[None])[0]
+        first_x, last_x = max(first[0], 0), min(last[0], self.columns - 1)
+        candidates = []
+        for cell_y in range(max(first[1], 0), last[1] + 1 if first_x <= last_x else 0):
+            # 同一行网格的键是连续的
+            start = np.searchsorted(self._keys, cell_y * self.columns + first_x, side='left')
+            stop = np.searchsorted(self._keys, cell_y * self.columns + last_x, side='right')
+            candidates.append(self._entries[start:stop])
+        if not candidates:
+            return np.zeros(0, dtype=np.int64)
+        candidates = np.unique(np.concatenate(candidates))
+        mask = np.all((np.maximum(self.lower[candidates], lower) <= np.minimum(self.upper[candidates], upper)), axis=1)
+        return candidates[mask]
+
+
+class IntervalGrid:
+    """
+    一维区间的均匀网格，支持逐个插入。每个区间登记到它覆盖的所有网格中，
+    candidates(x) 按插入顺序返回 x 所在网格中的区间（覆盖 x 的区间一定在其中）。
+    """
+    def __init__(self, start: float, stop: float, cells: int = 64):
+        self.start = start
+        self.cell_size = max((stop - start) / max(cells, 1), 1e-9)
+        self.cells: List[List[Any]] = [[] for _ in range(max(cells, 1))]
+
+    def _cell(self, x: float) -> int:
+        return min(max(math.floor((x - self.start) / self.cell_size), 0), len(self.cells) - 1)
+
+    def insert(self, lower: float, upper: float, item: Any):
+        for cell in range(self._cell(lower), self._cell(upper) + 1):
+            self.cells[cell].append(item)
+
+    def candidates(self, x: float) -> List[Any]:
+        return self.cells[self._cell(x)]
+
+
+def overlapping_range(lefts: Sequence[float], rights: Sequence[float], lower: float, upper: float) -> range:
+    """
+    lefts 非递减、rights 递增的一组区间（按位置排序且互不重叠，可以相接）中，
+    与闭区间 [lower, upper] 重叠的区间是连续的一段，返回其下标范围。
+    """
+    # 重叠条件 left <= upper 且 right >= lower：前者是前缀，后者是后缀
+    start = bisect_left(rights, lower)
+    stop = bisect_right(lefts, upper)
+    return range(start, max(start, stop))
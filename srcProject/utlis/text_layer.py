@@ -0,0 +1,150 @@
+"""
+PDF 文本层快速通道。
+
+对于原生数字 PDF，页面自带可提取的文本层。这里把检测框的像素坐标换算回 PDF 点坐标，
+收集落在框内的文本跨度（spans），在覆盖率和可信度足够高时直接使用文本层的文字，
+从而跳过远程 VLM OCR。扫描件、表格和公式仍然交给 OCR。
+"""
+from typing import List, Dict, Any, Tuple
+from srcProject.config.constants import TEXT_LAYER_VALUES, TEXT_LAYER_MIN_COVERAGE, TEXT_LAYER_MIN_CONFIDENCE, \
+    BlockType_MEMBER, REGION_RENDER_DPI, REGION_RENDER_DPI_DEFAULT, REGION_TARGET_TEXT_PX, REGION_MIN_DPI, \
+    REGION_MAX_DPI
+from srcProject.utlis.aftertreatment import poly_to_bbox
+
+# 数学字体中的字符通常无法还原为正确的公式文本，遇到时交给 OCR 输出 LaTeX
+_MATH_FONT_MARKERS = ('cmmi', 'cmsy', 'cmex', 'msbm', 'msam', 'math', 'symbol')
+# 常见连字替换为普通字母
+_LIGATURES = str.maketrans({'ﬀ': 'ff', 'ﬁ': 'fi', 'ﬂ': 'fl', 'ﬃ': 'ffi', 'ﬄ': 'ffl', 'ﬅ': 'st', 'ﬆ': 'st'})
+
+
+def pixel_bbox_to_points(bbox: List[float], dpi: int) -> Tuple[float, float, float, float]:
+    """将以 dpi 渲染的像素坐标边界框换算为 PDF 点坐标（1 英寸 = 72 点）。"""
+    scale = 72.0 / dpi
+    return bbox[0] * scale, bbox[1] * scale, bbox[2] * scale, bbox[3] * scale
+
+
+def _is_reliable_char(char: str, font: str) -> bool:
+    """判断文本层中的一个字符是否可信：排除替换字符、私有区字符、控制字符和数学字体。"""
+    code = ord(char)
+    if char == '\ufffd' or 0xE000 <= code <= 0xF8FF or (code < 32 and char not in '\t\n'):
+        return False
+    return not any(marker in font for marker in _MATH_FONT_MARKERS)
+
+
+def _is_cjk(char: str) -> bool:
+    """判断字符是否为中日韩文字或全角标点（这类文字换行时不需要补空格）。"""
+    code = ord(char)
+    return 0x2E80 <= code <= 0x9FFF or 0xF900 <= code <= 0xFAFF or 0xFF00 <= code <= 0xFFEF
+
+
+def _join_lines(lines: List[str]) -> str:
+    """把多行文本拼接为一段：英文行间补空格，行尾连字符断词时去掉连字符，中文直接相连。"""
+    text = ''
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if not text:
+            text = line
+        elif text.endswith('-') and line[0].islower():
+            text = text[:-1] + line
+        elif _is_cjk(text[-1]) or _is_cjk(line[0]):
+            text += line
+        else:
+            text += ' ' + line
+    return text
+
+
+def extract_region_text(spans: List[Dict[str, Any]],
+                        region: Tuple[float, float, float, float]) -> Tuple[str, float, float]:
+    """
+    收集中心点落在区域内的文本跨度，拼接为文本。
+    Args:
+        spans: PDFDataset.get_page_spans 返回的文本跨度列表（PDF 点坐标）。
+        region: 区域边界框 (x0, y0, x1, y1)，PDF 点坐标。
+
+    Returns:
+        (text, coverage, confidence)：
+        - coverage: 区域内文本跨度面积之和占区域面积的比例，扫描件区域接近 0；
+        - confidence: 可信字符占全部非空白字符的比例。
+    """
+    x0, y0, x1, y1 = region
+    region_area = max(x1 - x0, 0) * max(y1 - y0, 0)
+    if region_area <= 0:
+        return '', 0.0, 0.0
+    lines = {}
+    covered_area = 0.0
+    total_chars = reliable_chars = 0
+    for span in spans:
+        text = span.get('text') or ''
+        sx0, sy0, sx1, sy1 = span['bbox']
+        cx, cy = (sx0 + sx1) / 2, (sy0 + sy1) / 2
+        if not (x0 <= cx <= x1 and y0 <= cy <= y1):
+            continue
+        covered_area += max(min(sx1, x1) - max(sx0, x0), 0) * max(min(sy1, y1) - max(sy0, y0), 0)
+        font = (span.get('font') or '').lower()
+        for char in text:
+            if not char.isspace():
+                total_chars += 1
+                reliable_chars += _is_reliable_char(char, font)
+        # 同一行的跨度直接相连，按 (block, line) 在文本层中的先后顺序分行
+        line_key = (span.get('block', 0), span.get('line', 0))
+        lines[line_key] = lines.get(line_key, '') + text
+    if total_chars == 0:
+        return '', 0.0, 0.0
+    text = _join_lines(list(lines.values())).translate(_LIGATURES)
+    coverage = min(covered_area / region_area, 1.0)
+    confidence = reliable_chars / total_chars
+    return text, coverage, confidence
+
+
+def apply_text_layer(page_detections: List[Dict[str, Any]], spans: List[Dict[str, Any]], dpi: int) -> int:
+    """
+    对一页中可由文本层识别的检测结果（标题、正文、图表注释），直接用文本层文字填充 'text'，
+    并标记 'text_source' 为 'text_layer'，后续 OCR 会跳过这些区域。
+    Args:
+        page_detections: 一页的检测结果，'poly' 为按 dpi 渲染的像素坐标。
+        spans: 该页的文本跨度列表。
+        dpi: 检测时页面图像的渲染分辨率。
+
+    Returns:
+        int: 使用文本层填充的区域数量。
+    """
+    if not spans:
+        return 0
+    filled = 0
+    for detection in page_detections:
+        if detection.get('category_id') not in TEXT_LAYER_VALUES or 'text' in detection:
+            continue
+        region = pixel_bbox_to_points(poly_to_bbox(detection['poly']), dpi)
+        text, coverage, confidence = extract_region_text(spans, region)
+        if text and coverage >= TEXT_LAYER_MIN_COVERAGE and confidence >= TEXT_LAYER_MIN_CONFIDENCE:
+            detection['text'] = text
+            detection['text_source'] = 'text_layer'
+            filled += 1
+    return filled
+
+
+def choose_region_dpi(category_id: int, spans: List[Dict[str, Any]],
+                      region: Tuple[float, float, float, float]) -> float:
+    """
+    为一个检测区域选择重新渲染的 DPI。
+    标题、正文、注释类区域内有文本层时按字号中位数选择，使文字高度约为 REGION_TARGET_TEXT_PX 像素
+    （大字号用更低的 DPI）；否则（扫描件、图片、表格、公式）按区域类型使用 REGION_RENDER_DPI 中的默认值。
+    Args:
+        category_id: 区域类别 ID。
+        spans: 该页的文本跨度列表，可以为 None。
+        region: 区域边界框 (x0, y0, x1, y1)，PDF 点坐标。
+    """
+    x0, y0, x1, y1 = region
+    text_spans = spans if category_id in TEXT_LAYER_VALUES else None
+    sizes = sorted(
+        span['size'] for span in text_spans or []
+        if span.get('size') and (span.get('text') or '').strip()
+        and x0 <= (span['bbox'][0] + span['bbox'][2]) / 2 <= x1
+        and y0 <= (span['bbox'][1] + span['bbox'][3]) / 2 <= y1
+    )
+    if sizes:
+        median_size = sizes[len(sizes) // 2]
+        return min(max(REGION_TARGET_TEXT_PX * 72.0 / median_size, REGION_MIN_DPI), REGION_MAX_DPI)
+    return REGION_RENDER_DPI.get(BlockType_MEMBER.get(int(category_id)), REGION_RENDER_DPI_DEFAULT)
@@ -2,9 +2,13 @@
 
 from PIL import Image, ImageDraw, ImageFont
 import pymupdf
-from typing import List, Dict, Any, Tuple, Union
+from typing import List, Dict, Any, Tuple, Union, Optional
 import os
-from srcProject.config.constants import DEFAULT_COLORS, DEFAULT_COLOR_UNKNOWN, BlockType
+import numpy as np
+from srcProject.config.constants import DEFAULT_COLORS, DEFAULT_COLOR_UNKNOWN, BlockType, IMAGE_EXTENSIONS
+from srcProject.config.settings import RENDER_COLORSPACE, IMAGE_MAX_PIXELS
+from srcProject.data_loaders.image_dataset import ImageDataset
+from srcProject.data_loaders.page_cache import get_default_page_cache
 from srcProject.utlis.common import find_project_root
 from srcProject.utlis.visualization.draw import _draw_poly_on_fitz_page, _draw_page_order_on_fitz_page, \
     _draw_poly_on_pil_image, _draw_page_order_on_pil_image
@@ -17,9 +21,14 @@ def visualize_document(
         page_order: List[List[int]],
         output_directory: str = "srcProject/output/visualizations",
         file_prefix: str = "layout_vis",
-        dpi_for_image_output: int = 300
+        dpi_for_image_output: int = 300,
+        page_image: Optional[Union[Image.Image, np.ndarray]] = None
 ):
-    """根据输入类型（PDF或图像），将所有布局检测结果可视化并保存。"""
+    """
+    根据输入类型（PDF或图像），将所有布局检测结果可视化并保存。
+    page_image 为图片输入在检测时使用的归一化图像（见 layout_prediction 的 page_images），给出时直接在其上绘制，
+    为 None 时重新打开并归一化原图。
+    """
     output_directory = os.path.join(find_project_root(), output_directory)
     output_directory = os.path.join(output_directory, file_prefix)
     os.makedirs(output_directory, exist_ok=True)
@@ -93,15 +102,23 @@ def visualize_document(
                 raise ValueError(f"合并 PDF 失败: {e}")
         return None
 
-    elif file_extension in ['.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff']:
+    elif file_extension in IMAGE_EXTENSIONS:
         if not detections_per_page:
             print("警告：图片输入没有检测结果可供可视化。")
             return
         if len(detections_per_page) > 1:
             print("警告：单张图片输入检测结果包含多页，仅可视化第一页。")
-        image = Image.open(input_path).convert("RGB")
+        # 使用与检测时相同的归一化图像（缩小、EXIF 旋转后），检测坐标才能对齐；
+        # 没有传入时重新打开原图（启用页面缓存时直接取缓存中的结果）
+        if page_image is None:
+            dataset = ImageDataset(input_path, colorspace=RENDER_COLORSPACE, max_pixels=IMAGE_MAX_PIXELS,
+                                   page_cache=get_default_page_cache())
+            page_image = dataset.get_page_image(0)
+        elif isinstance(page_image, np.ndarray):
+            page_image = Image.fromarray(page_image)
         image_output_path = os.path.join(output_directory, f"{file_prefix}_{os.path.basename(input_path)}")
-        drawable_image = image.copy()
+        # convert 返回新图像，绘制不会改动传入的页面图像
+        drawable_image = page_image.convert("RGB")
         draw = ImageDraw.Draw(drawable_image)
         font_size = 20
         line_width = 3
@@ -0,0 +1,39 @@
+"""
+html_table 的单元测试：表头识别、rowspan / colspan 展开。
+"""
+from srcProject.utlis.html_table import html_table_to_markdown
+
+
+def test_spans_are_repeated_into_covered_cells():
+    table = ('<table><tr><th>a</th><th>b</th><th>c</th></tr>'
+             '<tr><td rowspan="2">x</td><td colspan="2">y</td></tr>'
+             '<tr><td>1</td><td>2</td></tr></table>')
+    assert html_table_to_markdown(table) == ('| a | b | c |\n'
+                                             '|---|---|---|\n'
+                                             '| x | y | y |\n'
+                                             '| x | 1 | 2 |')
+
+
+def test_multi_row_header_is_merged_per_column():
+    table = ('<table><tr><th rowspan="2">name</th><th colspan="2">group</th></tr>'
+             '<tr><th>x</th><th>y</th></tr>'
+             '<tr><td>1</td><td>2</td><td>3</td></tr></table>')
+    assert html_table_to_markdown(table) == ('| name | group / x | group / y |\n'
+                                             '|---|---|---|\n'
+                                             '| 1 | 2 | 3 |')
+
+
+def test_thead_rowspan_extends_header():
+    table = ('<table><thead><tr><td rowspan="2">name</td><td>x</td></tr><tr><td>y</td></tr></thead>'
+             '<tbody><tr><td>1</td><td>2</td></tr></tbody></table>')
+    assert html_table_to_markdown(table) == ('| name | x / y |\n'
+                                             '|---|---|\n'
+                                             '| 1 | 2 |')
+
+
+def test_first_row_fallback_header_does_not_absorb_spanned_rows():
+    # 没有 <th> / <thead> 时第一行作表头，它的 rowspan 覆盖的行仍是数据行
+    table = '<table><tr><td>a</td><td rowspan=3>r</td></tr><tr><td>b</td></tr></table>'
+    assert html_table_to_markdown(table) == ('| a | r |\n'
+                                             '|---|---|\n'
+                                             '| b | r |')